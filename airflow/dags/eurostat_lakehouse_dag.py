@@ -4,6 +4,18 @@ from airflow.operators.bash import BashOperator
 
 PROJECT_DIR = "/opt/project"
 
+# todas as tasks de um DAG run compartilham o checkpoint runs/<run_id>/: num
+# retry a task pula o estágio se ele já concluiu com as saídas intactas
+RUN_ID = "'{{ run_id }}'"
+
+# disparar com {"profile": true} perfila todas as tasks (src/profiling.py);
+# saída em runs/<run_id>/profile/ e top-N hotspots no log da task
+PROFILE = "{{ '--profile' if params.profile else '' }}"
+
+# disparado pelo DAG de watch (eurostat_watch_dag.py) com {"datasets": "a b"}:
+# os datasets que mudaram ficam registrados no checkpoint do run
+DATASETS = "{{ '--datasets ' ~ params.datasets if params.datasets else '' }}"
+
 default_args = {
     "owner": "mauri",
     "retries": 2,
@@ -17,32 +29,58 @@ with DAG(
     schedule=None,
     catchup=False,
     tags=["eurostat", "lakehouse"],
+    params={"profile": False, "datasets": ""},
 ) as dag:
 
     extract_raw = BashOperator(
         task_id="extract_raw",
-        bash_command=f"cd {PROJECT_DIR} && python3 src/01_extract_raw.py",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage extract {PROFILE} {DATASETS}",
     )
 
     bronze = BashOperator(
         task_id="bronze_ingest",
-        bash_command=f"cd {PROJECT_DIR} && python3 src/02_bronze_ingest.py",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage bronze {PROFILE}",
+    )
+
+    metadata = BashOperator(
+        task_id="metadata_fetch",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage metadata {PROFILE}",
     )
 
     silver = BashOperator(
         task_id="silver_transform",
-        bash_command=f"cd {PROJECT_DIR} && python3 src/03_silver_transform.py",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage silver {PROFILE}",
+    )
+
+    revisions = BashOperator(
+        task_id="silver_revisions",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage revisions {PROFILE}",
     )
 
     gold = BashOperator(
         task_id="gold_analytics",
-        bash_command=f"cd {PROJECT_DIR} && python3 src/04_gold_analytics.py",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage gold {PROFILE}",
+    )
+
+    structural = BashOperator(
+        task_id="gold_structural_metrics",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage structural {PROFILE}",
+    )
+
+    anomalies = BashOperator(
+        task_id="gold_anomalies",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage anomalies {PROFILE}",
+    )
+
+    concentration = BashOperator(
+        task_id="gold_concentration",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage concentration {PROFILE}",
     )
 
     quality = BashOperator(
         task_id="quality_checks",
-        bash_command=f"cd {PROJECT_DIR} && python3 src/05_quality_checks.py",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/run_all.py --run-id {RUN_ID} --stage quality {PROFILE}",
     )
 
-    extract_raw >> bronze >> silver >> gold >> quality
+    extract_raw >> [bronze, metadata] >> silver >> revisions >> gold >> [structural, anomalies, concentration] >> quality
 
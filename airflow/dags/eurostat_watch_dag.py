@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from airflow import DAG
+from airflow.operators.bash import BashOperator
+from airflow.operators.trigger_dagrun import TriggerDagRunOperator
+from airflow.sensors.bash import BashSensor
+
+PROJECT_DIR = "/opt/project"
+
+# watch mode (src/watch.py) como sensor: a cada poke, um GET condicional do
+# TOC da Eurostat (HEAD na API de dados para datasets fora do TOC). Só quando
+# algum dataset mudou o DAG segue: baixa os que mudaram, dispara o
+# eurostat_lakehouse com a lista e, se ele terminar bem, confirma o estado.
+# Sem mudança no intervalo do sensor, o run termina como skipped.
+
+default_args = {
+    "owner": "mauri",
+    "retries": 2,
+    "retry_delay": timedelta(minutes=2),
+}
+
+with DAG(
+    dag_id="eurostat_watch",
+    default_args=default_args,
+    start_date=datetime(2026, 1, 1),
+    schedule=timedelta(hours=6),
+    catchup=False,
+    max_active_runs=1,
+    tags=["eurostat", "lakehouse", "watch"],
+) as dag:
+
+    # exit 0 = algo mudou; != 0 = poke de novo (com backoff exponencial)
+    changed = BashSensor(
+        task_id="eurostat_changed",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/watch.py --check",
+        mode="reschedule",
+        poke_interval=timedelta(hours=1),
+        exponential_backoff=True,
+        timeout=timedelta(hours=6),
+        soft_fail=True,
+    )
+
+    # última linha do stdout (XCom) = datasets que mudaram; exit 99 = pipeline
+    # não precisa rodar (só datasets fora do lakehouse mudaram) -> skipped
+    download = BashOperator(
+        task_id="download_changed",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/watch.py --download",
+    )
+
+    trigger = TriggerDagRunOperator(
+        task_id="trigger_lakehouse",
+        trigger_dag_id="eurostat_lakehouse",
+        conf={"datasets": "{{ ti.xcom_pull(task_ids='download_changed') }}"},
+        wait_for_completion=True,
+        poke_interval=60,
+    )
+
+    # confirma mesmo com o trigger skipped; pipeline com falha = fica pendente
+    ack = BashOperator(
+        task_id="ack_changed",
+        bash_command=f"cd {PROJECT_DIR} && python3 src/watch.py --ack",
+        trigger_rule="none_failed",
+    )
+
+    changed >> download >> trigger >> ack
@@ -0,0 +1,104 @@
+"""
+Latency benchmark for the gold query library (src/gold_query.py).
+
+Runs a mixed workload (top-N, YoY, rank delta, structural lookup) from N
+concurrent client threads and reports p50/p99 latency and throughput, with
+the LRU cache enabled and disabled.
+
+    python benchmarks/bench_gold_query.py --clients 8 --requests 2000
+
+Requires the gold layer (run src/run_all.py).
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from config import DATA_GOLD  # noqa: E402
+from gold_query import GoldQuery  # noqa: E402
+
+
+def build_workload(q: GoldQuery, n: int, seed: int) -> list[tuple]:
+    version, snap = q._state
+    rng = random.Random(seed)
+    indicators = snap.dim_indicator["indic_sbs"].tolist()
+    geos = snap.dim_geo.loc[snap.dim_geo["is_country"], "geo"].tolist()
+    years = sorted(set(snap.v_year.tolist()))
+
+    ops: list[tuple] = []
+    for _ in range(n):
+        kind = rng.choice(["top_n", "yoy", "rank_delta", "structural"])
+        if kind == "top_n":
+            ops.append(("top_n", rng.choice(indicators), rng.choice(years)))
+        elif kind == "yoy":
+            ops.append(("yoy", rng.choice(geos), rng.choice(indicators)))
+        elif kind == "rank_delta":
+            y0, y1 = sorted(rng.sample(years, 2)) if len(years) > 1 else (years[0], years[0])
+            ops.append(("rank_delta", rng.choice(indicators), y0, y1))
+        else:
+            ops.append(("structural", rng.choice(geos)))
+    return ops
+
+
+def run_op(q: GoldQuery, op: tuple) -> float:
+    t0 = time.perf_counter()
+    getattr(q, op[0])(*op[1:])
+    return time.perf_counter() - t0
+
+
+def run(q: GoldQuery, ops: list[tuple], clients: int) -> dict:
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = np.fromiter(pool.map(lambda op: run_op(q, op), ops), dtype=float)
+    wall = time.perf_counter() - t0
+    ms = latencies * 1000.0
+    return {
+        "clients": clients,
+        "requests": len(ops),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "max_ms": round(float(ms.max()), 4),
+        "throughput_rps": round(len(ops) / wall, 1),
+        "cache_hits": q.cache.hits,
+        "cache_misses": q.cache.misses,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--gold-dir", type=Path, default=DATA_GOLD)
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--distinct", type=int, default=200, help="distinct queries in the workload")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    probe = GoldQuery(args.gold_dir, cache_size=0)
+    print(f"load: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    distinct = build_workload(probe, args.distinct, args.seed)
+    rng = random.Random(args.seed)
+    ops = [rng.choice(distinct) for _ in range(args.requests)]
+
+    results = []
+    for cache_size, label in [(0, "no-cache"), (1024, "lru")]:
+        for clients in args.clients:
+            q = GoldQuery(args.gold_dir, cache_size=cache_size)
+            res = {"mode": label, **run(q, ops, clients)}
+            results.append(res)
+            print(json.dumps(res))
+
+
+if __name__ == "__main__":
+    main()
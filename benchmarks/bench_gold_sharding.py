@@ -0,0 +1,106 @@
+"""
+Scaling benchmark for the sharded gold mode (src/sharding.py).
+
+Builds a synthetic lake up to silver revisions once, then runs the gold stage
+(04, full refresh) and the structural metrics with EUROSTAT_GOLD_WORKERS set to
+each value of --workers. Each run is a fresh process, like run_all.py, and its
+outputs are compared with the single-process run, which must match exactly.
+Speedup and parallel efficiency are reported against --workers 1.
+
+    python benchmarks/bench_gold_sharding.py --size-mb 200
+    python benchmarks/bench_gold_sharding.py --size-mb 1000 --workers 1 8 16 32
+
+Scaling is bounded by the largest indicator (one indicator is never split)
+and by the serial part: reading silver, the IPC hand-off and writing gold.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import pyarrow.parquet as pq
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_pipeline import STAGES, run_stage  # noqa: E402
+from synthetic_eurostat import generate  # noqa: E402
+
+SHARDED = ["gold", "structural"]
+GOLD_OUTPUTS = [
+    "gold_country_indicator_year.parquet",
+    "gold_yoy_growth.parquet",
+    "gold_structural_metrics.parquet",
+]
+
+
+def default_workers() -> list[int]:
+    n, out = os.cpu_count() or 1, [1]
+    while out[-1] * 2 <= n:
+        out.append(out[-1] * 2)
+    return out if out[-1] == n else out + [n]
+
+
+def reset_gold(lake_root: Path) -> None:
+    # no gold and no build record -> 04 does a full refresh
+    for f in (lake_root / "data-gold").glob("*"):
+        if f.is_file():
+            f.unlink()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size-mb", type=float, default=100, help="synthetic TSV size")
+    ap.add_argument("--workers", type=int, nargs="+", default=default_workers())
+    args = ap.parse_args()
+
+    lake_root = Path(tempfile.mkdtemp(prefix="eurostat_sharding_"))
+    generate(lake_root / "data-raw" / "sbs_na_ind_r2.tsv.gz", args.size_mb)
+    for stage, script, _ in STAGES:
+        if stage == "gold":
+            break
+        if not run_stage(script, lake_root)["ok"]:
+            raise SystemExit(f"{stage} failed ({script})")
+    print(f"lake: {lake_root}")
+
+    # always shard, whatever the size; the reference run is workers=1
+    os.environ["EUROSTAT_GOLD_SHARD_MIN_ROWS"] = "0"
+    workers_list = [1] + [w for w in args.workers if w != 1]
+    scripts = {stage: script for stage, script, _ in STAGES}
+    reference, base_s = None, None
+
+    for workers in workers_list:
+        os.environ["EUROSTAT_GOLD_WORKERS"] = str(workers)
+        reset_gold(lake_root)
+        timings = {}
+        for stage in SHARDED:
+            res = run_stage(scripts[stage], lake_root)
+            if not res["ok"]:
+                raise SystemExit(f"{stage} failed with {workers} workers:\n" + "\n".join(res["stderr_tail"]))
+            timings[stage] = res["wall_s"]
+
+        tables = {name: pq.read_table(lake_root / "data-gold" / name) for name in GOLD_OUTPUTS}
+        if reference is None:
+            reference = tables
+        identical = all(tables[name].equals(reference[name]) for name in GOLD_OUTPUTS)
+
+        total = sum(timings.values())
+        base_s = base_s or total
+        print(json.dumps({
+            "workers": workers,
+            "wall_s": timings,
+            "total_s": round(total, 3),
+            "speedup": round(base_s / total, 2),
+            "efficiency": round(base_s / total / workers, 2),
+            "identical": identical,
+        }))
+        if not identical:
+            raise SystemExit(f"sharded output with {workers} workers differs from the single-process run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cold-start benchmark: Parquet decode vs memory-mapped Arrow IPC snapshot.
+
+Each measurement runs in a fresh Python process (like a real consumer start-up)
+and reports the time to get a pandas DataFrame plus the process peak RSS.
+
+    python benchmarks/bench_gold_snapshot.py --repeat 5
+
+Requires the gold layer with snapshots (src/04_gold_analytics.py).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from config import DATA_GOLD  # noqa: E402
+from lake_io import ipc_path  # noqa: E402
+
+CHILD = r"""
+import resource, sys, time, json
+t0 = time.perf_counter()
+import pyarrow as pa, pyarrow.parquet as pq
+mode, path = sys.argv[1], sys.argv[2]
+if mode == "parquet":
+    table = pq.read_table(path)
+else:
+    with pa.memory_map(path, "r") as src:
+        table = pa.ipc.open_file(src).read_all()
+t_table = time.perf_counter() - t0
+df = table.to_pandas(split_blocks=True)
+t_df = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"t_table": t_table, "t_df": t_df, "max_rss_kb": rss, "rows": len(df)}))
+"""
+
+
+def measure(mode: str, path: Path, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, mode, str(path)],
+            check=True, capture_output=True, text=True,
+        )
+        runs.append(json.loads(out.stdout))
+    return {
+        "file": path.name,
+        "mode": mode,
+        "size_bytes": path.stat().st_size,
+        "rows": runs[0]["rows"],
+        "table_ms": round(statistics.median(r["t_table"] for r in runs) * 1000, 2),
+        "dataframe_ms": round(statistics.median(r["t_df"] for r in runs) * 1000, 2),
+        "max_rss_kb": int(statistics.median(r["max_rss_kb"] for r in runs)),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--gold-dir", type=Path, default=DATA_GOLD)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    for parquet in sorted(args.gold_dir.glob("*.parquet")):
+        snap = ipc_path(parquet)
+        print(json.dumps(measure("parquet", parquet, args.repeat)))
+        if snap.exists():
+            print(json.dumps(measure("ipc", snap, args.repeat)))
+        else:
+            print(json.dumps({"file": parquet.name, "mode": "ipc", "skipped": "no snapshot"}))
+
+
+if __name__ == "__main__":
+    main()
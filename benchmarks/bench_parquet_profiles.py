@@ -0,0 +1,104 @@
+"""
+Parquet write-profile benchmark (see PARQUET_PROFILES in src/config.py).
+
+Writes the same silver table with every profile and reports file size, write
+time, row groups, full-read time and selective-read time (one geo + one
+indicator, a few columns, predicate pushdown on row-group statistics).
+
+    python benchmarks/bench_parquet_profiles.py --size-mb 200
+    python benchmarks/bench_parquet_profiles.py --input data-silver/sbs_na_ind_r2_silver.parquet
+
+Without --input, a synthetic dataset is generated and run through bronze and
+silver first. Note: pyarrow prunes with row-group statistics; page indexes and
+bloom filters are used by engines that read them (DuckDB, Spark, Trino).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from bench_pipeline import run_stage  # noqa: E402
+from config import PARQUET_PROFILES  # noqa: E402
+from lake_io import write_parquet  # noqa: E402
+from synthetic_eurostat import generate  # noqa: E402
+
+SELECT_COLS = ["geo", "indic_sbs", "year", "value_num"]
+
+
+def synthetic_silver(size_mb: float, workdir: Path) -> Path:
+    generate(workdir / "data-raw" / "sbs_na_ind_r2.tsv.gz", size_mb)
+    for script in ["src/01_extract_raw.py", "src/02_bronze_ingest.py", "src/03_silver_transform.py"]:
+        res = run_stage(script, workdir)
+        if not res["ok"]:
+            raise SystemExit(f"{script} failed: {res['stderr_tail']}")
+    return workdir / "data-silver" / "sbs_na_ind_r2_silver.parquet"
+
+
+def most_common(col) -> str:
+    counts = pc.value_counts(col)
+    i = pc.index(counts.field("counts"), pc.max(counts.field("counts"))).as_py()
+    return counts.field("values")[i].as_py()
+
+
+def timed(fn, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--input", type=Path, default=None, help="silver parquet to rewrite")
+    ap.add_argument("--size-mb", type=float, default=100, help="synthetic TSV size when no --input")
+    ap.add_argument("--profiles", nargs="+", default=list(PARQUET_PROFILES))
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="eurostat_profiles_"))
+    src = args.input or synthetic_silver(args.size_mb, workdir)
+    table = pq.read_table(src)
+    geo = most_common(table["geo"])
+    indic = most_common(table["indic_sbs"])
+    print(f"input: {src} rows={table.num_rows:,} selective: geo={geo} indic_sbs={indic}")
+
+    for name in args.profiles:
+        out = workdir / f"silver_{name}.parquet"
+        write_s = timed(lambda: write_parquet(table, out, "silver", profile=name), args.repeat)
+        full_s = timed(lambda: pq.read_table(out), args.repeat)
+        sel_s = timed(
+            lambda: pq.read_table(
+                out,
+                columns=SELECT_COLS,
+                filters=[("geo", "==", geo), ("indic_sbs", "==", indic)],
+            ),
+            args.repeat,
+        )
+        meta = pq.ParquetFile(out).metadata
+        print(json.dumps({
+            "profile": name,
+            "size_mb": round(out.stat().st_size / 1e6, 3),
+            "row_groups": meta.num_row_groups,
+            "write_ms": round(write_s * 1000, 1),
+            "full_read_ms": round(full_s * 1000, 1),
+            "selective_read_ms": round(sel_s * 1000, 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+End-to-end scaling benchmark on synthetic Eurostat data.
+
+For each size, generates a synthetic TSV into an isolated lake root
+(EUROSTAT_LAKE_ROOT) and runs every stage as its own process:
+
+    extract -> bronze -> silver -> revisions -> gold -> structural metrics
+    -> anomalies -> concentration -> quality -> report
+
+recording wall time, peak RSS and output size per stage. Results are printed
+and appended to pipeline_history.jsonl in the workdir; pass --history to keep
+a longer-lived file so scaling limits can be tracked across commits
+(benchmarks/results/ is git-ignored, so a history there never dirties the tree).
+
+    python benchmarks/bench_pipeline.py --size-mb 10 100 1000
+    python benchmarks/bench_pipeline.py --history benchmarks/results/pipeline_history.jsonl
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic_eurostat import generate  # noqa: E402
+
+HISTORY_NAME = "pipeline_history.jsonl"
+
+# (stage, script, directory whose size is reported)
+STAGES = [
+    ("extract", "src/01_extract_raw.py", "data-raw"),
+    ("bronze", "src/02_bronze_ingest.py", "data-bronze"),
+    ("silver", "src/03_silver_transform.py", "data-silver"),
+    ("revisions", "src/silver/silver_revisions.py", "data-silver/revisions"),
+    ("gold", "src/04_gold_analytics.py", "data-gold"),
+    ("structural", "src/gold/gold_structural_metrics.py", "data-gold"),
+    ("anomalies", "src/gold/gold_anomalies.py", "data-gold"),
+    ("concentration", "src/gold/gold_concentration.py", "data-gold"),
+    ("quality", "src/05_quality_checks.py", "outputs-checks"),
+    ("report", "reports/generate_gold_report.py", "reports/out"),
+]
+
+
+def dir_size(p: Path) -> int:
+    if not p.exists():
+        return 0
+    return sum(f.stat().st_size for f in p.rglob("*") if f.is_file())
+
+
+# Runs a stage script as __main__ and, at exit, writes its own peak RSS.
+# ru_maxrss of a child also counts the parent's memory from before exec, so
+# the wrapper reads VmHWM (reset on exec) from /proc when available.
+STAGE_WRAPPER = r"""
+import atexit, os, resource, runpy, sys
+script, rss_file = sys.argv[1], sys.argv[2]
+
+def _peak_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+atexit.register(lambda: open(rss_file, "w").write(str(_peak_kb())))
+sys.argv = [script]
+sys.path[0] = os.path.dirname(script)
+runpy.run_path(script, run_name="__main__")
+"""
+
+
+def run_stage(script: str, lake_root: Path) -> dict:
+    env = {**os.environ, "EUROSTAT_LAKE_ROOT": str(lake_root)}
+    rss_file = lake_root / ".stage_rss"
+    rss_file.unlink(missing_ok=True)
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", STAGE_WRAPPER, str(REPO_ROOT / script), str(rss_file)],
+        cwd=str(lake_root), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    wall = time.perf_counter() - t0
+    peak_kb = int(rss_file.read_text()) if rss_file.exists() else None
+    stderr = proc.stderr.strip()
+    return {
+        "ok": proc.returncode == 0,
+        "wall_s": round(wall, 3),
+        "max_rss_mb": round(peak_kb / 1024, 1) if peak_kb else None,
+        "stderr_tail": stderr.splitlines()[-3:] if stderr else [],
+    }
+
+
+def git_sha() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+def bench_size(size_mb: float, workdir: Path, seed: int) -> list[dict]:
+    lake_root = workdir / f"lake_{size_mb:g}MB"
+    raw = lake_root / "data-raw" / "sbs_na_ind_r2.tsv.gz"
+
+    t0 = time.perf_counter()
+    gen = generate(raw, size_mb, seed=seed)
+    print(f"[{size_mb:g} MB] generated {gen['rows']:,} rows in {time.perf_counter() - t0:.1f}s")
+
+    results = []
+    for stage, script, out_dir in STAGES:
+        res = run_stage(script, lake_root)
+        res.update({
+            "size_mb": size_mb,
+            "input_rows": gen["rows"],
+            "stage": stage,
+            "output_bytes": dir_size(lake_root / out_dir),
+        })
+        results.append(res)
+        print(f"  {stage:<13} {res['wall_s']:>8.2f}s  rss={res['max_rss_mb'] or 0:>8.1f}MB  "
+              f"out={res['output_bytes'] / 1e6:>9.2f}MB  {'OK' if res['ok'] else 'FAIL'}")
+        if not res["ok"]:
+            print("   ", "\n    ".join(res["stderr_tail"]))
+            break
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size-mb", type=float, nargs="+", default=[10, 100])
+    ap.add_argument("--workdir", type=Path, default=None, help="default: a temp dir")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--history", type=Path, default=None, help=f"JSONL to append to (default: <workdir>/{HISTORY_NAME})")
+    ap.add_argument("--no-history", action="store_true")
+    args = ap.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="eurostat_bench_"))
+    run_meta = {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_sha": git_sha(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+    print(f"workdir: {workdir}")
+
+    records = []
+    for size in args.size_mb:
+        records += [{**run_meta, **r} for r in bench_size(size, workdir, args.seed)]
+
+    if not args.no_history:
+        history = args.history or workdir / HISTORY_NAME
+        history.parent.mkdir(parents=True, exist_ok=True)
+        with history.open("a", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(r) + "\n")
+        print(f"appended {len(records)} records to {history}")
+
+
+if __name__ == "__main__":
+    main()
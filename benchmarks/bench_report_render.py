@@ -0,0 +1,105 @@
+"""
+Render-time benchmark for the HTML report.
+
+Builds a small synthetic lake (every stage up to quality, as in
+bench_pipeline.py), then runs reports/generate_gold_report.py `--repeat`
+times in a fresh process and reads its per-phase timings (PHASE_MS):
+
+    load          gold tables + dimensions
+    prepare       aggregation, rankings, CAGR/anomaly/concentration tables
+    charts        snapshot PNGs (top value, YoY, rank movers, CAGR, HHI, top-k)
+    multi_period  (country x year) pivot, trend chart, SVG small multiples
+    bundles       per-indicator data bundles for in-browser filtering (--bundles)
+    render        insights, table rows, Jinja render + write
+
+Best-of-repeat per phase is compared with REPORT_RENDER_BUDGET_MS; phases over
+budget are flagged and make the run exit non-zero with --strict.
+
+    python benchmarks/bench_report_render.py
+    python benchmarks/bench_report_render.py --size-mb 20 --repeat 5 --strict
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_pipeline import STAGES, run_stage  # noqa: E402
+from synthetic_eurostat import generate  # noqa: E402
+
+# per-phase budget in ms at the default --size-mb; ~30% headroom over a
+# warm run on a laptop-class CPU
+REPORT_RENDER_BUDGET_MS = {
+    "load": 300,
+    "prepare": 400,
+    "charts": 3000,
+    "multi_period": 450,
+    "bundles": 300,
+    "render": 150,
+    "total": 4000,
+}
+
+# imports the report as a module (so PHASE_MS is reachable) and prints it
+REPORT_RUNNER = r"""
+import json, sys
+sys.path.insert(0, sys.argv[1])
+import generate_gold_report as report
+report.main(bundles=True)
+print("PHASE_MS=" + json.dumps(report.PHASE_MS))
+"""
+
+
+def run_report(lake_root: Path) -> dict[str, float]:
+    env = {**os.environ, "EUROSTAT_LAKE_ROOT": str(lake_root)}
+    proc = subprocess.run(
+        [sys.executable, "-c", REPORT_RUNNER, str(REPO_ROOT / "reports")],
+        cwd=str(lake_root), env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"report failed:\n{proc.stderr[-2000:]}")
+    line = next(ln for ln in proc.stdout.splitlines() if ln.startswith("PHASE_MS="))
+    return json.loads(line.split("=", 1)[1])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size-mb", type=float, default=5, help="synthetic TSV size")
+    ap.add_argument("--repeat", type=int, default=3, help="report runs; best time per phase is kept")
+    ap.add_argument("--strict", action="store_true", help="exit 1 if a phase is over budget")
+    args = ap.parse_args()
+
+    lake_root = Path(tempfile.mkdtemp(prefix="eurostat_report_"))
+    generate(lake_root / "data-raw" / "sbs_na_ind_r2.tsv.gz", args.size_mb)
+    for stage, script, _ in STAGES:
+        if stage == "report":
+            continue
+        if not run_stage(script, lake_root)["ok"]:
+            raise SystemExit(f"{stage} failed ({script})")
+    print(f"lake: {lake_root}")
+
+    runs = [run_report(lake_root) for _ in range(args.repeat)]
+    best = {name: min(r[name] for r in runs) for name in runs[0]}
+
+    over = []
+    for name, ms in best.items():
+        budget_ms = REPORT_RENDER_BUDGET_MS.get(name)
+        status = "OK" if budget_ms is None or ms <= budget_ms else "OVER"
+        if status == "OVER":
+            over.append(name)
+        print(json.dumps({"phase": name, "best_ms": ms, "budget_ms": budget_ms, "status": status,
+                          "runs_ms": [r[name] for r in runs]}))
+
+    if over and args.strict:
+        raise SystemExit(f"over render budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
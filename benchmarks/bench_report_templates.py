@@ -0,0 +1,120 @@
+"""
+Template-render benchmark: many indicator reports from one process.
+
+Builds a small synthetic lake (as bench_report_render.py), runs the report
+once to capture its render context (RENDER_CONTEXT), then renders one report
+per indicator (--reports of them, cycling over the lake's indicators) with
+three strategies:
+
+    env_per_render   new Environment + template compile for every report
+                     (what main() did before template_env())
+    bytecode_cache   new Environment per report over a warm on-disk bytecode
+                     cache: the cost a fresh process pays per report
+    shared_env       render_report() on the process-wide Environment: the
+                     template is compiled once, each report is render only
+
+Reported per strategy: total and per-report time, plus the one-off cost of
+loading the template cold (parse + compile) vs from the bytecode cache.
+
+    python benchmarks/bench_report_templates.py
+    python benchmarks/bench_report_templates.py --reports 500 --size-mb 5
+
+Every report gets the main indicator's tables (only the indicator code and
+label change), so the numbers isolate template cost from data preparation.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_pipeline import STAGES, run_stage  # noqa: E402
+from synthetic_eurostat import generate  # noqa: E402
+
+TEMPLATE = "gold_report.html"
+
+
+def build_lake(size_mb: float) -> Path:
+    lake_root = Path(tempfile.mkdtemp(prefix="eurostat_templates_"))
+    generate(lake_root / "data-raw" / "sbs_na_ind_r2.tsv.gz", size_mb)
+    for stage, script, _ in STAGES:
+        if stage == "report":
+            continue
+        if not run_stage(script, lake_root)["ok"]:
+            raise SystemExit(f"{stage} failed ({script})")
+    return lake_root
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size-mb", type=float, default=2, help="synthetic TSV size")
+    ap.add_argument("--reports", type=int, default=300, help="indicator reports rendered per strategy")
+    args = ap.parse_args()
+
+    lake_root = build_lake(args.size_mb)
+    print(f"lake: {lake_root}")
+    # config is read at import: point it at the synthetic lake first
+    os.environ["EUROSTAT_LAKE_ROOT"] = str(lake_root)
+    os.chdir(lake_root)
+    sys.path.insert(0, str(REPO_ROOT / "reports"))
+    import generate_gold_report as report
+    from dimensions import load_dimensions
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+    report.main()
+    base = dict(report.RENDER_CONTEXT)
+    dim = load_dimensions()["indicator"]
+    indicators = list(zip(dim["indic_sbs"].astype(str), dim["label"].astype(str)))
+    contexts = []
+    for i in range(args.reports):
+        code, label = indicators[i % len(indicators)]
+        contexts.append({**base, "main_indicator": code, "main_indicator_label": label})
+
+    cache_dir = lake_root / ".template_cache_bench"
+    cache_dir.mkdir()
+
+    def new_env(bytecode: bool) -> Environment:
+        return Environment(
+            loader=FileSystemLoader(str(report.TEMPLATES_DIR)),
+            autoescape=select_autoescape(["html", "xml"]),
+            bytecode_cache=FileSystemBytecodeCache(str(cache_dir)) if bytecode else None,
+        )
+
+    cold_ms = [timed(lambda: new_env(False).get_template(TEMPLATE)) for _ in range(5)]
+    new_env(True).get_template(TEMPLATE)  # warms the on-disk cache
+    warm_ms = [timed(lambda: new_env(True).get_template(TEMPLATE)) for _ in range(5)]
+    print(f"\ntemplate load: compile {statistics.median(cold_ms):.1f} ms · "
+          f"from bytecode cache {statistics.median(warm_ms):.1f} ms")
+
+    shared = report.template_env(cache_dir=cache_dir)
+    strategies = {
+        "env_per_render": lambda ctx: new_env(False).get_template(TEMPLATE).render(**ctx),
+        "bytecode_cache": lambda ctx: new_env(True).get_template(TEMPLATE).render(**ctx),
+        "shared_env": lambda ctx: report.render_report(ctx, TEMPLATE, env=shared),
+    }
+    size = len(strategies["shared_env"](contexts[0]))
+    print(f"{len(contexts)} reports, {len(indicators)} indicators, ~{size / 1024:.0f} KB of HTML each\n")
+    print(f"{'strategy':<16}{'total (s)':>10}{'ms/report':>11}{'speedup':>9}")
+    baseline = None
+    for name, render in strategies.items():
+        total_ms = timed(lambda: [render(ctx) for ctx in contexts])
+        baseline = baseline or total_ms
+        print(f"{name:<16}{total_ms / 1000:>10.2f}{total_ms / len(contexts):>11.2f}{baseline / total_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Start-up / import-time benchmark for every stage entry point.
+
+Runs the pipeline on a small synthetic lake with `python -X importtime` and,
+per stage, sums the top-level imports (what the process paid before and while
+doing its work) and lists the heaviest packages. Each stage has an import
+budget (STARTUP_BUDGET_MS); stages over budget are flagged and make the run
+exit non-zero with --strict.
+
+`gold-noop` re-runs silver + revisions + gold on unchanged input: the small
+incremental case, which should exit before importing pandas/pyarrow.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --top 8 --strict
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic_eurostat import generate  # noqa: E402
+
+# (stage, script, import budget in ms); budgets leave ~30% headroom over a
+# warm-cache run on a laptop-class CPU
+STARTUP_BUDGET_MS = [
+    ("extract", "src/01_extract_raw.py", 100),
+    ("bronze", "src/02_bronze_ingest.py", 700),
+    ("silver", "src/03_silver_transform.py", 700),
+    ("revisions", "src/silver/silver_revisions.py", 700),
+    ("gold", "src/04_gold_analytics.py", 700),
+    ("structural", "src/gold/gold_structural_metrics.py", 700),
+    ("anomalies", "src/gold/gold_anomalies.py", 700),
+    ("concentration", "src/gold/gold_concentration.py", 700),
+    ("quality", "src/05_quality_checks.py", 700),
+    ("report", "reports/generate_gold_report.py", 1100),
+    ("silver-rerun", "src/03_silver_transform.py", 700),
+    ("revisions-rerun", "src/silver/silver_revisions.py", 700),
+    ("gold-noop", "src/04_gold_analytics.py", 100),
+]
+
+# "import time:  self [us] | cumulative | imported package"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int]]:
+    """Top-level imports (package, cumulative µs), in import order."""
+    out = []
+    for line in stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        # nested imports are indented by two extra spaces per level
+        if m and len(m.group(3)) == 1:
+            out.append((m.group(4), int(m.group(2))))
+    return out
+
+
+def run_importtime(script: str, lake_root: Path) -> dict:
+    env = {**os.environ, "EUROSTAT_LAKE_ROOT": str(lake_root)}
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(REPO_ROOT / script)],
+        cwd=str(lake_root), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    wall = time.perf_counter() - t0
+    imports = parse_importtime(proc.stderr)
+    return {
+        "ok": proc.returncode == 0,
+        "wall_ms": round(wall * 1000, 1),
+        "import_ms": round(sum(us for _, us in imports) / 1000, 1),
+        "imports": imports,
+    }
+
+
+def interpreter_ms(repeat: int = 5) -> float:
+    """Bare interpreter start-up (python -c pass), best of `repeat`."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        best = min(best, time.perf_counter() - t0)
+    return round(best * 1000, 1)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size-mb", type=float, default=1, help="synthetic TSV size")
+    ap.add_argument("--top", type=int, default=5, help="heaviest top-level imports listed per stage")
+    ap.add_argument("--strict", action="store_true", help="exit 1 if a stage is over budget")
+    args = ap.parse_args()
+
+    lake_root = Path(tempfile.mkdtemp(prefix="eurostat_startup_"))
+    generate(lake_root / "data-raw" / "sbs_na_ind_r2.tsv.gz", args.size_mb)
+    print(f"lake: {lake_root}  interpreter start-up: {interpreter_ms()} ms")
+
+    over = []
+    for stage, script, budget_ms in STARTUP_BUDGET_MS:
+        res = run_importtime(script, lake_root)
+        if not res["ok"]:
+            raise SystemExit(f"{stage} failed ({script})")
+        heaviest = sorted(res["imports"], key=lambda x: -x[1])[: args.top]
+        status = "OK" if res["import_ms"] <= budget_ms else "OVER"
+        if status == "OVER":
+            over.append(stage)
+        print(json.dumps({
+            "stage": stage,
+            "import_ms": res["import_ms"],
+            "budget_ms": budget_ms,
+            "status": status,
+            "wall_ms": res["wall_ms"],
+            "top_imports_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+        }))
+
+    if over and args.strict:
+        raise SystemExit(f"over start-up budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Storage-policy benchmark (see STORAGE_POLICIES in src/config.py).
+
+Runs the full pipeline on the same synthetic input once per policy (each in
+its own lake root, EUROSTAT_STORAGE_POLICY set for every stage) and compares
+peak RSS per stage and the Parquet bytes written per layer:
+
+    python benchmarks/bench_storage_policy.py --size-mb 50
+    python benchmarks/bench_storage_policy.py --size-mb 200 --policies wide compact
+
+"wide" is the pre-policy layout (int64 years, float64 metrics, string dims);
+"compact" is the default (int16 years, float32 derived metrics, dictionary
+dims). Only *.parquet files are counted, so the gold IPC snapshots and the
+report do not blur the comparison.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import os
+import sys
+import tempfile
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from bench_pipeline import STAGES, run_stage  # noqa: E402
+from config import STORAGE_POLICIES  # noqa: E402
+from synthetic_eurostat import generate  # noqa: E402
+
+LAYERS = ["data-bronze", "data-silver", "data-gold"]
+
+
+def parquet_bytes(p: Path) -> int:
+    if not p.exists():
+        return 0
+    return sum(f.stat().st_size for f in p.rglob("*.parquet"))
+
+
+def bench_policy(policy: str, size_mb: float, workdir: Path, seed: int) -> dict:
+    lake_root = workdir / policy
+    generate(lake_root / "data-raw" / "sbs_na_ind_r2.tsv.gz", size_mb, seed=seed)
+    os.environ["EUROSTAT_STORAGE_POLICY"] = policy
+
+    rss = {}
+    for stage, script, _ in STAGES:
+        res = run_stage(script, lake_root)
+        if not res["ok"]:
+            raise SystemExit(f"[{policy}] {stage} failed: {res['stderr_tail']}")
+        rss[stage] = res["max_rss_mb"] or 0.0
+    return {"rss": rss, "bytes": {layer: parquet_bytes(lake_root / layer) for layer in LAYERS}}
+
+
+def pct(before: float, after: float) -> str:
+    return f"{(after - before) / before:+.1%}" if before else "n/a"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size-mb", type=float, default=50)
+    ap.add_argument("--policies", nargs=2, default=["wide", "compact"], choices=sorted(STORAGE_POLICIES),
+                    metavar="POLICY", help="baseline and candidate (default: wide compact)")
+    ap.add_argument("--workdir", type=Path, default=None, help="default: a temp dir")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="eurostat_storage_"))
+    base, cand = args.policies
+    print(f"workdir: {workdir}  size: {args.size_mb:g} MB")
+    results = {p: bench_policy(p, args.size_mb, workdir, args.seed) for p in (base, cand)}
+
+    print(f"\n{'peak RSS (MB)':<16}{base:>10}{cand:>10}{'delta':>10}")
+    for stage, _, _ in STAGES:
+        b, c = results[base]["rss"][stage], results[cand]["rss"][stage]
+        print(f"  {stage:<14}{b:>10.1f}{c:>10.1f}{pct(b, c):>10}")
+    b, c = max(results[base]["rss"].values()), max(results[cand]["rss"].values())
+    print(f"  {'pipeline max':<14}{b:>10.1f}{c:>10.1f}{pct(b, c):>10}")
+
+    print(f"\n{'parquet (MB)':<16}{base:>10}{cand:>10}{'delta':>10}")
+    for layer in LAYERS:
+        b, c = results[base]["bytes"][layer] / 1e6, results[cand]["bytes"][layer] / 1e6
+        print(f"  {layer:<14}{b:>10.2f}{c:>10.2f}{pct(b, c):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Synthetic Eurostat SBS TSV generator.
+
+Writes a file shaped like the real export:
+
+    freq,nace_r2,indic_sbs,geo\\TIME_PERIOD<TAB>2005 <TAB>2006 ...
+    A,C10,V12110,DE<TAB>1234.5 <TAB>: <TAB>1301.2 p ...
+
+with ':' for missing cells and 'p'/'e' flags, at a target (uncompressed) size.
+Rows are random walks per (nace_r2, indic_sbs, geo) series, so YoY/CAGR look
+plausible. Output is streamed in chunks, so tens of GB only cost disk.
+
+    python benchmarks/synthetic_eurostat.py --size-mb 100 --out data-raw/sbs_na_ind_r2.tsv.gz
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import gzip
+import itertools
+
+import numpy as np
+import pandas as pd
+
+GEOS = [
+    "AT", "BE", "BG", "CY", "CZ", "DE", "DK", "EE", "EL", "ES", "FI", "FR", "HR", "HU",
+    "IE", "IT", "LT", "LU", "LV", "MT", "NL", "PL", "PT", "RO", "SE", "SI", "SK",
+    "NO", "CH", "IS", "TR", "RS", "MK", "BA", "ME", "AL",
+    "EU27_2020", "EU28", "EA19", "EA20",
+]
+INDICATORS = [
+    "V11110", "V11210", "V12110", "V12120", "V12130", "V12150", "V13110", "V13310",
+    "V13320", "V15110", "V16110", "V16130", "V91100", "V91110", "V91120", "V91210",
+]
+NACE_SECTIONS = list("BCDEFGHIJLMNS")
+
+MISSING_RATE = 0.12
+FLAG_RATES = {"p": 0.05, "e": 0.03}
+
+
+def nace_codes():
+    """Real-looking NACE codes first (sections, divisions), then synthetic groups."""
+    for s in NACE_SECTIONS:
+        yield s
+    for s in NACE_SECTIONS:
+        for d in range(10, 100):
+            yield f"{s}{d}"
+    for i in itertools.count():
+        s = NACE_SECTIONS[i % len(NACE_SECTIONS)]
+        yield f"{s}{10 + (i // len(NACE_SECTIONS)) % 90}{i:04d}"
+
+
+def series_keys():
+    for nace in nace_codes():
+        for indic in INDICATORS:
+            for geo in GEOS:
+                yield f"A,{nace},{indic},{geo}"
+
+
+def make_chunk(keys: list[str], years: list[int], rng: np.random.Generator) -> pd.DataFrame:
+    n, t = len(keys), len(years)
+    base = rng.lognormal(mean=8.0, sigma=2.0, size=(n, 1))
+    growth = rng.normal(loc=0.02, scale=0.08, size=(n, t))
+    values = base * np.exp(np.cumsum(growth, axis=1))
+
+    cells = pd.DataFrame(values.round(1)).astype(str)
+    u = rng.random(size=(n, t))
+    flag = np.full((n, t), " ", dtype=object)
+    acc = 0.0
+    for f, rate in FLAG_RATES.items():
+        flag[(u >= acc) & (u < acc + rate)] = f" {f}"
+        acc += rate
+    cells = cells + pd.DataFrame(flag)
+    cells = cells.mask(rng.random(size=(n, t)) < MISSING_RATE, ": ")
+
+    cells.columns = [f"{y} " for y in years]
+    cells.insert(0, "key", keys)
+    return cells
+
+
+def generate(out: Path, size_mb: float, year_min: int = 2005, year_max: int = 2022,
+             chunk_rows: int = 50_000, seed: int = 42) -> dict:
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    years = list(range(year_min, year_max + 1))
+    rng = np.random.default_rng(seed)
+    target = int(size_mb * 1024 * 1024)
+
+    opener = gzip.open if out.suffix == ".gz" else open
+    kwargs = {"compresslevel": 1} if out.suffix == ".gz" else {}
+    header = "freq,nace_r2,indic_sbs,geo\\TIME_PERIOD\t" + "\t".join(f"{y} " for y in years) + "\n"
+
+    written, rows = len(header), 0
+    keys = series_keys()
+    with opener(out, "wt", encoding="utf-8", newline="", **kwargs) as f:
+        f.write(header)
+        while written < target:
+            batch = list(itertools.islice(keys, chunk_rows))
+            text = make_chunk(batch, years, rng).to_csv(sep="\t", header=False, index=False)
+            # last chunk: cut at the target size on a line boundary
+            if written + len(text) > target:
+                cut = text.rfind("\n", 0, target - written) + 1
+                text = text[:cut] if cut > 0 else text[:text.find("\n") + 1]
+            f.write(text)
+            written += len(text)
+            rows += text.count("\n")
+
+    return {"path": str(out), "rows": rows, "years": len(years), "uncompressed_bytes": written,
+            "file_bytes": out.stat().st_size}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size-mb", type=float, required=True, help="target uncompressed size")
+    ap.add_argument("--out", type=Path, required=True, help=".tsv or .tsv.gz")
+    ap.add_argument("--year-min", type=int, default=2005)
+    ap.add_argument("--year-max", type=int, default=2022)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    print(generate(args.out, args.size_mb, args.year_min, args.year_max, seed=args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,15 @@ from pathlib import Path
 from datetime import datetime, timezone
 import math
 import json
+import sys
+import time
+import warnings
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+# matplotlib e jinja2 são importados só onde são usados (save_bar_chart / render),
+# e matplotlib via Figure + Agg, sem pyplot: start-up bem menor
 
 
 # =========================================================
@@ -34,28 +38,86 @@ CAGR_CLIP_ABS_FOR_CHART: float = 50.0   # (%)
 # Mínimo de anos para aceitar CAGR (melhora coerência)
 CAGR_MIN_YEARS: int = 5
 
+# Multi-período: linhas de tendência + small multiples (SVG inline) dos
+# top-N países do último ano, em todos os anos do indicador principal
+TREND_TOP_N: int = TOP_N
+SPARK_WIDTH: int = 180
+SPARK_HEIGHT: int = 48
+
+# Modo interativo (--bundles): um bundle por indicador (valores, YoY, ranks,
+# CAGR) em reports/out/data/ e filtro no navegador; um run cobre todos os
+# indicadores e anos. Dígitos significativos guardados nos valores.
+EXPORT_BUNDLES: bool = False
+BUNDLE_DIGITS: int = 6
+
+# Tendências de qualidade: últimos N runs do histórico (outputs-checks/quality_history/)
+QUALITY_TREND_RUNS: int = 20
+QUALITY_TREND_METRICS: list[tuple[str, str]] = [
+    ("bronze", "rows"),
+    ("silver", "rows"),
+    ("silver", "null_rate_value_num"),
+    ("gold_country_indicator_year", "rows"),
+    ("gold_yoy_growth", "rows"),
+    ("gold_anomalies", "outlier_rate"),
+    ("run", "errors"),
+]
+
 
 # =========================================================
 # PATHS
 # =========================================================
 REPO_ROOT = Path(__file__).resolve().parents[1]
-GOLD_DIR = REPO_ROOT / "data-gold"
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from config import DATA_GOLD, OUTPUTS_CHECKS, REPORT_TEMPLATE_CACHE_DIR, REPORTS_OUT  # noqa: E402
+from contracts import guaranteed  # noqa: E402
+from dimensions import codes_by_id, country_mask, labels_by_id, load_dimensions, lookup_id  # noqa: E402
+from lake_io import read_gold  # noqa: E402
+from quality_history import load as load_quality_history, trends as quality_trends  # noqa: E402
 
-OUT_DIR = Path(__file__).resolve().parent / "out"
+GOLD_DIR = DATA_GOLD
+
+OUT_DIR = REPORTS_OUT
 ASSETS_DIR = OUT_DIR / "assets"
 TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+BUNDLES_DIR = OUT_DIR / "data"
 
-CHECKS_DIR = REPO_ROOT / "outputs-checks"
+CHECKS_DIR = OUTPUTS_CHECKS
 QUALITY_REPORT_JSON = CHECKS_DIR / "quality_report.json"
 
 GOLD_COUNTRY_INDICATOR_YEAR = GOLD_DIR / "gold_country_indicator_year.parquet"
 GOLD_YOY_GROWTH = GOLD_DIR / "gold_yoy_growth.parquet"
 GOLD_STRUCTURAL_METRICS = GOLD_DIR / "gold_structural_metrics.parquet"
+GOLD_ANOMALIES = GOLD_DIR / "gold_anomalies.parquet"
+GOLD_GEO_SHARE = GOLD_DIR / "gold_geo_share.parquet"
+GOLD_CONCENTRATION = GOLD_DIR / "gold_concentration.parquet"
 
 
 # =========================================================
 # HELPERS
 # =========================================================
+# tempo (ms) de cada fase do último main(); lido por benchmarks/bench_report_render.py
+PHASE_MS: dict[str, float] = {}
+# contexto do último render do main(); lido por benchmarks/bench_report_templates.py
+RENDER_CONTEXT: dict = {}
+
+
+class Laps:
+    """Cronômetro de voltas: laps("fase") grava o tempo desde a volta anterior."""
+
+    def __init__(self) -> None:
+        self.start = self.t0 = time.perf_counter()
+        self.ms: dict[str, float] = {}
+
+    def __call__(self, name: str) -> None:
+        now = time.perf_counter()
+        self.ms[name] = round((now - self.t0) * 1000, 1)
+        self.t0 = now
+
+    def total(self) -> float:
+        return round((time.perf_counter() - self.start) * 1000, 1)
+
+
 def ensure_dirs() -> None:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     ASSETS_DIR.mkdir(parents=True, exist_ok=True)
@@ -130,52 +192,75 @@ def read_quality_report() -> dict | None:
         return None
 
 
-def is_country_geo(geo: str) -> bool:
-    """
-    Heurística simples para remover agregados típicos:
-    EU27_2020, EA19_2020, EA, EU, etc.
-    Mantém códigos país (2 letras) e alguns casos comuns.
-    """
-    if geo is None:
-        return False
-    g = str(geo).strip().upper()
-
-    if "_" in g:
-        return False
+def fmt_metric(metric: str, x: float) -> str:
+    if metric.endswith("rate") or metric.startswith("null_rate"):
+        return pct2(x * 100.0)
+    return human_number(x, decimals=1) if abs(x) >= 1e3 else f"{x:g}"
 
-    if g.startswith("EU") or g.startswith("EA"):
-        return False
 
-    if g in {"EU", "EA"}:
-        return False
+def build_quality_trends() -> dict | None:
+    """
+    Uma sparkline por métrica de QUALITY_TREND_METRICS nos últimos runs,
+    direto do histórico Parquet (sem ler os JSON dos runs antigos).
+    """
+    wide = quality_trends(load_quality_history(), QUALITY_TREND_METRICS, last=QUALITY_TREND_RUNS)
+    if len(wide) < 2:
+        return None
+    mat = wide[pd.MultiIndex.from_tuples(QUALITY_TREND_METRICS)].to_numpy(np.float64).T
+    rows = []
+    for (table, metric), row, d in zip(QUALITY_TREND_METRICS, mat, sparkline_paths(mat)):
+        observed = row[~np.isnan(row)]
+        if not len(observed):
+            continue
+        rows.append({
+            "name": f"{table} · {metric}",
+            "path": d,
+            "latest": fmt_metric(metric, observed[-1]),
+            "min": fmt_metric(metric, observed.min()),
+            "max": fmt_metric(metric, observed.max()),
+        })
+    return {
+        "n_runs": len(wide),
+        "first_run": str(wide["run_id"].iloc[0]),
+        "last_run": str(wide["run_id"].iloc[-1]),
+        "metrics": rows,
+    }
 
-    if len(g) in (2, 3):
-        return True
 
-    return False
+def pick_main_indicator(df_top: pd.DataFrame, dim_indicator: pd.DataFrame) -> int | None:
+    if df_top.empty or "indic_id" not in df_top.columns:
+        return None
+    if FORCE_INDICATOR:
+        forced = lookup_id(dim_indicator, "indic_sbs", "indic_id", FORCE_INDICATOR)
+        if forced is not None and (df_top["indic_id"] == forced).any():
+            return forced
+    return int(df_top["indic_id"].mode().iloc[0])
 
 
-def pick_main_indicator(df_top: pd.DataFrame) -> str | None:
-    if df_top.empty or "indic_sbs" not in df_top.columns:
-        return None
-    if FORCE_INDICATOR and (df_top["indic_sbs"] == FORCE_INDICATOR).any():
-        return FORCE_INDICATOR
-    return str(df_top["indic_sbs"].mode().iloc[0])
+def attach_geo(df: pd.DataFrame, geo_codes, geo_labels=None) -> pd.DataFrame:
+    """Decodifica geo_id -> geo (e rótulo) só nas tabelas pequenas que vão para o HTML."""
+    if df.empty or "geo_id" not in df.columns:
+        return df
+    df = df.copy()
+    df["geo"] = geo_codes[df["geo_id"].to_numpy()]
+    if geo_labels is not None:
+        df["geo_label"] = geo_labels[df["geo_id"].to_numpy()]
+    return df
 
 
 def compute_coverage(df_top: pd.DataFrame, df_yoy: pd.DataFrame, df_struct: pd.DataFrame) -> dict:
     cov: dict = {}
 
     cov["top_rows"] = int(len(df_top))
-    cov["top_countries"] = int(df_top["geo"].nunique()) if "geo" in df_top.columns else 0
-    cov["top_indicators"] = int(df_top["indic_sbs"].nunique()) if "indic_sbs" in df_top.columns else 0
+    cov["top_countries"] = int(df_top["geo_id"].nunique()) if "geo_id" in df_top.columns else 0
+    cov["top_indicators"] = int(df_top["indic_id"].nunique()) if "indic_id" in df_top.columns else 0
     cov["top_year_min"] = int(df_top["year"].min()) if "year" in df_top.columns and len(df_top) else None
     cov["top_year_max"] = int(df_top["year"].max()) if "year" in df_top.columns and len(df_top) else None
     cov["top_missing_value_pct"] = float(df_top["value"].isna().mean() * 100.0) if "value" in df_top.columns and len(df_top) else 0.0
 
     cov["yoy_rows"] = int(len(df_yoy))
-    cov["yoy_countries"] = int(df_yoy["geo"].nunique()) if "geo" in df_yoy.columns else 0
-    cov["yoy_indicators"] = int(df_yoy["indic_sbs"].nunique()) if "indic_sbs" in df_yoy.columns else 0
+    cov["yoy_countries"] = int(df_yoy["geo_id"].nunique()) if "geo_id" in df_yoy.columns else 0
+    cov["yoy_indicators"] = int(df_yoy["indic_id"].nunique()) if "indic_id" in df_yoy.columns else 0
     cov["yoy_year_min"] = int(df_yoy["year"].min()) if "year" in df_yoy.columns and len(df_yoy) else None
     cov["yoy_year_max"] = int(df_yoy["year"].max()) if "year" in df_yoy.columns and len(df_yoy) else None
     cov["yoy_missing_pct"] = float(df_yoy["yoy_pct"].isna().mean() * 100.0) if "yoy_pct" in df_yoy.columns and len(df_yoy) else 0.0
@@ -188,26 +273,26 @@ def compute_coverage(df_top: pd.DataFrame, df_yoy: pd.DataFrame, df_struct: pd.D
 
 # ---------- THE FIX (your data has duplicate rows per (geo,indic,year)) ----------
 def agg_country_year_value(df: pd.DataFrame) -> pd.DataFrame:
-    needed = {"geo", "indic_sbs", "year", "value"}
+    needed = {"geo_id", "indic_id", "year", "value"}
     if not needed.issubset(df.columns) or df.empty:
         return df
 
     out = (
-        df.dropna(subset=["geo", "indic_sbs", "year"])
-          .groupby(["geo", "indic_sbs", "year"], as_index=False)["value"]
+        df.dropna(subset=["geo_id", "indic_id", "year"])
+          .groupby(["geo_id", "indic_id", "year"], as_index=False)["value"]
           .sum()
     )
     return out
 
 
 def agg_country_year_yoy(df: pd.DataFrame) -> pd.DataFrame:
-    needed = {"geo", "indic_sbs", "year", "value", "value_prev"}
+    needed = {"geo_id", "indic_id", "year", "value", "value_prev"}
     if not needed.issubset(df.columns) or df.empty:
         return df
 
     out = (
-        df.dropna(subset=["geo", "indic_sbs", "year"])
-          .groupby(["geo", "indic_sbs", "year"], as_index=False)[["value", "value_prev"]]
+        df.dropna(subset=["geo_id", "indic_id", "year"])
+          .groupby(["geo_id", "indic_id", "year"], as_index=False)[["value", "value_prev"]]
           .sum()
     )
 
@@ -219,13 +304,13 @@ def agg_country_year_yoy(df: pd.DataFrame) -> pd.DataFrame:
 
 def dedupe_structural(df_struct: pd.DataFrame) -> pd.DataFrame:
     """
-    Se a tabela estrutural tiver duplicados por geo/indic, pegamos a melhor linha:
+    Se a tabela estrutural tiver duplicados por geo_id/indic_id, pegamos a melhor linha:
     - maior n_years
     - maior year_last
     """
     if df_struct.empty:
         return df_struct
-    if not {"geo", "indic_sbs"}.issubset(df_struct.columns):
+    if not {"geo_id", "indic_id"}.issubset(df_struct.columns):
         return df_struct
 
     tmp = df_struct
@@ -241,11 +326,11 @@ def dedupe_structural(df_struct: pd.DataFrame) -> pd.DataFrame:
         tmp["year_last"] = pd.NA
 
     tmp = tmp.sort_values(
-        by=["geo", "indic_sbs", "n_years", "year_last"],
+        by=["geo_id", "indic_id", "n_years", "year_last"],
         ascending=[True, True, False, False],
         kind="mergesort",
     )
-    tmp = tmp.drop_duplicates(subset=["geo", "indic_sbs"], keep="first")
+    tmp = tmp.drop_duplicates(subset=["geo_id", "indic_id"], keep="first")
     return tmp
 
 
@@ -270,7 +355,9 @@ def save_bar_chart(
     if clip_abs is not None:
         plot_df[y_col] = plot_df[y_col].clip(lower=-abs(clip_abs), upper=abs(clip_abs))
 
-    fig = plt.figure(figsize=(10.5, 4.8))
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10.5, 4.8))
     ax = fig.add_subplot(111)
 
     ax.bar(plot_df[x_col], plot_df[y_col])
@@ -281,7 +368,284 @@ def save_bar_chart(
 
     fig.tight_layout()
     fig.savefig(outpath, dpi=170)
-    plt.close(fig)
+
+
+def save_line_chart(
+    df: pd.DataFrame,
+    title: str,
+    outpath: Path,
+    x_col: str,
+    y_cols: dict[str, str],
+    y_label: str,
+) -> None:
+    """Uma linha por coluna de y_cols ({label: coluna}), eixo x = anos."""
+    if df.empty:
+        return
+
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10.5, 4.8))
+    ax = fig.add_subplot(111)
+    for label, col in y_cols.items():
+        ax.plot(df[x_col], df[col], marker="o", label=label)
+    ax.set_title(title)
+    ax.set_xlabel("Year")
+    ax.set_ylabel(y_label)
+    ax.legend()
+
+    fig.tight_layout()
+    fig.savefig(outpath, dpi=170)
+
+
+# =========================================================
+# MULTI-PERIOD (tendência + small multiples)
+# =========================================================
+def pivot_geo_year(df: pd.DataFrame, geo_ids: np.ndarray, years: np.ndarray, col: str = "value") -> np.ndarray:
+    """
+    Matriz (len(geo_ids) x len(years)) com df[col], NaN onde não há ponto.
+    Um único scatter por índice inteiro (geo_id -> linha, year -> coluna),
+    em vez de um filtro por país; df tem uma linha por (geo_id, year).
+    """
+    mat = np.full((len(geo_ids), len(years)), np.nan)
+    if df.empty or not len(geo_ids):
+        return mat
+    geo = df["geo_id"].to_numpy(np.int64)
+    row_of = np.full(max(int(geo.max()), int(geo_ids.max())) + 1, -1)
+    row_of[geo_ids] = np.arange(len(geo_ids))
+    rows = row_of[geo]
+    year = df["year"].to_numpy(np.int64)
+    cols = np.minimum(np.searchsorted(years, year), len(years) - 1)
+    keep = (rows >= 0) & (years[cols] == year)
+    mat[rows[keep], cols[keep]] = df[col].to_numpy(np.float64, na_value=np.nan)[keep]
+    return mat
+
+
+def index_to_first(mat: np.ndarray) -> np.ndarray:
+    """Cada linha dividida pelo seu primeiro valor observado (= 100)."""
+    observed = ~np.isnan(mat)
+    first = np.where(observed.any(axis=1), mat[np.arange(len(mat)), observed.argmax(axis=1)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(first[:, None] > 0, mat / first[:, None] * 100.0, np.nan)
+
+
+def save_trend_chart(years: np.ndarray, mat: np.ndarray, labels: list[str], title: str, outpath: Path) -> None:
+    """Todas as séries numa figura e numa chamada de plot (colunas de mat.T)."""
+    if not mat.size:
+        return
+
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10.5, 4.8))
+    ax = fig.add_subplot(111)
+    lines = ax.plot(years, mat.T, marker="o", markersize=3, linewidth=1.4)
+    ax.axhline(100.0, color="#999999", linewidth=0.8, linestyle="--")
+    ax.set_title(title)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Index (first year = 100)")
+    ax.legend(lines, labels, ncol=5, fontsize=8)
+
+    fig.tight_layout()
+    fig.savefig(outpath, dpi=170)
+
+
+def sparkline_paths(mat: np.ndarray, width: int = SPARK_WIDTH, height: int = SPARK_HEIGHT, pad: float = 3.0) -> list[str]:
+    """
+    Atributo `d` de um <path> SVG por linha de mat, cada uma na sua própria
+    escala (min/max da série). A escala é calculada para a matriz inteira de
+    uma vez; lacunas (NaN) quebram a linha (novo "M").
+    """
+    n_rows, n_cols = mat.shape
+    if not n_rows or not n_cols:
+        return [""] * n_rows
+    xs = np.linspace(pad, width - pad, n_cols) if n_cols > 1 else np.full(1, width / 2)
+    with warnings.catch_warnings():
+        # linha toda NaN: nanmin/nanmax avisam e devolvem NaN (path vazio)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        lo = np.nanmin(mat, axis=1, keepdims=True)
+        hi = np.nanmax(mat, axis=1, keepdims=True)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    ys = height - pad - (mat - lo) / span * (height - 2 * pad)
+
+    paths = []
+    for row in ys:
+        parts, pen_down = [], False
+        for x, y in zip(xs, row):
+            if np.isnan(y):
+                pen_down = False
+                continue
+            parts.append(f"{'L' if pen_down else 'M'}{x:.1f},{y:.1f}")
+            pen_down = True
+        paths.append(" ".join(parts))
+    return paths
+
+
+def build_small_multiples(years: np.ndarray, mat: np.ndarray, labels: list[str]) -> list[dict]:
+    paths = sparkline_paths(mat)
+    out = []
+    for label, row, d in zip(labels, mat, paths):
+        observed = np.flatnonzero(~np.isnan(row))
+        if not len(observed):
+            continue
+        i0, i1 = observed[0], observed[-1]
+        first, last = row[i0], row[i1]
+        out.append({
+            "geo": label,
+            "path": d,
+            "period": f"{int(years[i0])}→{int(years[i1])}",
+            "first": human_number(first),
+            "last": human_number(last),
+            "change": pct1((last / first - 1.0) * 100.0) if first > 0 else "—",
+            "n_years": int(len(observed)),
+        })
+    return out
+
+
+# =========================================================
+# DATA BUNDLES (modo interativo)
+# =========================================================
+def _short(v: float, digits: int) -> float | int | None:
+    if not math.isfinite(v):
+        return None
+    v = float(f"{v:.{digits}g}")
+    # 173981 em vez de 173981.0 no JSON
+    return int(v) if v.is_integer() and abs(v) < 2**53 else v
+
+
+def compact(values: np.ndarray, digits: int = BUNDLE_DIGITS) -> list:
+    """Lista JSON com `digits` dígitos significativos; NaN/inf -> null."""
+    return [_short(v, digits) for v in values.tolist()]
+
+
+def indicator_bundle(
+    code: str,
+    top: pd.DataFrame,
+    yoy: pd.DataFrame,
+    struct: pd.DataFrame,
+) -> dict:
+    """
+    Bundle de um indicador, em matrizes (país x ano) sobre a grade contínua
+    de anos year0..year0+n_years-1; países como geo_id (decodificados pelo
+    índice), então cada célula custa só o número.
+    """
+    geo_ids = np.unique(top["geo_id"].to_numpy(np.int64))
+    years = top["year"].to_numpy(np.int64)
+    grid = np.arange(years.min(), years.max() + 1)
+
+    value = pivot_geo_year(top, geo_ids, grid)
+    # dense rank por ano (1 = maior valor), como no ranking do relatório
+    rank = pd.DataFrame(value).rank(axis=0, method="dense", ascending=False).to_numpy()
+
+    yoy = yoy.loc[yoy["value_prev"].fillna(0).to_numpy() >= YOY_MIN_PREV_VALUE]
+    yoy_mat = pivot_geo_year(yoy, geo_ids, grid, col="yoy_pct")
+
+    cagr = np.full(len(geo_ids), np.nan)
+    if len(struct):
+        struct = struct.loc[struct["n_years"].fillna(0).to_numpy() >= CAGR_MIN_YEARS]
+        pos = np.searchsorted(geo_ids, struct["geo_id"].to_numpy(np.int64))
+        found = (pos < len(geo_ids)) & (geo_ids[np.minimum(pos, len(geo_ids) - 1)] == struct["geo_id"].to_numpy())
+        cagr[pos[found]] = struct["cagr_pct"].to_numpy(np.float64)[found]
+
+    return {
+        "indic": code,
+        "year0": int(grid[0]),
+        "n_years": int(len(grid)),
+        "geo": geo_ids.tolist(),
+        "value": [compact(row) for row in value],
+        "yoy": [compact(row, 4) for row in yoy_mat],
+        "rank": [[int(r) if r == r else None for r in row] for row in rank.tolist()],
+        "cagr": compact(cagr, 4),
+    }
+
+
+def write_bundles(
+    df_top: pd.DataFrame,
+    df_yoy: pd.DataFrame,
+    df_struct: pd.DataFrame,
+    geo_codes: np.ndarray,
+    indic_codes: np.ndarray,
+    geo_labels: np.ndarray | None = None,
+    indic_labels: np.ndarray | None = None,
+) -> dict:
+    """
+    Grava data/<indicador>.js por indicador e devolve o índice (embutido no
+    HTML). O JSON vai embrulhado em goldBundle(...) para o navegador carregar
+    via <script>, o que funciona também abrindo o HTML direto do disco
+    (fetch() de file:// é bloqueado).
+    """
+    BUNDLES_DIR.mkdir(parents=True, exist_ok=True)
+    for old in BUNDLES_DIR.glob("*.js"):
+        old.unlink()
+
+    # um sort por tabela; cada indicador vira uma fatia contígua
+    yoy_parts = dict(iter(df_yoy.groupby("indic_id", sort=False)))
+    struct_parts = dict(iter(df_struct.groupby("indic_id", sort=False)))
+    empty_struct = df_struct.iloc[:0]
+
+    indicators = []
+    for indic_id, top in df_top.groupby("indic_id", sort=True):
+        top = top.dropna(subset=["value"])
+        if top.empty:
+            continue
+        code = str(indic_codes[int(indic_id)])
+        bundle = indicator_bundle(
+            code, top, yoy_parts.get(indic_id, df_yoy.iloc[:0]), struct_parts.get(indic_id, empty_struct)
+        )
+        payload = "goldBundle(" + json.dumps(bundle, separators=(",", ":")) + ");\n"
+        path = BUNDLES_DIR / f"{code}.js"
+        path.write_text(payload, encoding="utf-8")
+        indicators.append({
+            "code": code,
+            "label": str(indic_labels[int(indic_id)]) if indic_labels is not None else code,
+            "file": path.name,
+            "year0": bundle["year0"],
+            "n_years": bundle["n_years"],
+            "n_geo": len(bundle["geo"]),
+            "bytes": len(payload.encode("utf-8")),
+        })
+
+    return {
+        "base": str(BUNDLES_DIR.relative_to(OUT_DIR)).replace("\\", "/"),
+        "geo": [str(g) for g in geo_codes],
+        "geo_label": [str(g) for g in (geo_labels if geo_labels is not None else geo_codes)],
+        "indicators": indicators,
+        "yoy_prev_threshold": YOY_MIN_PREV_VALUE,
+        "cagr_min_years": CAGR_MIN_YEARS,
+    }
+
+
+# =========================================================
+# RENDER (Jinja)
+# =========================================================
+# um Environment por (templates, cache) no processo: cada template é
+# compilado uma vez e fica no cache em memória do Environment; com cache em
+# disco, um processo novo carrega o bytecode em vez de compilar
+_ENVS: dict[tuple[str, str | None], object] = {}
+
+
+def template_env(templates_dir: Path = TEMPLATES_DIR, cache_dir: Path | None = REPORT_TEMPLATE_CACHE_DIR):
+    key = (str(templates_dir), str(cache_dir) if cache_dir else None)
+    if key not in _ENVS:
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+        bytecode_cache = None
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+        _ENVS[key] = Environment(
+            loader=FileSystemLoader(str(templates_dir)),
+            autoescape=select_autoescape(["html", "xml"]),
+            bytecode_cache=bytecode_cache,
+        )
+    return _ENVS[key]
+
+
+def render_report(context: dict, template: str = "gold_report.html", env=None) -> str:
+    """
+    Renderiza o relatório a partir do contexto (mesmas chaves que o main()
+    monta). Reaproveitável em muitos renders no mesmo processo: o template
+    sai compilado do Environment compartilhado (template_env()).
+    """
+    return (env or template_env()).get_template(template).render(**context)
 
 
 # =========================================================
@@ -292,6 +656,7 @@ def build_rows_value(df: pd.DataFrame) -> list[dict]:
     for _, r in df.iterrows():
         rows.append({
             "geo": r.get("geo", "—"),
+            "geo_label": r.get("geo_label", ""),
             "year": fmt_year(r.get("year")),
             "value": human_number(r.get("value")),
         })
@@ -316,11 +681,13 @@ def build_rows_yoy(df: pd.DataFrame) -> list[dict]:
 
         rows.append({
             "geo": r.get("geo", "—"),
+            "geo_label": r.get("geo_label", ""),
             "year": fmt_year(r.get("year")),
             "value": human_number(value),
             "prev": human_number(prev),
             "delta_abs": human_number(delta_abs),  # NOVO
             "yoy": pct1(r.get("yoy_pct")),         # 1 casa como você pediu
+            "anomaly": r.get("anomaly", ""),
         })
     return rows
 
@@ -330,6 +697,7 @@ def build_rows_rank_delta(df: pd.DataFrame) -> list[dict]:
     for _, r in df.iterrows():
         rows.append({
             "geo": r.get("geo", "—"),
+            "geo_label": r.get("geo_label", ""),
             "rank_base": int(r.get("rank_base")) if pd.notna(r.get("rank_base")) else None,
             "rank_last": int(r.get("rank_last")) if pd.notna(r.get("rank_last")) else None,
             "rank_delta": int(r.get("rank_delta")) if pd.notna(r.get("rank_delta")) else None,
@@ -340,11 +708,48 @@ def build_rows_rank_delta(df: pd.DataFrame) -> list[dict]:
     return rows
 
 
+def anomaly_label(is_outlier: bool, is_break: bool) -> str:
+    if is_outlier and is_break:
+        return "outlier + break"
+    return "outlier" if is_outlier else ("break" if is_break else "")
+
+
+def build_rows_anomalies(df: pd.DataFrame) -> list[dict]:
+    rows: list[dict] = []
+    for _, r in df.iterrows():
+        growth = r.get("log_growth")
+        rows.append({
+            "geo": r.get("geo", "—"),
+            "geo_label": r.get("geo_label", ""),
+            "year": fmt_year(r.get("year")),
+            "value": human_number(r.get("value")),
+            "yoy": pct1(math.expm1(growth) * 100.0) if pd.notna(growth) else "—",
+            "z": f"{r.get('score'):.1f}",
+            "kind": anomaly_label(bool(r.get("is_outlier")), bool(r.get("is_break"))),
+        })
+    return rows
+
+
+def build_rows_share(df: pd.DataFrame) -> list[dict]:
+    rows: list[dict] = []
+    for _, r in df.iterrows():
+        rows.append({
+            "rank": int(r.get("rank")),
+            "geo": r.get("geo", "—"),
+            "geo_label": r.get("geo_label", ""),
+            "value": human_number(r.get("value")),
+            "share": pct1(r.get("share") * 100.0),
+            "cum_share": pct1(r.get("cum_share") * 100.0),
+        })
+    return rows
+
+
 def build_rows_cagr(df: pd.DataFrame) -> list[dict]:
     rows: list[dict] = []
     for _, r in df.iterrows():
         rows.append({
             "geo": r.get("geo", "—"),
+            "geo_label": r.get("geo_label", ""),
             "years": f"{fmt_year(r.get('year_first'))}→{fmt_year(r.get('year_last'))}",
             "n_years": int(r.get("n_years")) if "n_years" in df.columns and pd.notna(r.get("n_years")) else None,
             "cagr": pct2(r.get("cagr_pct")),
@@ -357,58 +762,103 @@ def build_rows_cagr(df: pd.DataFrame) -> list[dict]:
 # =========================================================
 # MAIN
 # =========================================================
-def main() -> None:
+def main(bundles: bool = EXPORT_BUNDLES) -> None:
     ensure_dirs()
+    laps = Laps()
+
+    # -------- Contracts
+    # gold gravado com contrato (src/contracts.py) chega tipado: lê só as colunas
+    # usadas e pula a normalização defensiva abaixo; sem contrato (gold antigo),
+    # cai no caminho antigo
+    typed = all(guaranteed(path, name) for path, name in [
+        (GOLD_COUNTRY_INDICATOR_YEAR, "gold.country_indicator_year"),
+        (GOLD_YOY_GROWTH, "gold.yoy_growth"),
+        (GOLD_STRUCTURAL_METRICS, "gold.structural_metrics"),
+    ])
 
     # -------- Load
-    df_top = pd.read_parquet(GOLD_COUNTRY_INDICATOR_YEAR)
-    df_yoy = pd.read_parquet(GOLD_YOY_GROWTH)
-    df_struct = pd.read_parquet(GOLD_STRUCTURAL_METRICS)
+    # snapshots Arrow IPC memory-mapped quando existirem (fallback: Parquet)
+    df_top = read_gold(
+        GOLD_COUNTRY_INDICATOR_YEAR, columns=["geo_id", "indic_id", "year", "value"] if typed else None
+    )
+    df_yoy = read_gold(
+        GOLD_YOY_GROWTH, columns=["geo_id", "indic_id", "year", "value", "value_prev", "yoy_pct"] if typed else None
+    )
+    df_struct = read_gold(GOLD_STRUCTURAL_METRICS)
+    # pontos marcados por src/gold/gold_anomalies.py (opcional)
+    if GOLD_ANOMALIES.exists():
+        df_anom = read_gold(GOLD_ANOMALIES)
+    else:
+        df_anom = pd.DataFrame({
+            "geo_id": pd.Series(dtype="int16"), "indic_id": pd.Series(dtype="int16"),
+            "year": pd.Series(dtype="int64"), "is_outlier": pd.Series(dtype=bool),
+            "is_break": pd.Series(dtype=bool), "z_outlier": pd.Series(dtype=float),
+            "z_break": pd.Series(dtype=float),
+        })
+    dims = load_dimensions()
+    geo_codes = codes_by_id(dims["geo"], "geo")
+    indic_codes = codes_by_id(dims["indicator"], "indic_sbs")
+    geo_labels = labels_by_id(dims["geo"], "geo")
+    indic_labels = labels_by_id(dims["indicator"], "indic_sbs")
+    laps("load")
 
     # -------- Normalize numeric
-    if "value" in df_top.columns:
-        df_top["value"] = safe_numeric(df_top["value"])
-
-    for c in ["value", "value_prev", "yoy_pct"]:
-        if c in df_yoy.columns:
-            df_yoy[c] = safe_numeric(df_yoy[c])
-
-    # structural metrics: your file has "cagr" column (not cagr_pct)
-    if "cagr" in df_struct.columns:
-        df_struct["cagr_pct"] = safe_numeric(df_struct["cagr"])
-    elif "cagr_pct" in df_struct.columns:
-        df_struct["cagr_pct"] = safe_numeric(df_struct["cagr_pct"])
+    # (tipado: yoy_pct infinito some na agregação, que recalcula o YoY)
+    if typed:
+        df_struct["cagr_pct"] = df_struct["cagr"]
     else:
-        df_struct["cagr_pct"] = pd.NA
+        if "value" in df_top.columns:
+            df_top["value"] = safe_numeric(df_top["value"])
+
+        for c in ["value", "value_prev", "yoy_pct"]:
+            if c in df_yoy.columns:
+                df_yoy[c] = safe_numeric(df_yoy[c])
+
+        # structural metrics: your file has "cagr" column (not cagr_pct)
+        if "cagr" in df_struct.columns:
+            df_struct["cagr_pct"] = safe_numeric(df_struct["cagr"])
+        elif "cagr_pct" in df_struct.columns:
+            df_struct["cagr_pct"] = safe_numeric(df_struct["cagr_pct"])
+        else:
+            df_struct["cagr_pct"] = pd.NA
 
-    for c in ["abs_change", "pct_change", "yoy_mean", "yoy_volatility", "n_years", "year_first", "year_last"]:
-        if c in df_struct.columns:
-            df_struct[c] = safe_numeric(df_struct[c])
+        for c in ["abs_change", "pct_change", "yoy_mean", "yoy_volatility", "n_years", "year_first", "year_last"]:
+            if c in df_struct.columns:
+                df_struct[c] = safe_numeric(df_struct[c])
 
     # -------- FIX: aggregate duplicates to true country-year
     df_top = agg_country_year_value(df_top)
     df_yoy = agg_country_year_yoy(df_yoy)
 
     # -------- Optional: keep only countries (remove EU27_2020 etc.)
+    # geo_type vem de dim_geo (silver): o filtro é só uma máscara inteira por geo_id
     # IMPORTANT: avoid .copy() here to prevent huge consolidation and RAM spikes
-    if COUNTRY_ONLY and "geo" in df_top.columns:
-        df_top = df_top.loc[df_top["geo"].astype(str).map(is_country_geo)]
-    if COUNTRY_ONLY and "geo" in df_yoy.columns:
-        df_yoy = df_yoy.loc[df_yoy["geo"].astype(str).map(is_country_geo)]
-    if COUNTRY_ONLY and "geo" in df_struct.columns:
-        df_struct = df_struct.loc[df_struct["geo"].astype(str).map(is_country_geo)]
+    if COUNTRY_ONLY:
+        is_country = country_mask(dims["geo"])
+        if "geo_id" in df_top.columns:
+            df_top = df_top.loc[is_country[df_top["geo_id"].to_numpy()]]
+        if "geo_id" in df_yoy.columns:
+            df_yoy = df_yoy.loc[is_country[df_yoy["geo_id"].to_numpy()]]
+        if "geo_id" in df_struct.columns:
+            df_struct = df_struct.loc[is_country[df_struct["geo_id"].to_numpy()]]
+        df_anom = df_anom.loc[is_country[df_anom["geo_id"].to_numpy()]]
 
     # -------- Deduplicate structural table (avoids repeated NL rows etc.)
-    df_struct = dedupe_structural(df_struct)
+    # com contrato a tabela já sai com uma linha por (geo_id, indic_id)
+    if not typed:
+        df_struct = dedupe_structural(df_struct)
 
     # -------- Coverage / quality
     coverage = compute_coverage(df_top, df_yoy, df_struct)
     quality = read_quality_report()
+    quality_trend = build_quality_trends()
 
     # -------- Select indicator
-    main_indic = pick_main_indicator(df_top)
-    if main_indic is None:
-        raise ValueError("Could not select main indicator (indic_sbs missing or empty).")
+    main_indic_id = pick_main_indicator(df_top, dims["indicator"])
+    if main_indic_id is None:
+        raise ValueError("Could not select main indicator (indic_id missing or empty).")
+    main_indic = str(indic_codes[main_indic_id])
+    main_indic_label = str(indic_labels[main_indic_id])
 
     # -------- Years
     if "year" not in df_top.columns or df_top.empty:
@@ -427,9 +877,9 @@ def main() -> None:
         rank_base_year = candidate if candidate in years_available else years_available[0]
 
     # -------- Filter to main indicator
-    df_top_main = df_top.loc[df_top["indic_sbs"] == main_indic]
-    df_yoy_main = df_yoy.loc[df_yoy["indic_sbs"] == main_indic]
-    df_struct_main = df_struct.loc[df_struct["indic_sbs"] == main_indic] if "indic_sbs" in df_struct.columns else df_struct
+    df_top_main = df_top.loc[df_top["indic_id"].to_numpy() == main_indic_id]
+    df_yoy_main = df_yoy.loc[df_yoy["indic_id"].to_numpy() == main_indic_id]
+    df_struct_main = df_struct.loc[df_struct["indic_id"].to_numpy() == main_indic_id] if "indic_id" in df_struct.columns else df_struct
 
     # -------- Top Value (latest year)
     df_top_latest = df_top_main.loc[df_top_main["year"] == year_top]
@@ -437,9 +887,10 @@ def main() -> None:
         df_top_latest.dropna(subset=["value"])
         .sort_values("value", ascending=False)
         .head(TOP_N)
-        .loc[:, ["geo", "year", "value"]]
+        .loc[:, ["geo_id", "year", "value"]]
         .copy()
     )
+    df_top10_value = attach_geo(df_top10_value, geo_codes, geo_labels)
 
     # -------- YoY (latest year) with sanity rules
     df_yoy_latest = df_yoy_main.loc[df_yoy_main["year"] == year_yoy].copy()
@@ -451,20 +902,37 @@ def main() -> None:
     df_top10_yoy = (
         df_yoy_latest.sort_values("yoy_pct", ascending=False)
         .head(TOP_N)
-        .loc[:, ["geo", "year", "value", "value_prev", "yoy_pct"]]
+        .loc[:, ["geo_id", "year", "value", "value_prev", "yoy_pct"]]
         .copy()
     )
+    df_top10_yoy = attach_geo(df_top10_yoy, geo_codes, geo_labels)
+
+    # -------- Anomalies (main indicator): flagged points, strongest first
+    df_anom_main = df_anom.loc[df_anom["indic_id"].to_numpy() == main_indic_id].copy()
+    df_anom_main["score"] = np.fmax(
+        np.where(df_anom_main["is_outlier"], df_anom_main["z_outlier"].abs(), 0.0),
+        np.where(df_anom_main["is_break"], df_anom_main["z_break"].abs(), 0.0),
+    )
+    df_anom_top = attach_geo(df_anom_main.sort_values("score", ascending=False).head(TOP_N), geo_codes, geo_labels)
+
+    # marca no ranking de YoY os pontos que o estágio de anomalias sinalizou
+    anom_yoy = df_anom_main.loc[df_anom_main["year"] == year_yoy]
+    labels = {
+        int(g): anomaly_label(bool(o), bool(b))
+        for g, o, b in zip(anom_yoy["geo_id"], anom_yoy["is_outlier"], anom_yoy["is_break"])
+    }
+    df_top10_yoy["anomaly"] = [labels.get(int(g), "") for g in df_top10_yoy["geo_id"]]
 
     # -------- Rank Delta (base vs latest) - using dense ranks to handle ties
     base_rank = (
         df_top_main.loc[df_top_main["year"] == rank_base_year]
         .dropna(subset=["value"])
-        .loc[:, ["geo", "value"]]
+        .loc[:, ["geo_id", "value"]]
     )
     last_rank = (
         df_top_main.loc[df_top_main["year"] == year_top]
         .dropna(subset=["value"])
-        .loc[:, ["geo", "value"]]
+        .loc[:, ["geo_id", "value"]]
     )
 
     base_rank = base_rank.sort_values("value", ascending=False)
@@ -476,15 +944,15 @@ def main() -> None:
     base_rank = base_rank.rename(columns={"value": "value_base"})
     last_rank = last_rank.rename(columns={"value": "value_last"})
 
-    base_rank = base_rank.loc[:, ["geo", "value_base", "rank_base"]].copy()
-    last_rank = last_rank.loc[:, ["geo", "value_last", "rank_last"]].copy()
+    base_rank = base_rank.loc[:, ["geo_id", "value_base", "rank_base"]].copy()
+    last_rank = last_rank.loc[:, ["geo_id", "value_last", "rank_last"]].copy()
 
-    df_rank = base_rank.merge(last_rank, on="geo", how="inner")
+    df_rank = base_rank.merge(last_rank, on="geo_id", how="inner")
     df_rank["rank_delta"] = df_rank["rank_base"] - df_rank["rank_last"]  # + means moved up
     df_rank["pct_change"] = (df_rank["value_last"] / df_rank["value_base"] - 1.0) * 100.0
 
-    df_rank_up = df_rank.sort_values("rank_delta", ascending=False).head(TOP_N).copy()
-    df_rank_down = df_rank.sort_values("rank_delta", ascending=True).head(TOP_N).copy()
+    df_rank_up = attach_geo(df_rank.sort_values("rank_delta", ascending=False).head(TOP_N), geo_codes, geo_labels)
+    df_rank_down = attach_geo(df_rank.sort_values("rank_delta", ascending=True).head(TOP_N), geo_codes, geo_labels)
 
     # -------- CAGR Top/Bottom (clean + min years)
     has_cagr = bool("cagr_pct" in df_struct_main.columns and df_struct_main["cagr_pct"].notna().any())
@@ -495,8 +963,24 @@ def main() -> None:
         base_struct = df_struct_main.dropna(subset=["cagr_pct"]).copy()
         if "n_years" in base_struct.columns:
             base_struct = base_struct[base_struct["n_years"].fillna(0) >= CAGR_MIN_YEARS].copy()
-        df_top10_cagr = base_struct.sort_values("cagr_pct", ascending=False).head(TOP_N).copy()
-        df_bottom10_cagr = base_struct.sort_values("cagr_pct", ascending=True).head(TOP_N).copy()
+        df_top10_cagr = attach_geo(base_struct.sort_values("cagr_pct", ascending=False).head(TOP_N), geo_codes, geo_labels)
+        df_bottom10_cagr = attach_geo(base_struct.sort_values("cagr_pct", ascending=True).head(TOP_N), geo_codes, geo_labels)
+
+    # -------- Concentration (gold_concentration.py): mart já pronto, só filtrar
+    has_concentration = GOLD_CONCENTRATION.exists() and GOLD_GEO_SHARE.exists()
+    df_conc_main = pd.DataFrame()
+    df_share_top = pd.DataFrame()
+    if has_concentration:
+        df_conc = read_gold(GOLD_CONCENTRATION)
+        df_conc_main = df_conc.loc[df_conc["indic_id"].to_numpy() == main_indic_id].sort_values("year")
+        df_share = read_gold(GOLD_GEO_SHARE)
+        df_share_top = df_share.loc[
+            (df_share["indic_id"].to_numpy() == main_indic_id) & (df_share["year"].to_numpy() == year_top)
+        ].sort_values("rank").head(TOP_N)
+        df_share_top = attach_geo(df_share_top, geo_codes, geo_labels)
+        has_concentration = len(df_conc_main) > 0
+
+    laps("prepare")
 
     # -------- Charts
     chart_value = ASSETS_DIR / "top10_value.png"
@@ -505,6 +989,8 @@ def main() -> None:
     chart_rank_down = ASSETS_DIR / "rank_movers_down.png"
     chart_cagr_top = ASSETS_DIR / "top10_cagr.png"
     chart_cagr_bottom = ASSETS_DIR / "bottom10_cagr.png"
+    chart_hhi = ASSETS_DIR / "concentration_hhi.png"
+    chart_topk = ASSETS_DIR / "concentration_topk.png"
 
     if len(df_top10_value):
         save_bar_chart(
@@ -580,6 +1066,59 @@ def main() -> None:
             clip_abs=CAGR_CLIP_ABS_FOR_CHART,
         )
 
+    if has_concentration:
+        save_line_chart(
+            df_conc_main,
+            title=f"Concentration (HHI, 0-10000) — {main_indic}",
+            outpath=chart_hhi,
+            x_col="year",
+            y_cols={"HHI": "hhi"},
+            y_label="HHI",
+        )
+        topk_cols = [c for c in df_conc_main.columns if c.startswith("top") and c.endswith("_share")]
+        topk = df_conc_main[["year"]].copy()
+        for c in topk_cols:
+            topk[c] = df_conc_main[c] * 100.0
+        save_line_chart(
+            topk,
+            title=f"Top-k cumulative share of the country total (%) — {main_indic}",
+            outpath=chart_topk,
+            x_col="year",
+            y_cols={f"top {c[3:-6]}": c for c in topk_cols},
+            y_label="Share (%)",
+        )
+    laps("charts")
+
+    # -------- Multi-period: top-N países do último ano, todos os anos do indicador
+    # uma matriz (país x ano) alimenta o gráfico de tendência e os small multiples
+    trend_geo_ids = (
+        df_top_latest.dropna(subset=["value"]).nlargest(TREND_TOP_N, "value")["geo_id"].to_numpy(np.int64)
+    )
+    trend_years = np.unique(df_top_main["year"].to_numpy(np.int64))
+    trend_labels = [str(g) for g in geo_codes[trend_geo_ids]]
+    trend_mat = pivot_geo_year(df_top_main, trend_geo_ids, trend_years)
+    has_trends = len(trend_geo_ids) > 0 and len(trend_years) > 1
+
+    chart_trend = ASSETS_DIR / "trend_top_index.png"
+    small_multiples: list[dict] = []
+    if has_trends:
+        save_trend_chart(
+            trend_years,
+            index_to_first(trend_mat),
+            trend_labels,
+            title=f"Top {len(trend_geo_ids)} countries ({year_top}) — {main_indic}, {trend_years[0]}→{trend_years[-1]}",
+            outpath=chart_trend,
+        )
+        small_multiples = build_small_multiples(trend_years, trend_mat, trend_labels)
+    laps("multi_period")
+
+    # -------- Data bundles (todos os indicadores/anos, filtrados no navegador)
+    bundle_index = None
+    if bundles:
+        bundle_index = write_bundles(df_top, df_yoy, df_struct, geo_codes, indic_codes, geo_labels, indic_labels)
+        bundle_index["default"] = main_indic
+        laps("bundles")
+
     # -------- Insights (curtos, sem cara de IA)
     insights: list[dict] = []
 
@@ -627,6 +1166,21 @@ def main() -> None:
             "text": "Negative CAGR means the indicator decreases over the period. Whether that is good or bad depends on the indicator semantics."
         })
 
+    if len(df_anom_main):
+        insights.append({
+            "title": "Flagged observations",
+            "text": f"{int(df_anom_main['is_outlier'].sum())} outliers and {int(df_anom_main['is_break'].sum())} structural breaks "
+                    f"flagged for {main_indic} (robust z-scores on the country-year series)."
+        })
+
+    if has_concentration:
+        first, last = df_conc_main.iloc[0], df_conc_main.iloc[-1]
+        insights.append({
+            "title": "Market concentration",
+            "text": f"HHI for {main_indic} moves from {first['hhi']:.0f} ({int(first['year'])}) to {last['hhi']:.0f} "
+                    f"({int(last['year'])}); above 2500 is usually read as highly concentrated."
+        })
+
     # -------- Rows for HTML
     top_rows = build_rows_value(df_top10_value)
     yoy_rows = build_rows_yoy(df_top10_yoy)
@@ -634,25 +1188,23 @@ def main() -> None:
     rank_down_rows = build_rows_rank_delta(df_rank_down)
     cagr_top_rows = build_rows_cagr(df_top10_cagr) if has_cagr else []
     cagr_bottom_rows = build_rows_cagr(df_bottom10_cagr) if has_cagr else []
+    anomaly_rows = build_rows_anomalies(df_anom_top)
+    share_rows = build_rows_share(df_share_top) if has_concentration else []
 
     # -------- Render HTML
-    env = Environment(
-        loader=FileSystemLoader(str(TEMPLATES_DIR)),
-        autoescape=select_autoescape(["html", "xml"]),
-    )
-    template = env.get_template("gold_report.html")
-
     generated_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
-    html = template.render(
+    context = dict(
         title="Eurostat Lakehouse — Gold Report",
         generated_at=generated_at,
         main_indicator=main_indic,
+        main_indicator_label=main_indic_label,
         year_top=year_top,
         year_yoy=year_yoy,
         rank_base_year=rank_base_year,
         coverage=coverage,
         quality=quality,
+        quality_trend=quality_trend,
         insights=insights,
         yoy_prev_threshold=YOY_MIN_PREV_VALUE,
         yoy_clip_abs=YOY_CLIP_ABS_FOR_CHART,
@@ -675,13 +1227,56 @@ def main() -> None:
         cagr_top_rows=cagr_top_rows,
         cagr_bottom_rows=cagr_bottom_rows,
         has_cagr=has_cagr,
+        anomaly_rows=anomaly_rows,
+        has_anomalies=GOLD_ANOMALIES.exists(),
+        has_concentration=has_concentration,
+        chart_hhi=str(chart_hhi.relative_to(OUT_DIR)).replace("\\", "/") if has_concentration else None,
+        chart_topk=str(chart_topk.relative_to(OUT_DIR)).replace("\\", "/") if has_concentration else None,
+        share_rows=share_rows,
+        has_trends=has_trends,
+        chart_trend=str(chart_trend.relative_to(OUT_DIR)).replace("\\", "/") if has_trends else None,
+        small_multiples=small_multiples,
+        spark_width=SPARK_WIDTH,
+        spark_height=SPARK_HEIGHT,
+        bundle_index=bundle_index,
     )
+    html = render_report(context)
+    RENDER_CONTEXT.clear()
+    RENDER_CONTEXT.update(context)
 
     out_html = OUT_DIR / "gold_report.html"
     out_html.write_text(html, encoding="utf-8")
+    laps("render")
+
+    PHASE_MS.clear()
+    PHASE_MS.update(laps.ms, total=laps.total())
 
     print(f"Report generated: {out_html}")
+    if bundle_index is not None:
+        size_kb = sum(i["bytes"] for i in bundle_index["indicators"]) / 1024
+        print(f"Data bundles: {len(bundle_index['indicators'])} indicators, {size_kb:.1f} KB in {BUNDLES_DIR}")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Gold HTML report")
+    ap.add_argument(
+        "--bundles", action="store_true", default=EXPORT_BUNDLES,
+        help="export per-indicator data bundles and enable in-browser filtering",
+    )
+    ap.add_argument(
+        "--profile", action="store_true",
+        help="profile the render (cProfile/sampling + tracemalloc) into runs/<run_id>/profile/report.*",
+    )
+    ap.add_argument("--profile-mode", choices=["cprofile", "sample"], default=None)
+    ap.add_argument("--profile-top", type=int, default=None)
+    args = ap.parse_args()
+
+    if args.profile:
+        from profiling import PROFILE_MODE, PROFILE_TOP_N, profile_dir, profiled
+
+        with profiled("report", profile_dir(), args.profile_mode or PROFILE_MODE, args.profile_top or PROFILE_TOP_N):
+            main(bundles=args.bundles)
+    else:
+        main(bundles=args.bundles)
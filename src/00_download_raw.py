@@ -1,5 +1,12 @@
 # src/00_download_raw.py
+"""
+Baixa os TSVs da Eurostat para data-raw/.
+
+    python src/00_download_raw.py                          todos os DATASETS
+    python src/00_download_raw.py --datasets sbs_na_ind_r2 só estes (watch mode)
+"""
 from urllib.parse import quote
+import argparse
 
 from config import DATA_RAW, DATASETS, EUROSTAT_BASE
 from utils import ensure_dir, download_file, gunzip_file
@@ -8,10 +15,10 @@ def build_url(dataset: str) -> str:
     # Eurostat Dissemination API (SDMX 2.1) - TSV compactado
     return f"{EUROSTAT_BASE}/{quote(dataset)}?format=TSV&compressed=true"
 
-def main() -> None:
+def main(datasets: list[str] = DATASETS) -> None:
     ensure_dir(DATA_RAW)
 
-    for ds in DATASETS:
+    for ds in datasets:
         url = build_url(ds)
 
         gz_path = DATA_RAW / f"{ds}.tsv.gz"
@@ -26,5 +33,7 @@ def main() -> None:
         print(f"Saved: {tsv_path}")
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--datasets", nargs="+", default=DATASETS, help="códigos dos datasets (default: DATASETS)")
+    main(ap.parse_args().datasets)
 
@@ -1,8 +1,10 @@
-from pathlib import Path
 import gzip
 import shutil
 
-RAW_DIR = Path("data-raw")
+from config import DATA_RAW
+from lake_fs import atomic_path
+
+RAW_DIR = DATA_RAW
 
 # tenta os dois nomes
 gz_file_1 = RAW_DIR / "sbs_na_ind_r2.tsv.gz"
@@ -14,8 +16,10 @@ tsv_file = RAW_DIR / "sbs_na_ind_r2.tsv"
 if not gz_file.exists():
     raise FileNotFoundError(f"Não achei {gz_file_1} nem {gz_file_2}. Veja o nome real em data-raw/")
 
-with gzip.open(gz_file, "rb") as f_in:
-    with open(tsv_file, "wb") as f_out:
+# .open() funciona tanto para Path local quanto para LakePath (object storage)
+# atomic_path: o bronze nunca lê um TSV descompactado pela metade
+with gz_file.open("rb") as raw, gzip.GzipFile(fileobj=raw) as f_in:
+    with atomic_path(tsv_file) as tmp, tmp.open("wb") as f_out:
         shutil.copyfileobj(f_in, f_out)
 
 print("Extraction finished:", tsv_file)
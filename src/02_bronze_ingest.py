@@ -1,8 +1,11 @@
-from pathlib import Path
 import pandas as pd
 
-RAW_DIR = Path("data-raw")
-BRONZE_DIR = Path("data-bronze")
+from config import DATA_BRONZE, DATA_RAW
+from lake_io import write_parquet
+from lineage import LineageRecord
+
+RAW_DIR = DATA_RAW
+BRONZE_DIR = DATA_BRONZE
 BRONZE_DIR.mkdir(parents=True, exist_ok=True)
 
 tsv_path = RAW_DIR / "sbs_na_ind_r2.tsv"
@@ -12,11 +15,19 @@ out_path = BRONZE_DIR / "sbs_na_ind_r2_bronze.parquet"
 # "freq,nace_r2,indic_sbs,geo\TIME_PERIOD"
 # e depois colunas de anos (2010, 2011, ...)
 
-df = pd.read_csv(tsv_path, sep="\t")
+with tsv_path.open("rb") as f:
+    df = pd.read_csv(f, sep="\t")
 
 # padroniza nome da primeira coluna (fica mais fácil depois)
 first_col = df.columns[0]
 df = df.rename(columns={first_col: "key"})
 
-df.to_parquet(out_path, index=False)
+write_parquet(df, out_path, "bronze", contract="bronze.sbs_na_ind_r2")
+
+# lineage: bronze não descarta nada (uma linha por linha do TSV)
+lineage = LineageRecord("bronze")
+lineage.step("sbs_na_ind_r2", out_path, {"raw.sbs_na_ind_r2": len(df)},
+             columns={"key": [f"raw.{first_col}"], "<year>": ["raw.<year>"]})
+lineage.finish("sbs_na_ind_r2", len(df))
+lineage.write()
 print("BRONZE saved:", out_path, "rows:", len(df), "cols:", len(df.columns))
@@ -1,14 +1,24 @@
-from pathlib import Path
 import pandas as pd
 
-BRONZE_DIR = Path("data-bronze")
-SILVER_DIR = Path("data-silver")
+from config import DATA_BRONZE, DATA_SILVER
+from contracts import check
+from dimensions import build_dimensions, encode, load_previous_dimensions, write_dimensions
+from lake_fs import copy_atomic
+from lake_io import read_parquet, write_parquet
+from lineage import LineageRecord, by_indicator
+from metadata import labels
+from revisions import SILVER_PREV_PATH, mark_prev_snapshot, silver_version
+
+BRONZE_DIR = DATA_BRONZE
+SILVER_DIR = DATA_SILVER
 SILVER_DIR.mkdir(parents=True, exist_ok=True)
 
 in_path = BRONZE_DIR / "sbs_na_ind_r2_bronze.parquet"
 out_path = SILVER_DIR / "sbs_na_ind_r2_silver.parquet"
 
-df = pd.read_parquet(in_path)
+# contrato do bronze conferido no footer antes de ler os dados
+check(in_path, "bronze.sbs_na_ind_r2")
+df = read_parquet(in_path)
 
 # split da chave: "freq,nace_r2,indic_sbs,geo\TIME_PERIOD"
 # Exemplo de key: "A,NACE2,....,DE"
@@ -17,10 +27,12 @@ parts = df["key"].astype(str).str.split(",", expand=True)
 
 # garante colunas mínimas (se vier mais/menos, a gente adapta depois)
 # Será assumido 4 partes (freq, nace_r2, indic_sbs, geo)
-df["freq"] = parts[0]
-df["nace_r2"] = parts[1]
-df["indic_sbs"] = parts[2]
-df["geo"] = parts[3]
+# categorical já aqui: o melt abaixo repete essas colunas uma vez por ano, e
+# a política de armazenamento grava dimensões como dictionary de qualquer forma
+df["freq"] = parts[0].astype("category")
+df["nace_r2"] = parts[1].astype("category")
+df["indic_sbs"] = parts[2].astype("category")
+df["geo"] = parts[3].astype("category")
 
 df = df.drop(columns=["key"])
 
@@ -44,14 +56,60 @@ long_df["value_num"] = (
 )
 long_df["value_num"] = pd.to_numeric(long_df["value_num"], errors="coerce")
 
+# flag Eurostat (p = provisório, e = estimado, ...) separado do número
+long_df["flag"] = long_df["value_raw"].str.extract(r"\d\s*([a-z]+)$", expand=False)
+
 # year numérico
 long_df["year"] = pd.to_numeric(long_df["year"], errors="coerce").astype("Int64")
 
+# lineage: cada descarte abaixo é contado por indicador na hora, sobre a
+# máscara que já é usada para filtrar (motivos exclusivos, na ordem aplicada)
+lineage = LineageRecord("silver")
+lineage.step(
+    "sbs_na_ind_r2", out_path, {"bronze.sbs_na_ind_r2": len(long_df)},
+    fanout={"bronze.sbs_na_ind_r2": len(value_cols)},
+    columns={
+        "freq": ["bronze.key"], "nace_r2": ["bronze.key"], "indic_sbs": ["bronze.key"], "geo": ["bronze.key"],
+        "year": ["bronze.<year> (header)"], "value_raw": ["bronze.<year>"], "value_num": ["bronze.<year>"],
+        "flag": ["bronze.<year>"], "geo_id": ["silver.dim_geo"], "indic_id": ["silver.dim_indicator"],
+        "nace_id": ["silver.dim_nace"],
+    },
+)
+
+
+def drop_rows(df: pd.DataFrame, mask: pd.Series, reason: str) -> pd.DataFrame:
+    lineage.drop("sbs_na_ind_r2", reason, by_indicator(df.loc[mask, "indic_sbs"]))
+    return df[~mask]
+
+
 # remove linhas sem ano ou sem valor
-long_df = long_df.dropna(subset=["year", "value_num"])
+long_df = drop_rows(long_df, long_df["year"].isna(), "missing_year")
+long_df = drop_rows(long_df, long_df["value_num"].isna(), "missing_value")
 
 # regra simples de qualidade: value >= 0 (ajusta depois se precisar)
-long_df = long_df[long_df["value_num"] >= 0]
+long_df = drop_rows(long_df, long_df["value_num"] < 0, "negative_value")
+
+# dimensões (geo / indicador / NACE) construídas uma vez aqui;
+# gold e relatório usam só as chaves inteiras
+# (ids estáveis entre runs: reaproveita as dimensões anteriores)
+# rótulos das codelists Eurostat: só do cache local (src/metadata.py), sem rede
+dims = build_dimensions(long_df, load_previous_dimensions(), labels())
+long_df = encode(long_df, dims)
+write_dimensions(dims)
+
+# guarda o snapshot anterior para o diff de revisões (silver_revisions.py):
+# cópia atômica, não rename; o silver atual só é trocado pela escrita atômica
+# abaixo. Um crash (ou ContractError) no meio deixa prev == atual, nunca um
+# silver faltando. A versão de origem fica registrada ao lado do snapshot
+# (revisions.mark_prev_snapshot): o diff sabe de qual silver ele parte
+if out_path.exists():
+    version = silver_version(out_path)
+    copy_atomic(out_path, SILVER_PREV_PATH)
+    mark_prev_snapshot(version)
 
-long_df.to_parquet(out_path, index=False)
+# perfil "silver": zstd, ordenado por (indic_sbs, geo, nace_r2, year), bloom filter em geo
+write_parquet(long_df, out_path, "silver", contract="silver.sbs_na_ind_r2")
+lineage.finish("sbs_na_ind_r2", len(long_df))
+lineage.write()
 print("SILVER saved:", out_path, "rows:", len(long_df), "cols:", len(long_df.columns))
+print("DIMENSIONS saved:", {name: len(d) for name, d in dims.items()})
@@ -1,8 +1,12 @@
-from pathlib import Path
-import pandas as pd
+import json
 
-SILVER_DIR = Path("data-silver")
-GOLD_DIR = Path("data-gold")
+from config import DATA_GOLD, DATA_SILVER, GOLD_DENSIFY, GOLD_INCREMENTAL, STORAGE_POLICY
+from contracts import CONTRACTS
+from lake_fs import write_text_atomic
+from revisions import pending_manifest, silver_version
+
+SILVER_DIR = DATA_SILVER
+GOLD_DIR = DATA_GOLD
 GOLD_DIR.mkdir(parents=True, exist_ok=True)
 
 in_path = SILVER_DIR / "sbs_na_ind_r2_silver.parquet"
@@ -10,20 +14,144 @@ in_path = SILVER_DIR / "sbs_na_ind_r2_silver.parquet"
 gold1 = GOLD_DIR / "gold_country_indicator_year.parquet"
 gold2 = GOLD_DIR / "gold_yoy_growth.parquet"
 
-df = pd.read_parquet(in_path)
+# opções com que o gold atual foi construído: mudou (ex.: GOLD_DENSIFY, a
+# versão do contrato do gold ou a política de tipos) -> refresh completo.
+# silver_version = versão do silver consumida: o change log só é aplicado se
+# partir exatamente dela (revisions.pending_manifest)
+build_path = GOLD_DIR / "_gold_build.json"
+build = {"densify": GOLD_DENSIFY, "contract": CONTRACTS["gold"]["version"], "storage": STORAGE_POLICY}
+last_build = json.loads(build_path.read_text(encoding="utf-8")) if build_path.exists() else {}
+consumed = last_build.pop("silver_version", None)
+same_build = last_build == build
+current_version = silver_version(in_path)
+
+# nada a fazer: sai antes de importar pandas/pyarrow
+have_gold = gold1.exists() and gold2.exists()
+if GOLD_INCREMENTAL and same_build and have_gold and consumed is not None and consumed == current_version:
+    print("GOLD up to date: already built from the current silver.")
+    raise SystemExit(0)
+manifest = pending_manifest(consumed) if GOLD_INCREMENTAL and same_build else None
+if manifest is not None and manifest.get("affected_series") == 0 and have_gold:
+    write_text_atomic(build_path, json.dumps({**build, "silver_version": current_version}))
+    print("GOLD up to date: no revised series in silver.")
+    raise SystemExit(0)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from contracts import check  # noqa: E402
+from dimensions import DIMENSIONS, codes_by_id, load_dimensions  # noqa: E402
+from gold_core import SERIES, SILVER_COLS, build_shard, merge_drops  # noqa: E402
+from lake_io import read_gold, read_parquet, write_gold  # noqa: E402
+from lineage import LineageRecord, by_indicator  # noqa: E402
+from revisions import affected_series, load_pending_changes  # noqa: E402
+from sharding import concat, map_shards  # noqa: E402
+
+
+def series_key(df: pd.DataFrame) -> np.ndarray:
+    # geo_id / indic_id são int16 não negativos (dimensions.check_cardinality): cabem em 16 bits
+    return (df["geo_id"].to_numpy(np.int64) << 16) | df["indic_id"].to_numpy(np.int64)
+
+
+def build_gold(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Base + YoY (src/gold_core.py). Com GOLD_WORKERS > 1 roda em shards por
+    indicador num pool de processos (src/sharding.py) e concatena.
+    """
+    results = map_shards(build_shard, {"silver": df})
+    return concat(results, "base"), concat(results, "yoy"), merge_drops(results)
+
+
+# contrato do silver conferido no footer: ids int16 (nace_id int32), year int16, value_num double
+check(in_path, "silver.sbs_na_ind_r2")
+
+dims = load_dimensions()
+INDIC_CODES = codes_by_id(dims["indicator"], "indic_sbs")
+
+# lineage (src/lineage.py): linhas de entrada/saída e descartes por motivo e
+# indicador, contados sobre as máscaras que o próprio gold já calcula
+lineage = LineageRecord("gold")
+LINEAGE_COLUMNS = {
+    "country_indicator_year": {
+        "geo_id": ["silver.geo_id"], "indic_id": ["silver.indic_id"], "nace_id": ["silver.nace_id"],
+        "year": ["silver.year"], "value": ["silver.value_num"], "imputed": [],
+    },
+    "yoy_growth": {
+        "value_prev": ["gold.country_indicator_year.value"],
+        "yoy_pct": ["gold.country_indicator_year.value"],
+    },
+}
+
+
+def record_lineage(rows_in: dict[str, int], yoy_rows_in: dict[str, int], new_base: pd.DataFrame,
+                   drops: dict[str, dict[int, int]]) -> None:
+    lineage.step("country_indicator_year", gold1, rows_in, columns=LINEAGE_COLUMNS["country_indicator_year"])
+    if GOLD_DENSIFY:
+        lineage.add("country_indicator_year", f"densify_{GOLD_DENSIFY}",
+                    by_indicator(new_base.loc[new_base["imputed"], "indic_id"], INDIC_CODES))
+    lineage.step("yoy_growth", gold2, yoy_rows_in, columns=LINEAGE_COLUMNS["yoy_growth"])
+    for reason, counts in drops.items():
+        lineage.drop("yoy_growth", reason, {str(INDIC_CODES[k]): n for k, n in sorted(counts.items())})
+
+
+# só as séries tocadas pelo change log do silver (silver_revisions.py) são
+# recalculadas; sem change log válido, refresh completo
+changes = load_pending_changes(consumed) if manifest is not None else None
+
+if changes is not None and gold1.exists() and gold2.exists():
+    series = affected_series(changes)
+    for name in ("geo", "indicator"):
+        code_col, id_col, _ = DIMENSIONS[name]
+        cat = pd.Categorical(series[code_col], categories=dims[name][code_col])
+        series[id_col] = cat.codes.astype(np.int64)
+    series = series[(series["geo_id"] >= 0) & (series["indic_id"] >= 0)]
+    keys = series_key(series)
+
+    if len(keys) == 0:
+        write_text_atomic(build_path, json.dumps({**build, "silver_version": current_version}))
+        print("GOLD up to date: no revised series in silver.")
+        raise SystemExit(0)
+
+    # pushdown nos ids afetados; o filtro exato por série vem depois
+    df = read_parquet(
+        in_path,
+        columns=SILVER_COLS,
+        filters=[
+            ("geo_id", "in", sorted(set(series["geo_id"].tolist()))),
+            ("indic_id", "in", sorted(set(series["indic_id"].tolist()))),
+        ],
+    )
+    df = df[np.isin(series_key(df), keys)]
+
+    old_base = read_gold(gold1)
+    old_yoy = read_gold(gold2)
+    kept_base = old_base[~np.isin(series_key(old_base), keys)]
+    kept_yoy = old_yoy[~np.isin(series_key(old_yoy), keys)]
+
+    new_base, new_yoy, drops = build_gold(df)
+    # só a parte recalculada tem descartes; o resto entra como "[kept]"
+    record_lineage(
+        {"silver.sbs_na_ind_r2[revised series]": len(df), "gold.country_indicator_year[kept]": len(kept_base)},
+        {"gold.country_indicator_year[revised series]": len(new_base), "gold.yoy_growth[kept]": len(kept_yoy)},
+        new_base, drops,
+    )
 
-# 1) Tabela analítica base: (geo, indic_sbs, year) com value
-base = df[["geo", "indic_sbs", "year", "value_num"]].copy()
-base = base.rename(columns={"value_num": "value"})
-base.to_parquet(gold1, index=False)
+    base = pd.concat([kept_base, new_base], ignore_index=True)
+    yoy = pd.concat([kept_yoy, new_yoy], ignore_index=True)
+    yoy = yoy.sort_values(SERIES + ["year"], kind="stable", ignore_index=True)
 
-# 2) Crescimento YoY por país e indicador
-base = base.sort_values(["geo", "indic_sbs", "year"])
-base["value_prev"] = base.groupby(["geo", "indic_sbs"])["value"].shift(1)
-base["yoy_pct"] = (base["value"] - base["value_prev"]) / base["value_prev"] * 100
+    print(f"GOLD incremental: {len(keys)} series recomputed ({len(df)} silver rows)")
+else:
+    df = read_parquet(in_path, columns=SILVER_COLS)
+    base, yoy, drops = build_gold(df)
+    record_lineage({"silver.sbs_na_ind_r2": len(df)}, {"gold.country_indicator_year": len(base)}, base, drops)
 
-yoy = base.dropna(subset=["yoy_pct"])
-yoy.to_parquet(gold2, index=False)
+write_gold(base, gold1, contract="gold.country_indicator_year")
+write_gold(yoy, gold2, contract="gold.yoy_growth")
+write_text_atomic(build_path, json.dumps({**build, "silver_version": current_version}))
+lineage.finish("country_indicator_year", len(base))
+lineage.finish("yoy_growth", len(yoy))
+lineage.write()
 
 print("GOLD saved:", gold1)
 print("GOLD saved:", gold2)
@@ -1,13 +1,40 @@
 import json
-from pathlib import Path
+import os
+
 import pandas as pd
 
-BRONZE = Path("data-bronze/sbs_na_ind_r2_bronze.parquet")
-SILVER = Path("data-silver/sbs_na_ind_r2_silver.parquet")
-GOLD1 = Path("data-gold/gold_country_indicator_year.parquet")
-GOLD2 = Path("data-gold/gold_yoy_growth.parquet")
+from checkpoint import new_run_id
+from config import ANOMALY_MAX_OUTLIER_RATE, DATA_BRONZE, DATA_GOLD, DATA_SILVER, OUTPUTS_CHECKS
+from contracts import ContractError, check
+from dimensions import DIM_GEO, DIM_INDICATOR, DIM_NACE
+from lake_fs import write_text_atomic
+from lake_io import read_gold, read_parquet
+from lineage import load_records, reconcile
+import quality_history
+
+BRONZE = DATA_BRONZE / "sbs_na_ind_r2_bronze.parquet"
+SILVER = DATA_SILVER / "sbs_na_ind_r2_silver.parquet"
+GOLD1 = DATA_GOLD / "gold_country_indicator_year.parquet"
+GOLD2 = DATA_GOLD / "gold_yoy_growth.parquet"
+ANOMALIES = DATA_GOLD / "gold_anomalies.parquet"
 
-OUT_DIR = Path("outputs-checks")
+# arquivo -> contrato (src/contracts.py); opcionais só são conferidos se existirem
+CONTRACTED = {
+    BRONZE: "bronze.sbs_na_ind_r2",
+    SILVER: "silver.sbs_na_ind_r2",
+    DIM_GEO: "silver.dim_geo",
+    DIM_INDICATOR: "silver.dim_indicator",
+    DIM_NACE: "silver.dim_nace",
+    GOLD1: "gold.country_indicator_year",
+    GOLD2: "gold.yoy_growth",
+    DATA_GOLD / "gold_structural_metrics.parquet": "gold.structural_metrics",
+    ANOMALIES: "gold.anomalies",
+    DATA_GOLD / "gold_geo_share.parquet": "gold.geo_share",
+    DATA_GOLD / "gold_concentration.parquet": "gold.concentration",
+}
+REQUIRED = {BRONZE, SILVER, GOLD1, GOLD2}
+
+OUT_DIR = OUTPUTS_CHECKS
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 OUT = OUT_DIR / "quality_report.json"
 
@@ -27,14 +54,36 @@ for p in [BRONZE, SILVER, GOLD1, GOLD2]:
         report["errors"].append(f"Missing file: {p}")
 
 if report["status"] == "FAIL":
-    OUT.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    write_text_atomic(OUT, json.dumps(report, indent=2))
     raise SystemExit("Quality checks failed (missing files).")
 
+# Schema contracts (só o footer de cada arquivo é lido)
+report["contracts"] = {}
+for p, name in CONTRACTED.items():
+    if p not in REQUIRED and not p.exists():
+        continue
+    try:
+        found = check(p, name)
+        report["contracts"][str(p)] = {"contract": name, "version": found["version"], "ok": True}
+    except ContractError as e:
+        report["contracts"][str(p)] = {"contract": name, "ok": False, "error": str(e)}
+        report["errors"].append(f"Contract violation: {e}")
+
+# Lineage: os registros de cada camada (outputs-checks/lineage/) são
+# reconciliados só com os footers, sem recarregar as tabelas
+records = load_records()
+if records:
+    lineage_steps, lineage_errors = reconcile(records)
+    report["lineage"] = {"layers": sorted(records), "steps": lineage_steps}
+    report["errors"].extend(lineage_errors)
+else:
+    report["lineage"] = {"available": False}
+
 # Load
-bronze = pd.read_parquet(BRONZE)
-silver = pd.read_parquet(SILVER)
-gold = pd.read_parquet(GOLD1)
-yoy = pd.read_parquet(GOLD2)
+bronze = read_parquet(BRONZE)
+silver = read_parquet(SILVER)
+gold = read_gold(GOLD1)
+yoy = read_gold(GOLD2)
 
 # Bronze checks
 report["checks"]["bronze"] = {
@@ -77,11 +126,50 @@ report["checks"]["gold_yoy_growth"] = {
     "yoy_max": float(yoy["yoy_pct"].max()) if len(yoy) else None,
 }
 
+# Anomaly checks (gold_anomalies.py grava só os pontos marcados)
+# taxa de outliers alta demais costuma ser bug de unidade/escala, não dado real
+if ANOMALIES.exists():
+    anomalies = read_gold(ANOMALIES)
+    n_points = int(gold.groupby(["geo_id", "indic_id", "year"]).ngroups)
+    n_outliers = int(anomalies["is_outlier"].sum())
+    outlier_rate = n_outliers / n_points if n_points else 0.0
+    report["checks"]["gold_anomalies"] = {
+        "points": n_points,
+        "outliers": n_outliers,
+        "breaks": int(anomalies["is_break"].sum()),
+        "series_flagged": int(anomalies[["geo_id", "indic_id"]].drop_duplicates().shape[0]),
+        "outlier_rate": outlier_rate,
+        "max_outlier_rate": ANOMALY_MAX_OUTLIER_RATE,
+    }
+    if outlier_rate > ANOMALY_MAX_OUTLIER_RATE:
+        report["errors"].append(
+            f"Outlier rate {outlier_rate:.2%} above {ANOMALY_MAX_OUTLIER_RATE:.0%} (see gold_anomalies.parquet)"
+        )
+else:
+    report["checks"]["gold_anomalies"] = {"available": False}
+
+# Histórico (outputs-checks/quality_history/): drift contra os últimos runs e
+# append das métricas deste run; run_id vem do run_all.py (checkpoint)
+run_id = os.environ.get("EUROSTAT_RUN_ID") or new_run_id()
+report["run_id"] = run_id
+history = quality_history.load(exclude_run=run_id)
+current = quality_history.frame(run_id, quality_history.metrics_from_report(report))
+findings = quality_history.drift(history, current)
+report["drift"] = {"baseline_runs": int(quality_history.passed(history)["run_id"].nunique()), "findings": findings}
+for f in findings:
+    report["errors"].append(
+        f"Drift in {f['table']}.{f['metric']}: {f['value']:.6g} vs median {f['baseline']:.6g} of recent runs"
+    )
+
 # Final status
 if report["errors"]:
     report["status"] = "FAIL"
 
-OUT.write_text(json.dumps(report, indent=2), encoding="utf-8")
+write_text_atomic(OUT, json.dumps(report, indent=2))
+# status vai junto: run que falhou fica no histórico mas fora da baseline do drift
+quality_history.append(
+    quality_history.frame(run_id, quality_history.metrics_from_report(report), status=report["status"])
+)
 print("Quality report saved:", OUT)
 
 if report["status"] != "OK":
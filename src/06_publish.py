@@ -0,0 +1,25 @@
+import sys
+import time
+
+from publish import publish
+
+# python src/06_publish.py [--dry-run] [--delete-orphans]
+# roda à mão depois do pipeline + relatório: não é estágio do run_all.py nem
+# task do Airflow (precisa de bucket/credenciais e publica num lugar compartilhado)
+dry_run = "--dry-run" in sys.argv[1:]
+delete_orphans = "--delete-orphans" in sys.argv[1:]
+
+t0 = time.perf_counter()
+res = publish(dry_run=dry_run, **({"delete_orphans": True} if delete_orphans else {}))
+elapsed = time.perf_counter() - t0
+
+mode = "DRY RUN" if dry_run else "PUBLISHED"
+print(f"{mode}: s3://{res['bucket']}/{res['prefix']}")
+print(f"files: {res['files']} · uploaded: {len(res['uploaded'])} · unchanged: {res['skipped']}"
+      f" · bytes: {res['bytes_uploaded']:,}".replace(",", "."))
+for key in res["uploaded"]:
+    print("  +", key)
+for key in res["orphans"]:
+    # órfão: publicado antes, não existe mais localmente
+    print("  -" if key in res["deleted"] else "  ? (orphan, kept)", key)
+print(f"elapsed: {elapsed:.2f}s")
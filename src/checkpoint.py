@@ -0,0 +1,123 @@
+# src/checkpoint.py
+"""
+Checkpoint por run do pipeline.
+
+run_all.py (e cada task do Airflow, via run_all.py --stage) registra os
+estágios concluídos com tamanho/mtime dos arquivos que produziram. Um run que
+falhou é retomado do primeiro estágio incompleto; um estágio "done" cujas
+saídas mudaram desde então (apagadas ou reescritas por fora) volta a contar
+como incompleto.
+
+    runs/<run_id>/_run.json      started_at, updated_at, status (running | failed | ok),
+                                 datasets (se o run veio do watch mode)
+    runs/<run_id>/<stage>.json   finished_at, duration_s, outputs {caminho: [size, mtime_ns]}
+    runs/latest                  run_id do último run iniciado
+
+Um arquivo por estágio: tasks paralelas do Airflow (structural/anomalies/concentration)
+não disputam o mesmo JSON. Toda escrita é atômica (lake_fs.write_text_atomic).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import re
+
+from config import RUNS_DIR
+from lake_fs import LakePath, write_text_atomic
+
+RUN_RUNNING = "running"
+RUN_FAILED = "failed"
+RUN_OK = "ok"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def new_run_id() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def safe_run_id(run_id: str) -> str:
+    """run_id do Airflow (manual__2026-01-01T00:00:00+00:00) -> nome de diretório."""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", run_id).strip("_")
+
+
+def fingerprint(paths: list[Path | LakePath]) -> dict[str, list[int]] | None:
+    """{caminho: [size, mtime_ns]}, ou None se alguma saída não existe."""
+    out = {}
+    for p in paths:
+        if not p.exists():
+            return None
+        st = p.stat()
+        out[str(p)] = [int(st.st_size), int(st.st_mtime_ns)]
+    return out
+
+
+class RunCheckpoint:
+    def __init__(self, run_id: str, root: Path | LakePath = RUNS_DIR):
+        self.root = root
+        self.run_id = safe_run_id(run_id)
+        self.dir = root / self.run_id
+
+    @classmethod
+    def latest(cls, root: Path | LakePath = RUNS_DIR) -> RunCheckpoint | None:
+        pointer = root / "latest"
+        if not pointer.exists():
+            return None
+        return cls(pointer.read_text(encoding="utf-8").strip(), root)
+
+    # ----------------------------
+    # Run
+    # ----------------------------
+    def _run_file(self) -> Path | LakePath:
+        return self.dir / "_run.json"
+
+    def info(self) -> dict:
+        f = self._run_file()
+        return json.loads(f.read_text(encoding="utf-8")) if f.exists() else {}
+
+    @property
+    def status(self) -> str | None:
+        return self.info().get("status")
+
+    def set_status(self, status: str, **extra) -> None:
+        info = self.info() or {"run_id": self.run_id, "started_at": _now()}
+        info.update(status=status, updated_at=_now(), **extra)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(self._run_file(), json.dumps(info, indent=2))
+
+    def start(self, datasets: list[str] | None = None) -> None:
+        # datasets: os que dispararam o run (watch mode); fica no _run.json
+        self.set_status(RUN_RUNNING, **({"datasets": datasets} if datasets else {}))
+        write_text_atomic(self.root / "latest", self.run_id)
+
+    # ----------------------------
+    # Estágios
+    # ----------------------------
+    def _stage_file(self, stage: str) -> Path | LakePath:
+        return self.dir / f"{stage}.json"
+
+    def is_done(self, stage: str, outputs: list[Path | LakePath]) -> bool:
+        """Concluído neste run e com as saídas intactas."""
+        f = self._stage_file(stage)
+        if not f.exists():
+            return False
+        recorded = json.loads(f.read_text(encoding="utf-8")).get("outputs")
+        return recorded is not None and fingerprint(outputs) == recorded
+
+    def mark_done(self, stage: str, outputs: list[Path | LakePath], duration_s: float) -> None:
+        record = {
+            "stage": stage,
+            "finished_at": _now(),
+            "duration_s": round(duration_s, 3),
+            "outputs": fingerprint(outputs),
+        }
+        self.dir.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(self._stage_file(stage), json.dumps(record, indent=2))
+
+    def invalidate(self, stages: list[str]) -> None:
+        """Esquece estágios (ex.: os que dependem de um estágio que vai rodar de novo)."""
+        for stage in stages:
+            self._stage_file(stage).unlink(missing_ok=True)
@@ -1,15 +1,62 @@
 # src/config.py
 from pathlib import Path
+import os
+
+from lake_fs import lake_path
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
-DATA_RAW = REPO_ROOT / "data-raw"
-DATA_BRONZE = REPO_ROOT / "data-bronze"
-DATA_SILVER = REPO_ROOT / "data-silver"
-DATA_GOLD = REPO_ROOT / "data-gold"
-OUTPUTS_CHECKS = REPO_ROOT / "outputs-checks"
+# raiz dos dados (default: o próprio repo); EUROSTAT_LAKE_ROOT isola runs (ex.: benchmarks)
+LAKE_ROOT = Path(os.environ.get("EUROSTAT_LAKE_ROOT", REPO_ROOT)).resolve()
+
+# camadas em object storage: EUROSTAT_LAKE_URI=s3://bucket/prefixo (ou file://...)
+# os DATA_* viram lake_fs.LakePath; relatório e caches continuam locais
+LAKE_URI = os.environ.get("EUROSTAT_LAKE_URI")
+LAKE = lake_path(LAKE_URI) if LAKE_URI else LAKE_ROOT
+
+DATA_RAW = LAKE / "data-raw"
+DATA_BRONZE = LAKE / "data-bronze"
+DATA_SILVER = LAKE / "data-silver"
+DATA_GOLD = LAKE / "data-gold"
+OUTPUTS_CHECKS = LAKE / "outputs-checks"
+REPORTS_OUT = LAKE_ROOT / "reports" / "out"
+
+# checkpoints por run (run_all.py / tasks do Airflow): retomar do primeiro estágio incompleto
+RUNS_DIR = LAKE / "runs"
+
+# profiling opcional (src/profiling.py; run_all.py / relatório com --profile)
+# - PROFILE_MODE: "cprofile" (determinístico) ou "sample" (amostragem de pilhas)
+# - PROFILE_TOP_N: hotspots impressos e gravados em runs/<run_id>/profile/<estágio>.txt
+PROFILE_MODE = os.environ.get("EUROSTAT_PROFILE_MODE", "cprofile")
+PROFILE_TOP_N = int(os.environ.get("EUROSTAT_PROFILE_TOP_N", 25))
+PROFILE_SAMPLE_INTERVAL_MS = 5
+PROFILE_TRACEMALLOC_FRAMES = 1
+
+# cache local read-through dos arquivos gold remotos (LRU limitado em MB)
+LAKE_CACHE_DIR = Path(os.environ.get("EUROSTAT_LAKE_CACHE_DIR", LAKE_ROOT / ".lake_cache"))
+LAKE_CACHE_MAX_MB = int(os.environ.get("EUROSTAT_LAKE_CACHE_MAX_MB", 2048))
 
-EUROSTAT_BASE = "https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data"
+# bytecode dos templates Jinja do relatório (jinja2.FileSystemBytecodeCache):
+# um processo novo carrega o template compilado em vez de parsear/compilar de
+# novo; invalidado sozinho quando o template muda. Vazio = sem cache em disco
+_template_cache = os.environ.get("EUROSTAT_TEMPLATE_CACHE_DIR", str(LAKE_ROOT / ".template_cache"))
+REPORT_TEMPLATE_CACHE_DIR = Path(_template_cache) if _template_cache else None
+
+EUROSTAT_BASE = os.environ.get("EUROSTAT_DATA_BASE", "https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data")
+
+# metadados Eurostat (src/metadata.py): codelists SDMX (rótulos de geo /
+# indic_sbs / nace_r2) e o sumário (TOC) de datasets, baixados em paralelo e
+# guardados num cache local; dentro do TTL não há requisição nenhuma, depois
+# dele uma revalidação condicional (ETag / Last-Modified) que costuma voltar 304
+# EUROSTAT_METADATA_BASE aponta para um servidor local (fixture) nos testes
+METADATA_BASE = os.environ.get("EUROSTAT_METADATA_BASE", "https://ec.europa.eu/eurostat/api/dissemination")
+METADATA_CACHE_DIR = Path(os.environ.get("EUROSTAT_METADATA_CACHE_DIR", LAKE_ROOT / ".metadata_cache"))
+METADATA_TTL_HOURS = float(os.environ.get("EUROSTAT_METADATA_TTL_HOURS", 24))
+METADATA_LANG = os.environ.get("EUROSTAT_METADATA_LANG", "en")
+METADATA_CONCURRENCY = 4
+METADATA_TIMEOUT_S = 30
+# 0 = não acessa a rede (usa só o que estiver no cache; sem cache, rótulo = código)
+METADATA_FETCH = os.environ.get("EUROSTAT_METADATA_FETCH", "1") != "0"
 
 # seus 4 datasets (ajuste se quiser)
 DATASETS = [
@@ -18,3 +65,140 @@ DATASETS = [
     "estat_sbs_ovw_smc",
     "estat_sbs_sc_ovw",
 ]
+
+# watch mode (src/watch.py): consulta a data de atualização dos datasets (TOC,
+# GET condicional; HEAD na API de dados para quem não está no TOC) e só
+# baixa/roda o pipeline para os que mudaram
+# - WATCH_DATASETS: datasets observados; o pipeline (01 -> 05) só processa
+#   WATCH_PIPELINE_DATASET, os demais só são baixados de novo em data-raw/
+# - WATCH_INTERVAL_S: intervalo entre consultas
+# - erro de rede: nova tentativa em WATCH_BACKOFF_BASE_S, dobrando a cada falha
+#   seguida (com jitter) até WATCH_BACKOFF_MAX_S; o primeiro sucesso zera
+WATCH_PIPELINE_DATASET = "sbs_na_ind_r2"
+WATCH_DATASETS = os.environ.get("EUROSTAT_WATCH_DATASETS", WATCH_PIPELINE_DATASET).split(",")
+WATCH_INTERVAL_S = float(os.environ.get("EUROSTAT_WATCH_INTERVAL_S", 3600))
+WATCH_BACKOFF_BASE_S = 60
+WATCH_BACKOFF_MAX_S = float(os.environ.get("EUROSTAT_WATCH_BACKOFF_MAX_S", 6 * 3600))
+WATCH_TIMEOUT_S = 30
+WATCH_STATE = RUNS_DIR / "watch.json"
+
+# snapshot Arrow IPC (Feather v2) ao lado de cada Parquet gold, lido via memory map
+# compressão: None (zero-copy), "lz4" ou "zstd"
+GOLD_IPC_SNAPSHOT = True
+GOLD_IPC_COMPRESSION: str | None = None
+
+# gold recalcula só as séries revisadas quando há change log válido do silver
+GOLD_INCREMENTAL = True
+
+# densificação opcional das séries no gold: None (só anos observados), "linear"
+# ou "locf"; pontos preenchidos ficam com imputed = True. Mudar força refresh completo
+GOLD_DENSIFY: str | None = os.environ.get("EUROSTAT_GOLD_DENSIFY") or None
+
+# execução em shards por indicador num pool de processos (src/sharding.py):
+# gold (04) e métricas estruturais. 1 = um processo só; 0 = todos os núcleos
+# - GOLD_SHARD_MIN_ROWS: abaixo disso roda num processo (pool não compensa)
+# - GOLD_SHARDS_PER_WORKER: shards por worker, para balancear indicadores desiguais
+GOLD_WORKERS = int(os.environ.get("EUROSTAT_GOLD_WORKERS", 1))
+GOLD_SHARD_MIN_ROWS = int(os.environ.get("EUROSTAT_GOLD_SHARD_MIN_ROWS", 200_000))
+GOLD_SHARDS_PER_WORKER = 4
+
+# anomalias (src/gold/gold_anomalies.py): z-scores robustos (mediana/MAD) por série
+# - ANOMALY_WINDOW: janela centrada (anos) do filtro de Hampel no log do valor
+# - ANOMALY_BREAK_WINDOW: anos de cada lado para detectar quebra de nível
+# - ANOMALY_MAD_FLOOR: piso do MAD (log), evita z infinito em séries quase constantes
+# - ANOMALY_MAX_OUTLIER_RATE: acima disso o 05_quality_checks falha
+ANOMALY_WINDOW = 5
+ANOMALY_Z = 3.5
+ANOMALY_BREAK_WINDOW = 3
+ANOMALY_BREAK_Z = 5.0
+ANOMALY_MAD_FLOOR = 0.01
+ANOMALY_CHUNK_ROWS = 1_000_000
+ANOMALY_MAX_OUTLIER_RATE = 0.05
+
+# histórico de qualidade (src/quality_history.py): um Parquet por run em
+# outputs-checks/quality_history/, compactado acima de QUALITY_HISTORY_COMPACT_FILES
+# drift: run atual vs mediana dos últimos QUALITY_DRIFT_WINDOW runs (precisa de
+# QUALITY_DRIFT_MIN_RUNS); queda de linhas / salto de null rate acima do limite falha o 05
+QUALITY_HISTORY_COMPACT_FILES = 50
+QUALITY_DRIFT_WINDOW = 10
+QUALITY_DRIFT_MIN_RUNS = 3
+QUALITY_DRIFT_MAX_ROW_DROP = 0.20
+QUALITY_DRIFT_MAX_NULL_JUMP = 0.05
+
+# concentração por (indicador, ano) (src/gold/gold_concentration.py): top-k participações
+CONCENTRATION_TOP_K = (1, 3, 5)
+
+# política de tipos no armazenamento: os contratos (src/contracts.py) usam
+# tipos lógicos e a política escolhe o tipo físico gravado em todas as camadas
+# - "year": ano civil -> int16
+# - "float": métricas derivadas (%, z-scores, shares) que toleram float32
+#   (~7 dígitos significativos); valores observados continuam "double"
+# - "dim": códigos de dimensão repetidos (geo, indic_sbs, flag, ...) ->
+#   dictionary no Arrow/Parquet, categorical no pandas
+# EUROSTAT_STORAGE_POLICY=wide grava o layout antigo (int64/float64/string),
+# para comparação (benchmarks/bench_storage_policy.py); EUROSTAT_STORAGE_FLOAT32=0
+# mantém "float" em float64 na política compact
+STORAGE_POLICIES = {
+    "compact": {"year": "int16", "float": "float", "dim": "category"},
+    "wide": {"year": "int64", "float": "double", "dim": "string"},
+}
+STORAGE_POLICY_NAME = os.environ.get("EUROSTAT_STORAGE_POLICY", "compact")
+STORAGE_POLICY = dict(STORAGE_POLICIES[STORAGE_POLICY_NAME])
+if os.environ.get("EUROSTAT_STORAGE_FLOAT32", "1") == "0":
+    STORAGE_POLICY["float"] = "double"
+
+# perfis de escrita Parquet (ver lake_io.write_parquet)
+# - compression / compression_level: codec do pyarrow (snappy, lz4, zstd, ...)
+# - dictionary: True (todas), False (nenhuma) ou "dims" (só colunas de dimensão da camada)
+# - row_group_mb: alvo de tamanho (em memória) por row group
+# - sort: ordena pelas chaves da camada (PARQUET_SORT_BY) -> estatísticas min/max úteis
+# - page_index / bloom_filter: page index e bloom filter nas colunas geo da camada
+PARQUET_PROFILES = {
+    "default": {"compression": "snappy"},
+    "snappy": {"compression": "snappy", "dictionary": "dims", "row_group_mb": 64, "sort": True},
+    "lz4": {"compression": "lz4", "dictionary": "dims", "row_group_mb": 64, "sort": True},
+    "zstd": {"compression": "zstd", "compression_level": 3, "dictionary": "dims", "row_group_mb": 64, "sort": True},
+    "zstd-max": {"compression": "zstd", "compression_level": 12, "dictionary": "dims", "row_group_mb": 128, "sort": True},
+    "zstd-selective": {
+        "compression": "zstd", "compression_level": 3, "dictionary": "dims", "row_group_mb": 16,
+        "sort": True, "page_index": True, "bloom_filter": True,
+    },
+}
+
+LAYER_PARQUET_PROFILE = {
+    "bronze": "zstd",
+    "silver": "zstd-selective",
+    "gold": "zstd-selective",
+}
+
+PARQUET_SORT_BY = {
+    "bronze": [],
+    "silver": ["indic_sbs", "geo", "nace_r2", "year"],
+    "gold": ["indic_id", "geo_id", "nace_id", "year"],
+}
+
+PARQUET_DIMENSION_COLUMNS = {
+    "bronze": [],
+    "silver": ["freq", "nace_r2", "indic_sbs", "geo", "flag", "geo_id", "indic_id", "nace_id"],
+    "gold": ["geo_id", "indic_id", "nace_id"],
+}
+
+PARQUET_BLOOM_COLUMNS = {
+    "bronze": [],
+    "silver": ["geo"],
+    "gold": ["geo_id"],
+}
+
+# publicação em object storage S3-compatível (src/06_publish.py, requer boto3)
+# EUROSTAT_S3_ENDPOINT_URL aponta para um stand-in local (MinIO / moto server)
+S3_BUCKET = os.environ.get("EUROSTAT_S3_BUCKET")
+S3_PREFIX = os.environ.get("EUROSTAT_S3_PREFIX", "eurostat-lakehouse")
+S3_ENDPOINT_URL = os.environ.get("EUROSTAT_S3_ENDPOINT_URL")
+S3_REGION = os.environ.get("AWS_REGION", "us-east-2")
+
+PUBLISH_FILE_CONCURRENCY = int(os.environ.get("EUROSTAT_PUBLISH_FILE_CONCURRENCY", 8))
+PUBLISH_PART_CONCURRENCY = int(os.environ.get("EUROSTAT_PUBLISH_PART_CONCURRENCY", 4))
+PUBLISH_PART_SIZE_MB = int(os.environ.get("EUROSTAT_PUBLISH_PART_SIZE_MB", 16))
+PUBLISH_MULTIPART_THRESHOLD_MB = int(os.environ.get("EUROSTAT_PUBLISH_MULTIPART_THRESHOLD_MB", 16))
+# objetos publicados antes e que não existem mais localmente: só listar (0, default) ou apagar (1)
+PUBLISH_DELETE_ORPHANS = os.environ.get("EUROSTAT_PUBLISH_DELETE_ORPHANS", "0") == "1"
@@ -0,0 +1,247 @@
+# src/contracts.py
+"""
+Contratos de schema versionados por camada, gravados no key-value metadata do
+Parquet (chave `eurostat.contract`) e no schema do snapshot Arrow IPC.
+
+- escrita (lake_io.write_parquet / write_gold / write_frame com contract=...):
+  valida colunas obrigatórias, faz cast dos tipos divergentes e grava o contrato
+- leitura: check() lê só o footer (schema + metadata), sem tocar nos dados;
+  guaranteed() diz se o leitor pode pular as coerções defensivas
+  (pd.to_numeric, `if "x" in df.columns`, ...)
+
+Mudou o formato de uma tabela? Atualize as colunas aqui e suba a versão da
+camada: arquivos antigos passam a falhar no check em vez de quebrar no meio.
+
+Tipos lógicos "year", "float" e "dim" são resolvidos pela política de
+armazenamento (STORAGE_POLICY em src/config.py) no tipo físico gravado:
+int16 / float32 / dictionary (categorical no pandas) no default "compact".
+Os demais ("int16", "double", "string", ...) são gravados como estão.
+
+pyarrow é importado dentro das funções: o gold lê CONTRACTS (versão) antes de
+decidir se sai cedo sem importar pandas/pyarrow.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+import json
+
+from config import STORAGE_POLICY
+from lake_fs import LakePath, arrow_source
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+CONTRACT_KEY = b"eurostat.contract"
+
+# tipos físicos: "string" = string/large_string, "category" = dictionary<string>;
+# "year" / "float" / "dim" passam por STORAGE_POLICY
+CONTRACTS: dict[str, dict] = {
+    "bronze": {
+        "version": 1,
+        "tables": {
+            # + uma coluna string por ano (variável conforme o dataset)
+            "sbs_na_ind_r2": {"key": "string"},
+        },
+    },
+    "silver": {
+        "version": 4,
+        "tables": {
+            "sbs_na_ind_r2": {
+                "freq": "dim", "nace_r2": "dim", "indic_sbs": "dim", "geo": "dim",
+                "year": "year", "value_raw": "string", "value_num": "double", "flag": "dim",
+                "geo_id": "int16", "indic_id": "int16", "nace_id": "int32",
+            },
+            "dim_geo": {
+                "geo_id": "int16", "geo": "string", "label": "string", "geo_type": "dim", "is_country": "bool",
+            },
+            "dim_indicator": {"indic_id": "int16", "indic_sbs": "string", "label": "string"},
+            "dim_nace": {"nace_id": "int32", "nace_r2": "string", "label": "string"},
+            "changes": {
+                "change_type": "dim", "freq": "dim", "nace_r2": "dim", "indic_sbs": "dim",
+                "geo": "dim", "year": "year", "value_old": "double", "value_new": "double",
+                "flag_old": "dim", "flag_new": "dim",
+            },
+        },
+    },
+    "gold": {
+        "version": 3,
+        "tables": {
+            "country_indicator_year": {
+                "geo_id": "int16", "indic_id": "int16", "nace_id": "int32", "year": "year",
+                "value": "double", "imputed": "bool",
+            },
+            "yoy_growth": {
+                "geo_id": "int16", "indic_id": "int16", "nace_id": "int32", "year": "year",
+                "value": "double", "imputed": "bool", "value_prev": "double", "yoy_pct": "float",
+            },
+            "structural_metrics": {
+                "geo_id": "int16", "indic_id": "int16", "year_min": "year", "year_max": "year",
+                "n_years": "int16", "year_first": "year", "year_last": "year",
+                "value_first": "double", "value_last": "double", "abs_change": "double",
+                "pct_change": "float", "cagr": "float", "yoy_mean": "float",
+                "yoy_volatility": "float", "yoy_n": "int16", "rank_first_year": "float",
+                "rank_last_year": "float", "rank_delta": "float",
+            },
+            "anomalies": {
+                "geo_id": "int16", "indic_id": "int16", "year": "year", "value": "double",
+                "log_growth": "float", "z_outlier": "float", "z_break": "float",
+                "is_outlier": "bool", "is_break": "bool",
+            },
+            "geo_share": {
+                "geo_id": "int16", "indic_id": "int16", "year": "year", "value": "double",
+                "share": "float", "rank": "int16", "cum_share": "float",
+            },
+            # + top<k>_share (double) para cada k de CONCENTRATION_TOP_K
+            "concentration": {
+                "indic_id": "int16", "year": "year", "n_geo": "int16", "total": "double", "hhi": "float",
+            },
+        },
+    },
+}
+
+
+class ContractError(ValueError):
+    pass
+
+
+def _split(name: str) -> tuple[str, str]:
+    layer, _, table = name.partition(".")
+    if layer not in CONTRACTS or table not in CONTRACTS[layer]["tables"]:
+        raise KeyError(f"Unknown contract: {name!r}")
+    return layer, table
+
+
+def physical(typ: str) -> str:
+    """Tipo físico de um tipo do contrato ("year" / "float" / "dim" via STORAGE_POLICY)."""
+    return STORAGE_POLICY.get(typ, typ)
+
+
+def expected(name: str) -> dict:
+    """{"name", "version", "columns"} do contrato `camada.tabela`, com os tipos físicos."""
+    layer, table = _split(name)
+    columns = {col: physical(typ) for col, typ in CONTRACTS[layer]["tables"][table].items()}
+    return {"name": name, "version": CONTRACTS[layer]["version"], "columns": columns}
+
+
+def type_name(t: pa.DataType) -> str:
+    import pyarrow as pa
+
+    def is_text(x: pa.DataType) -> bool:
+        return pa.types.is_string(x) or pa.types.is_large_string(x)
+
+    if pa.types.is_dictionary(t) and is_text(t.value_type):
+        return "category"
+    if is_text(t):
+        return "string"
+    return str(t)
+
+
+def _cast(column: pa.ChunkedArray, typ: str) -> pa.ChunkedArray:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    if typ == "category":
+        if type_name(column.type) != "string":
+            column = column.cast(pa.string())
+        return pc.dictionary_encode(column)
+    target = pa.string() if typ == "string" else pa.type_for_alias(typ)
+    return column.cast(target)
+
+
+def _mismatches(schema: pa.Schema, columns: dict[str, str]) -> list[str]:
+    out = []
+    for col, typ in columns.items():
+        i = schema.get_field_index(col)
+        if i < 0:
+            out.append(f"missing column {col!r}")
+        elif type_name(schema.field(i).type) != typ:
+            out.append(f"{col!r} is {type_name(schema.field(i).type)}, expected {typ}")
+    return out
+
+
+def _pandas_metadata(raw: bytes, schema: pa.Schema, cast: set[str]) -> bytes:
+    """
+    Atualiza o dtype pandas das colunas convertidas: sem isso o to_pandas()
+    reconstrói o dtype de origem (ex.: year int16 volta a Int64, uma cópia
+    de 8 bytes/linha em todo leitor).
+    """
+    import pyarrow as pa
+
+    meta = json.loads(raw)
+    for entry in meta.get("columns", []):
+        name = entry.get("field_name") or entry.get("name")
+        if name not in cast:
+            continue
+        typ = schema.field(name).type
+        if pa.types.is_dictionary(typ):
+            entry.update(pandas_type="categorical", numpy_type=str(typ.index_type),
+                         metadata={"num_categories": None, "ordered": False})
+        elif pa.types.is_integer(typ) or pa.types.is_floating(typ):
+            dtype = typ.to_pandas_dtype().__name__
+            entry.update(pandas_type=dtype, numpy_type=dtype, metadata=None)
+    return json.dumps(meta).encode("utf-8")
+
+
+def enforce(table: pa.Table, name: str) -> pa.Table:
+    """Valida/converte a tabela para o contrato e grava o contrato no schema."""
+    import pyarrow as pa
+
+    contract = expected(name)
+    cast = set()
+    for col, typ in contract["columns"].items():
+        i = table.schema.get_field_index(col)
+        if i < 0:
+            raise ContractError(f"{name}: missing column {col!r}")
+        current = table.schema.field(i).type
+        if type_name(current) == typ:
+            continue
+        # colunas só com nulos (ex.: change log vazio) também caem aqui
+        try:
+            table = table.set_column(i, col, _cast(table.column(i), typ))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ContractError(f"{name}: column {col!r} ({current}) does not cast to {typ}: {e}") from e
+        cast.add(col)
+
+    metadata = dict(table.schema.metadata or {})
+    if cast and b"pandas" in metadata:
+        metadata[b"pandas"] = _pandas_metadata(metadata[b"pandas"], table.schema, cast)
+    metadata[CONTRACT_KEY] = json.dumps(contract).encode("utf-8")
+    return table.replace_schema_metadata(metadata)
+
+
+def read_contract(path: Path | LakePath) -> tuple[dict | None, pa.Schema]:
+    """Contrato gravado no arquivo (só o footer é lido) e o schema físico."""
+    import pyarrow.parquet as pq
+
+    where, fs = arrow_source(path)
+    schema = pq.read_schema(where, filesystem=fs)
+    raw = (schema.metadata or {}).get(CONTRACT_KEY)
+    return (json.loads(raw) if raw else None), schema
+
+
+def check(path: Path | LakePath, name: str) -> dict:
+    """Confere nome, versão e tipos do contrato no footer; ContractError se divergir."""
+    want = expected(name)
+    found, schema = read_contract(path)
+    if found is None:
+        raise ContractError(f"{path}: no schema contract (written by an older version; rerun the stage)")
+    if found.get("name") != name or found.get("version") != want["version"]:
+        raise ContractError(
+            f"{path}: contract {found.get('name')} v{found.get('version')}, expected {name} v{want['version']}"
+        )
+    problems = _mismatches(schema, want["columns"])
+    if problems:
+        raise ContractError(f"{path}: " + "; ".join(problems))
+    return found
+
+
+def guaranteed(path: Path | LakePath, name: str) -> bool:
+    """True se o arquivo cumpre o contrato atual (leitor pode pular coerções)."""
+    try:
+        check(path, name)
+    except (ContractError, FileNotFoundError, OSError):
+        return False
+    return True
@@ -0,0 +1,177 @@
+# src/dimensions.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_SILVER
+from lake_io import read_parquet, write_frame
+
+DIM_GEO = DATA_SILVER / "dim_geo.parquet"
+DIM_INDICATOR = DATA_SILVER / "dim_indicator.parquet"
+DIM_NACE = DATA_SILVER / "dim_nace.parquet"
+
+GEO_TYPE_COUNTRY = "country"
+GEO_TYPE_AGGREGATE = "aggregate"
+
+# (nome da dimensão, coluna de código, coluna da chave inteira, arquivo)
+DIMENSIONS = {
+    "geo": ("geo", "geo_id", DIM_GEO),
+    "indicator": ("indic_sbs", "indic_id", DIM_INDICATOR),
+    "nace": ("nace_r2", "nace_id", DIM_NACE),
+}
+
+# dtype da chave por dimensão. geo_id e indic_id entram na chave de série
+# (geo_id << 16 | indic_id, gold / consultas) e ficam em int16; NACE tem
+# milhares de códigos nos dados grandes e não é empacotado: int32
+KEY_DTYPES = {
+    "geo": "int16",
+    "indicator": "int16",
+    "nace": "int32",
+}
+
+
+class DimensionOverflowError(ValueError):
+    pass
+
+
+def check_cardinality(name: str, n_codes: int, dtype: str) -> None:
+    """Mais códigos que o dtype da chave comporta: erro (senão os ids dão a volta e colidem)."""
+    limit = int(np.iinfo(dtype).max) + 1
+    if n_codes > limit:
+        raise DimensionOverflowError(
+            f"dimension {name!r} has {n_codes:,} codes; {dtype} keys hold at most {limit:,} "
+            f"(widen KEY_DTYPES[{name!r}] and the contracts that carry the key)"
+        )
+
+
+def classify_geo(codes: pd.Series) -> pd.Series:
+    """
+    Classifica códigos geo em país vs agregado (EU27_2020, EA19, EU, EA...).
+    Roda uma única vez sobre os códigos distintos, não por linha do fato.
+    """
+    g = codes.astype(str).str.strip().str.upper()
+    aggregate = (
+        g.str.contains("_", regex=False)
+        | g.str.startswith("EU")
+        | g.str.startswith("EA")
+        | ~g.str.len().isin([2, 3])
+    )
+    return pd.Series(
+        np.where(aggregate, GEO_TYPE_AGGREGATE, GEO_TYPE_COUNTRY),
+        index=codes.index,
+    )
+
+
+def build_dim(
+    values: pd.Series,
+    code_col: str,
+    id_col: str,
+    previous: pd.DataFrame | None = None,
+    dtype: str = "int16",
+) -> pd.DataFrame:
+    """
+    Chaves estáveis entre runs: códigos já conhecidos mantêm o id anterior e
+    códigos novos entram no fim (ids continuam contíguos 0..n-1).
+    DimensionOverflowError se os códigos não cabem no dtype da chave.
+    """
+    codes = np.sort(values.dropna().astype(str).unique())
+    if previous is None or previous.empty:
+        known = pd.DataFrame({id_col: pd.Series(dtype=dtype), code_col: pd.Series(dtype=object)})
+    else:
+        known = previous[[id_col, code_col]].sort_values(id_col, ignore_index=True)
+    new_codes = codes[~np.isin(codes, known[code_col].to_numpy())]
+    check_cardinality(code_col, len(known) + len(new_codes), dtype)
+    new = pd.DataFrame({
+        id_col: np.arange(len(known), len(known) + len(new_codes), dtype=np.int64),
+        code_col: new_codes,
+    })
+    dim = pd.concat([known, new], ignore_index=True) if len(known) else new
+    dim[id_col] = dim[id_col].astype(dtype)
+    return dim
+
+
+def attach_labels(
+    dim: pd.DataFrame,
+    code_col: str,
+    labels: dict[str, str],
+    previous: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Coluna label: rótulo da codelist (src/metadata.py); sem ele, o rótulo do
+    run anterior (cache apagado / offline) e, por último, o próprio código.
+    """
+    label = dim[code_col].map(labels)
+    if previous is not None and "label" in previous.columns:
+        label = label.fillna(dim[code_col].map(dict(zip(previous[code_col], previous["label"]))))
+    dim["label"] = label.fillna(dim[code_col]).astype(str)
+    return dim
+
+
+def build_dimensions(
+    df: pd.DataFrame,
+    previous: dict[str, pd.DataFrame] | None = None,
+    labels: dict[str, dict[str, str]] | None = None,
+) -> dict[str, pd.DataFrame]:
+    previous = previous or {}
+    labels = labels or {}
+    dims = {
+        name: attach_labels(
+            build_dim(df[code_col], code_col, id_col, previous.get(name), KEY_DTYPES[name]),
+            code_col, labels.get(name, {}), previous.get(name),
+        )
+        for name, (code_col, id_col, _) in DIMENSIONS.items()
+    }
+    geo = dims["geo"]
+    geo["geo_type"] = classify_geo(geo["geo"])
+    geo["is_country"] = geo["geo_type"] == GEO_TYPE_COUNTRY
+    return dims
+
+
+def encode(df: pd.DataFrame, dims: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Adiciona as chaves inteiras (geo_id, indic_id, nace_id) ao fato."""
+    for name, (code_col, id_col, _) in DIMENSIONS.items():
+        check_cardinality(code_col, len(dims[name]), KEY_DTYPES[name])
+        cat = pd.Categorical(df[code_col], categories=dims[name][code_col])
+        df[id_col] = cat.codes.astype(KEY_DTYPES[name])
+    return df
+
+
+def write_dimensions(dims: dict[str, pd.DataFrame]) -> None:
+    for name, (_, _, path) in DIMENSIONS.items():
+        write_frame(dims[name], path, contract=f"silver.dim_{name}")
+
+
+def load_dimensions() -> dict[str, pd.DataFrame]:
+    dims: dict[str, pd.DataFrame] = {}
+    for name, (_, id_col, path) in DIMENSIONS.items():
+        if not path.exists():
+            raise FileNotFoundError(f"Dimension table not found: {path}")
+        dims[name] = read_parquet(path).sort_values(id_col, ignore_index=True)
+    return dims
+
+
+def load_previous_dimensions() -> dict[str, pd.DataFrame] | None:
+    if not all(path.exists() for _, _, path in DIMENSIONS.values()):
+        return None
+    return load_dimensions()
+
+
+def codes_by_id(dim: pd.DataFrame, code_col: str) -> np.ndarray:
+    """Array de códigos indexado pela chave (ids são 0..n-1 contíguos)."""
+    return dim[code_col].to_numpy()
+
+
+def labels_by_id(dim: pd.DataFrame, code_col: str) -> np.ndarray:
+    """Array de rótulos indexado pela chave; dimensões sem label caem no código."""
+    return dim["label" if "label" in dim.columns else code_col].to_numpy()
+
+
+def country_mask(dim_geo: pd.DataFrame) -> np.ndarray:
+    """Máscara booleana indexada por geo_id: mask[df['geo_id']] filtra países."""
+    return dim_geo["is_country"].to_numpy(dtype=bool)
+
+
+def lookup_id(dim: pd.DataFrame, code_col: str, id_col: str, code: str) -> int | None:
+    hit = dim.loc[dim[code_col] == code, id_col]
+    return int(hit.iloc[0]) if len(hit) else None
@@ -0,0 +1,177 @@
+"""
+Anomaly scores for every (geo, indic_sbs, year) point of the gold layer.
+
+All series are scored together on flat, sorted arrays (no per-series loop):
+
+- outliers: Hampel filter on log(value) -- robust z-score of each point
+  against the median/MAD of a centered window of its own series
+- structural breaks: jump between the medians of the h points after and the
+  h points before each year, net of the series' typical growth and scaled by
+  the series' MAD of log growth; only the local peak of each jump is kept
+
+A one-year spike moves neither window median, so it is an outlier and not a
+break; a persistent level shift leaves the centered median on one side, so it
+is a break and not an outlier.
+
+Writes data-gold/gold_anomalies.parquet with the flagged points only; read by
+05_quality_checks.py and the HTML report.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# ----------------------------
+# Paths (repo root)
+# ----------------------------
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from config import (  # noqa: E402
+    ANOMALY_BREAK_WINDOW,
+    ANOMALY_BREAK_Z,
+    ANOMALY_CHUNK_ROWS,
+    ANOMALY_MAD_FLOOR,
+    ANOMALY_WINDOW,
+    ANOMALY_Z,
+    DATA_GOLD,
+)
+from lake_io import read_gold, write_gold  # noqa: E402
+
+GOLD_PATH = DATA_GOLD / "gold_country_indicator_year.parquet"
+OUT_PARQUET = DATA_GOLD / "gold_anomalies.parquet"
+
+KEY = ["geo_id", "indic_id", "year"]
+
+# MAD -> robust z (0.6745 = Phi^-1(0.75), makes MAD comparable to a std dev)
+MAD_TO_Z = 0.6745
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def series_ids(df: pd.DataFrame) -> np.ndarray:
+    """Dense series id per row (df sorted by geo_id, indic_id, year)."""
+    key = (df["geo_id"].to_numpy(np.int64) << 16) | df["indic_id"].to_numpy(np.int64)
+    start = np.empty(len(key), dtype=bool)
+    start[:1] = True
+    start[1:] = key[1:] != key[:-1]
+    return np.cumsum(start) - 1
+
+
+def shift_in_series(x: np.ndarray, sid: np.ndarray, k: int) -> np.ndarray:
+    """x[i - k] when row i - k belongs to the same series, else NaN."""
+    out = np.full(len(x), np.nan)
+    if k > 0:
+        same = sid[k:] == sid[:-k]
+        out[k:][same] = x[:-k][same]
+    elif k < 0:
+        same = sid[:k] == sid[-k:]
+        out[:k][same] = x[-k:][same]
+    else:
+        out[:] = x
+    return out
+
+
+def rolling_median(
+    x: np.ndarray, sid: np.ndarray, lo: int, hi: int, with_mad: bool = False, chunk_rows: int = ANOMALY_CHUNK_ROWS
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Median (and MAD around it) of x over offsets lo..hi of each row, restricted
+    to the row's own series. Windows are gathered as a (rows x width) matrix in
+    chunks, so memory stays bounded at chunk_rows * width.
+    """
+    n = len(x)
+    offsets = np.arange(lo, hi + 1)
+    med = np.empty(n)
+    mad = np.empty(n) if with_mad else None
+    with warnings.catch_warnings():
+        # rows whose window is empty (series edges, log of 0) -> NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for a in range(0, n, chunk_rows):
+            b = min(a + chunk_rows, n)
+            idx = np.arange(a, b)[:, None] + offsets[None, :]
+            inside = (idx >= 0) & (idx < n)
+            idx = np.clip(idx, 0, n - 1)
+            inside &= sid[idx] == sid[a:b, None]
+            win = np.where(inside, x[idx], np.nan)
+            m = np.nanmedian(win, axis=1)
+            med[a:b] = m
+            if with_mad:
+                mad[a:b] = np.nanmedian(np.abs(win - m[:, None]), axis=1)
+    return med, mad
+
+
+def score_points(pts: pd.DataFrame) -> pd.DataFrame:
+    """
+    pts: one row per (geo_id, indic_id, year) with `value`, sorted by KEY.
+    Returns pts with log growth, outlier/break z-scores and flags.
+    """
+    sid = series_ids(pts)
+    value = pts["value"].to_numpy(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logv = np.where(value > 0, np.log(value), np.nan)
+
+    # log growth vs the previous observation of the series
+    growth = logv - shift_in_series(logv, sid, 1)
+
+    # typical year-to-year noise of each series (median/MAD of log growth)
+    g = pd.Series(growth)
+    g_med = g.groupby(sid).transform("median").to_numpy()
+    g_mad = (g - g_med).abs().groupby(sid).transform("median").to_numpy()
+
+    # --- outliers: Hampel on the log level; a 5-point window MAD alone is
+    # too noisy, so the series' growth MAD is a lower bound for the scale
+    half = ANOMALY_WINDOW // 2
+    med, mad = rolling_median(logv, sid, -half, half, with_mad=True)
+    z_outlier = MAD_TO_Z * (logv - med) / np.fmax(np.fmax(mad, g_mad), ANOMALY_MAD_FLOOR)
+
+    # --- structural breaks: median after vs median before, net of trend
+    h = ANOMALY_BREAK_WINDOW
+    after, _ = rolling_median(logv, sid, 0, h - 1)
+    before, _ = rolling_median(logv, sid, -h, -1)
+    z_break = MAD_TO_Z * ((after - before) - h * g_med) / np.fmax(g_mad, ANOMALY_MAD_FLOOR)
+
+    # a shift is seen by every year whose windows straddle it: keep the peak
+    strength = np.nan_to_num(np.abs(z_break), nan=-1.0)
+    prev_s = np.nan_to_num(shift_in_series(strength, sid, 1), nan=-1.0)
+    next_s = np.nan_to_num(shift_in_series(strength, sid, -1), nan=-1.0)
+    peak = (strength >= prev_s) & (strength > next_s)
+
+    out = pts.copy()
+    out["log_growth"] = growth
+    out["z_outlier"] = z_outlier
+    out["z_break"] = z_break
+    out["is_outlier"] = np.abs(np.nan_to_num(z_outlier)) > ANOMALY_Z
+    out["is_break"] = peak & (np.abs(np.nan_to_num(z_break)) > ANOMALY_BREAK_Z)
+    return out
+
+
+def main() -> None:
+    if not GOLD_PATH.exists():
+        raise FileNotFoundError(f"Gold file not found: {GOLD_PATH}")
+
+    # one point per (geo, indic, year): country-year total over NACE, as in the report
+    base = read_gold(GOLD_PATH, columns=["geo_id", "indic_id", "year", "value"])
+    pts = base.groupby(KEY, as_index=False, sort=True)["value"].sum()
+
+    scored = score_points(pts)
+    flagged = scored.loc[scored["is_outlier"] | scored["is_break"]].reset_index(drop=True)
+    write_gold(flagged, OUT_PARQUET, contract="gold.anomalies")
+
+    n_series = int(series_ids(pts).max() + 1) if len(pts) else 0
+    print("Saved:")
+    print(f"- {OUT_PARQUET}")
+    print(
+        f"Points: {len(pts):,} · series: {n_series:,} · outliers: {int(flagged['is_outlier'].sum()):,}"
+        f" · breaks: {int(flagged['is_break'].sum()):,}".replace(",", ".")
+    )
+
+
+if __name__ == "__main__":
+    main()
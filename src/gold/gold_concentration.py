@@ -0,0 +1,113 @@
+"""
+Cross-country share and concentration mart per (indic_sbs, year).
+
+Country-year totals (sum over NACE, countries only) are sorted once by
+(indic_id, year, value desc); every group is then a contiguous slice, so
+totals, shares, ranks, cumulative shares and the Herfindahl-Hirschman index
+come out of reduceat/cumsum over flat arrays -- no groupby-apply.
+
+Writes:
+- data-gold/gold_geo_share.parquet: geo_id, indic_id, year, value, share,
+  rank, cum_share (one row per country-year)
+- data-gold/gold_concentration.parquet: indic_id, year, n_geo, total, hhi,
+  top<k>_share for each k in CONCENTRATION_TOP_K (one row per indicator-year)
+
+HHI is on the 0..10000 scale (shares in percent, squared and summed).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# ----------------------------
+# Paths (repo root)
+# ----------------------------
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from config import CONCENTRATION_TOP_K, DATA_GOLD  # noqa: E402
+from dimensions import country_mask, load_dimensions  # noqa: E402
+from lake_io import read_gold, write_gold  # noqa: E402
+
+GOLD_PATH = DATA_GOLD / "gold_country_indicator_year.parquet"
+OUT_SHARE = DATA_GOLD / "gold_geo_share.parquet"
+OUT_CONCENTRATION = DATA_GOLD / "gold_concentration.parquet"
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def group_starts(indic_id: np.ndarray, year: np.ndarray) -> np.ndarray:
+    """Start offsets of each (indic_id, year) group in sorted arrays."""
+    key = (indic_id.astype(np.int64) << 16) | year.astype(np.int64)
+    change = np.empty(len(key), dtype=bool)
+    change[:1] = True
+    change[1:] = key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+
+def concentration(pts: pd.DataFrame, top_k=CONCENTRATION_TOP_K) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    pts: one row per (geo_id, indic_id, year) with value >= 0.
+    Returns (per-geo shares, per indicator-year concentration).
+    """
+    pts = pts.sort_values(["indic_id", "year", "value"], ascending=[True, True, False], ignore_index=True)
+    value = pts["value"].to_numpy(np.float64)
+    starts = group_starts(pts["indic_id"].to_numpy(), pts["year"].to_numpy())
+    sizes = np.diff(np.append(starts, len(pts)))
+    group = np.repeat(np.arange(len(starts)), sizes)
+
+    total = np.add.reduceat(value, starts) if len(pts) else np.empty(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(total[group] > 0, value / total[group], np.nan)
+
+    # rank and cumulative share inside each group: global cumsum minus the
+    # cumsum at the group start (groups are contiguous and sorted desc)
+    rank = np.arange(len(pts)) - starts[group] + 1
+    csum = np.cumsum(np.nan_to_num(share))
+    offset = np.concatenate([[0.0], csum[starts[1:] - 1]]) if len(starts) else np.empty(0)
+    cum_share = csum - offset[group]
+
+    shares = pts[["geo_id", "indic_id", "year", "value"]].copy()
+    shares["share"] = share
+    shares["rank"] = rank.astype("int16")
+    shares["cum_share"] = cum_share
+
+    conc = pts.loc[starts, ["indic_id", "year"]].reset_index(drop=True)
+    conc["n_geo"] = sizes.astype("int16")
+    conc["total"] = total
+    conc["hhi"] = np.add.reduceat(np.nan_to_num(share * 100.0) ** 2, starts) if len(pts) else np.empty(0)
+    for k in top_k:
+        # cumulative share at rank min(k, group size)
+        conc[f"top{k}_share"] = cum_share[starts + np.minimum(k, sizes) - 1] if len(pts) else np.empty(0)
+    conc.loc[conc["total"] <= 0, ["hhi"] + [f"top{k}_share" for k in top_k]] = np.nan
+    return shares, conc
+
+
+def main() -> None:
+    if not GOLD_PATH.exists():
+        raise FileNotFoundError(f"Gold file not found: {GOLD_PATH}")
+
+    # country-year totals over NACE; aggregates (EU27_2020, EA20, ...) excluded so
+    # shares are of the sum of countries
+    base = read_gold(GOLD_PATH, columns=["geo_id", "indic_id", "year", "value"])
+    base = base.loc[country_mask(load_dimensions()["geo"])[base["geo_id"].to_numpy()]]
+    pts = base.groupby(["geo_id", "indic_id", "year"], as_index=False, sort=False)["value"].sum()
+    pts = pts.loc[pts["value"].notna() & (pts["value"] >= 0)]
+
+    shares, conc = concentration(pts)
+    write_gold(shares, OUT_SHARE, contract="gold.geo_share")
+    write_gold(conc, OUT_CONCENTRATION, contract="gold.concentration")
+
+    print("Saved:")
+    print(f"- {OUT_SHARE}")
+    print(f"- {OUT_CONCENTRATION}")
+    print(f"Rows: {len(shares):,} shares · {len(conc):,} indicator-years".replace(",", "."))
+
+
+if __name__ == "__main__":
+    main()
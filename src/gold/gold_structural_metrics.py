@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 import math
+import sys
 
 import numpy as np
 import pandas as pd
@@ -11,12 +12,20 @@ import pandas as pd
 # Paths (repo root)
 # ----------------------------
 REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "src"))
 
-SILVER_PATH = REPO_ROOT / "data-silver" / "sbs_na_ind_r2_silver.parquet"
-YOY_PATH = REPO_ROOT / "data-gold" / "gold_yoy_growth.parquet"
+from config import DATA_GOLD, DATA_SILVER  # noqa: E402
+from contracts import guaranteed  # noqa: E402
+from dimensions import codes_by_id, load_dimensions  # noqa: E402
+from lake_fs import atomic_path  # noqa: E402
+from lake_io import read_gold, read_parquet, write_gold  # noqa: E402
+from sharding import concat, map_shards  # noqa: E402
 
-OUT_PARQUET = REPO_ROOT / "data-gold" / "gold_structural_metrics.parquet"
-OUT_CSV = REPO_ROOT / "data-gold" / "gold_structural_metrics.csv"
+SILVER_PATH = DATA_SILVER / "sbs_na_ind_r2_silver.parquet"
+YOY_PATH = DATA_GOLD / "gold_yoy_growth.parquet"
+
+OUT_PARQUET = DATA_GOLD / "gold_structural_metrics.parquet"
+OUT_CSV = DATA_GOLD / "gold_structural_metrics.csv"
 
 
 # ----------------------------
@@ -41,38 +50,27 @@ def _cagr(first: float, last: float, years: int) -> float:
     return (math.pow(last / first, 1.0 / years) - 1.0) * 100.0
 
 
-def main() -> None:
-    # --- Load Silver
-    if not SILVER_PATH.exists():
-        raise FileNotFoundError(f"Silver file not found: {SILVER_PATH}")
-
-    df = pd.read_parquet(SILVER_PATH)
-
-    # Expect columns like:
-    # freq, nace_r2, indic_sbs, geo, year, value_raw, value_num
-    if "value_num" in df.columns:
-        df["value"] = _safe_num(df["value_num"])
-    elif "value" in df.columns:
-        df["value"] = _safe_num(df["value"])
-    else:
-        raise ValueError("Silver parquet must have value_num or value column")
-
-    df["year"] = pd.to_numeric(df["year"], errors="coerce")
-    df = df.dropna(subset=["geo", "indic_sbs", "year", "value"]).copy()
-    df["year"] = df["year"].astype(int)
+def structural_metrics(frames: dict[str, pd.DataFrame]) -> dict:
+    """
+    Metrics for every (geo_id, indic_id) in frames["silver"]; frames["yoy"]
+    (optional) feeds the YoY stats. Nothing crosses indicators, so this also
+    runs per indicator shard (sharding.map_shards, GOLD_WORKERS > 1).
+    """
+    df = frames["silver"]
+    yoy = frames.get("yoy")
 
     # Keep only sensible rows for growth metrics
     # (value can be 0, but CAGR requires >0; we'll handle later)
-    df = df.sort_values(["indic_sbs", "geo", "year"])
+    df = df.sort_values(["indic_id", "geo_id", "year"])
 
-    # --- Build per (geo, indic_sbs) structural metrics using first/last valid year
-    grp = df.groupby(["geo", "indic_sbs"], as_index=False)
+    # --- Build per (geo_id, indic_id) structural metrics using first/last valid year
+    grp = df.groupby(["geo_id", "indic_id"], as_index=False)
 
     # First/last year/value
-    first_rows = grp.first()[["geo", "indic_sbs", "year", "value"]].rename(
+    first_rows = grp.first()[["geo_id", "indic_id", "year", "value"]].rename(
         columns={"year": "year_first", "value": "value_first"}
     )
-    last_rows = grp.last()[["geo", "indic_sbs", "year", "value"]].rename(
+    last_rows = grp.last()[["geo_id", "indic_id", "year", "value"]].rename(
         columns={"year": "year_last", "value": "value_last"}
     )
 
@@ -83,8 +81,8 @@ def main() -> None:
         n_years=("year", "nunique"),
     )
 
-    out = span.merge(first_rows, on=["geo", "indic_sbs"], how="left").merge(
-        last_rows, on=["geo", "indic_sbs"], how="left"
+    out = span.merge(first_rows, on=["geo_id", "indic_id"], how="left").merge(
+        last_rows, on=["geo_id", "indic_id"], how="left"
     )
 
     # Changes
@@ -104,21 +102,9 @@ def main() -> None:
     ]
 
     # --- YoY stats (from gold_yoy_growth)
-    if YOY_PATH.exists():
-        yoy = pd.read_parquet(YOY_PATH).copy()
-        # expected: geo, indic_sbs, year, yoy_pct
-        if "yoy_pct" in yoy.columns:
-            yoy["yoy_pct"] = _safe_num(yoy["yoy_pct"])
-        else:
-            yoy["yoy_pct"] = np.nan
-
-        yoy = yoy.dropna(subset=["geo", "indic_sbs", "year", "yoy_pct"]).copy()
-        yoy["year"] = pd.to_numeric(yoy["year"], errors="coerce")
-        yoy = yoy.dropna(subset=["year"]).copy()
-        yoy["year"] = yoy["year"].astype(int)
-
+    if yoy is not None:
         yoy_stats = (
-            yoy.groupby(["geo", "indic_sbs"], as_index=False)
+            yoy.groupby(["geo_id", "indic_id"], as_index=False)
             .agg(
                 yoy_mean=("yoy_pct", "mean"),
                 yoy_volatility=("yoy_pct", "std"),
@@ -126,7 +112,8 @@ def main() -> None:
             )
         )
 
-        out = out.merge(yoy_stats, on=["geo", "indic_sbs"], how="left")
+        out = out.merge(yoy_stats, on=["geo_id", "indic_id"], how="left")
+        out["yoy_n"] = out["yoy_n"].fillna(0).astype("int64")
     else:
         out["yoy_mean"] = np.nan
         out["yoy_volatility"] = np.nan
@@ -134,37 +121,87 @@ def main() -> None:
 
     # --- Ranking: first-year and last-year ranks per indicator (global)
     # We rank on each indicator's earliest available year and latest available year (overall)
-    latest_year_by_indic = df.groupby("indic_sbs")["year"].max().to_dict()
-    earliest_year_by_indic = df.groupby("indic_sbs")["year"].min().to_dict()
+    latest_year_by_indic = df.groupby("indic_id")["year"].max().to_dict()
+    earliest_year_by_indic = df.groupby("indic_id")["year"].min().to_dict()
 
     df_latest = df.copy()
-    df_latest["year_target"] = df_latest["indic_sbs"].map(latest_year_by_indic)
+    df_latest["year_target"] = df_latest["indic_id"].map(latest_year_by_indic)
     df_latest = df_latest[df_latest["year"] == df_latest["year_target"]].copy()
 
     df_earliest = df.copy()
-    df_earliest["year_target"] = df_earliest["indic_sbs"].map(earliest_year_by_indic)
+    df_earliest["year_target"] = df_earliest["indic_id"].map(earliest_year_by_indic)
     df_earliest = df_earliest[df_earliest["year"] == df_earliest["year_target"]].copy()
 
     # Rank descending by value (1 is top)
-    df_latest["rank_last_year"] = df_latest.groupby("indic_sbs")["value"].rank(
+    df_latest["rank_last_year"] = df_latest.groupby("indic_id")["value"].rank(
         method="dense", ascending=False
     )
-    df_earliest["rank_first_year"] = df_earliest.groupby("indic_sbs")["value"].rank(
+    df_earliest["rank_first_year"] = df_earliest.groupby("indic_id")["value"].rank(
         method="dense", ascending=False
     )
 
-    rank_last = df_latest[["geo", "indic_sbs", "rank_last_year"]].drop_duplicates()
-    rank_first = df_earliest[["geo", "indic_sbs", "rank_first_year"]].drop_duplicates()
+    # One rank per (geo_id, indic_id): a series spans several NACE rows, and
+    # merging every distinct rank made the join grow quadratically with them.
+    rank_last = df_latest.groupby(["geo_id", "indic_id"], as_index=False)["rank_last_year"].min()
+    rank_first = df_earliest.groupby(["geo_id", "indic_id"], as_index=False)["rank_first_year"].min()
 
-    out = out.merge(rank_first, on=["geo", "indic_sbs"], how="left").merge(
-        rank_last, on=["geo", "indic_sbs"], how="left"
+    out = out.merge(rank_first, on=["geo_id", "indic_id"], how="left").merge(
+        rank_last, on=["geo_id", "indic_id"], how="left"
     )
     out["rank_delta"] = out["rank_first_year"] - out["rank_last_year"]
 
+    return {"out": out}
+
+
+def main() -> None:
+    # --- Load Silver
+    if not SILVER_PATH.exists():
+        raise FileNotFoundError(f"Silver file not found: {SILVER_PATH}")
+
+    if guaranteed(SILVER_PATH, "silver.sbs_na_ind_r2"):
+        # Contract: integer year and double value_num, and 03 already dropped
+        # rows without year/value -- no coercion, only the columns used here
+        df = read_parquet(SILVER_PATH, columns=["geo_id", "indic_id", "year", "value_num"])
+        df = df.rename(columns={"value_num": "value"})
+    else:
+        # Silver written before schema contracts: coerce defensively
+        df = read_parquet(SILVER_PATH)
+        if "value_num" in df.columns:
+            df["value"] = _safe_num(df["value_num"])
+        elif "value" in df.columns:
+            df["value"] = _safe_num(df["value"])
+        else:
+            raise ValueError("Silver parquet must have value_num or value column")
+
+        df["year"] = pd.to_numeric(df["year"], errors="coerce")
+        df = df.dropna(subset=["geo_id", "indic_id", "year", "value"]).copy()
+        df["year"] = df["year"].astype(int)
+
+    # --- YoY input (from gold_yoy_growth)
+    frames = {"silver": df}
+    if YOY_PATH.exists():
+        if guaranteed(YOY_PATH, "gold.yoy_growth"):
+            yoy = read_gold(YOY_PATH, columns=["geo_id", "indic_id", "yoy_pct"])
+            # typed, but value_prev == 0 still gives an infinite yoy_pct
+            yoy = yoy.loc[np.isfinite(yoy["yoy_pct"].to_numpy())]
+        else:
+            yoy = read_gold(YOY_PATH)
+            # expected: geo_id, indic_id, year, yoy_pct
+            if "yoy_pct" in yoy.columns:
+                yoy["yoy_pct"] = _safe_num(yoy["yoy_pct"])
+            else:
+                yoy["yoy_pct"] = np.nan
+
+            yoy = yoy.dropna(subset=["geo_id", "indic_id", "year", "yoy_pct"]).copy()
+        frames["yoy"] = yoy
+
+    results = map_shards(structural_metrics, frames)
+    out = concat(results, "out")
+
     # --- Final columns and save
     cols = [
-        "geo",
-        "indic_sbs",
+        "geo_id",
+        "indic_id",
         "year_min",
         "year_max",
         "n_years",
@@ -182,11 +219,18 @@ def main() -> None:
         "rank_last_year",
         "rank_delta",
     ]
-    out = out[cols].sort_values(["indic_sbs", "cagr"], ascending=[True, False])
-
-    OUT_PARQUET.parent.mkdir(parents=True, exist_ok=True)
-    out.to_parquet(OUT_PARQUET, index=False)
-    out.to_csv(OUT_CSV, index=False)
+    # geo_id breaks cagr ties, so the CSV order does not depend on the sharding
+    out = out[cols].sort_values(["indic_id", "cagr", "geo_id"], ascending=[True, False, True], ignore_index=True)
+
+    write_gold(out, OUT_PARQUET, contract="gold.structural_metrics")
+
+    # CSV is meant for humans: decode the integer keys back to codes
+    dims = load_dimensions()
+    csv = out.copy()
+    csv.insert(0, "geo", codes_by_id(dims["geo"], "geo")[csv["geo_id"].to_numpy()])
+    csv.insert(1, "indic_sbs", codes_by_id(dims["indicator"], "indic_sbs")[csv["indic_id"].to_numpy()])
+    with atomic_path(OUT_CSV) as tmp, tmp.open("w", encoding="utf-8", newline="") as f:
+        csv.to_csv(f, index=False)
 
     print("Saved:")
     print(f"- {OUT_PARQUET}")
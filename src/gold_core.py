@@ -0,0 +1,114 @@
+# src/gold_core.py
+"""
+Núcleo do gold (04_gold_analytics.py): tabela base, densificação e YoY.
+
+build_shard é a unidade de trabalho do modo em shards (src/sharding.py):
+roda sobre um subconjunto de indicadores, e nada aqui cruza indicadores.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from config import GOLD_DENSIFY
+
+SILVER_COLS = ["geo_id", "indic_id", "nace_id", "year", "value_num"]
+
+# uma série = (geo, indicador, NACE); sem nace_id o shift do YoY cruzava setores
+SERIES = ["geo_id", "indic_id", "nace_id"]
+
+# motivos de descarte do YoY (lineage do gold)
+YOY_DROP_REASONS = ("first_year", "year_gap", "zero_over_zero")
+
+
+def densify(base: pd.DataFrame, method: str) -> pd.DataFrame:
+    """
+    Completa a grade de anos de cada série entre o primeiro e o último ano
+    observados (sem extrapolar). method: "linear" ou "locf" (último valor
+    observado). Vetorizado: cada linha é repetida (1 + lacuna até a próxima)
+    vezes e os anos/valores intermediários saem de aritmética sobre arrays.
+    base precisa estar ordenada por SERIES + year.
+    """
+    if method not in ("linear", "locf"):
+        raise ValueError(f"GOLD_DENSIFY must be None, 'linear' or 'locf' (got {method!r})")
+
+    year = base["year"].to_numpy(np.int64)
+    value = base["value"].to_numpy(np.float64)
+    same_next = np.zeros(len(base), dtype=bool)
+    same_next[:-1] = (base[SERIES].iloc[1:].to_numpy() == base[SERIES].iloc[:-1].to_numpy()).all(axis=1)
+
+    gap = np.zeros(len(base), dtype=np.int64)
+    gap[:-1] = np.where(same_next[:-1], year[1:] - year[:-1] - 1, 0)
+    gap = np.clip(gap, 0, None)
+
+    reps = gap + 1
+    src = np.repeat(np.arange(len(base)), reps)
+    step = np.arange(len(src)) - np.repeat(np.cumsum(reps) - reps, reps)
+
+    out = base.iloc[src].reset_index(drop=True)
+    out["year"] = year[src] + step
+    imputed = step > 0
+    if method == "linear":
+        nxt = np.append(value[1:], np.nan)[src]
+        frac = step / reps[src]
+        out["value"] = np.where(imputed, value[src] + (nxt - value[src]) * frac, value[src])
+    out["imputed"] = imputed
+    return out
+
+
+def build_base(df: pd.DataFrame) -> pd.DataFrame:
+    # 1) Tabela analítica base: (geo_id, indic_id, nace_id, year) com value
+    # geo/indic_sbs ficam nas dimensões do silver (dim_geo / dim_indicator)
+    base = df[SILVER_COLS].rename(columns={"value_num": "value"})
+    base = base.sort_values(SERIES + ["year"], ignore_index=True)
+    if GOLD_DENSIFY:
+        return densify(base, GOLD_DENSIFY)
+    base["imputed"] = False
+    return base
+
+
+def count_by_indicator(indic_ids: pd.Series) -> dict[int, int]:
+    return {int(k): int(n) for k, n in indic_ids.value_counts(sort=False).items() if n}
+
+
+def build_yoy(base: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, dict[int, int]]]:
+    """
+    2) Crescimento YoY por série, só entre anos adjacentes: numa lacuna
+    (sem densificação) não há YoY em vez de um "YoY" de vários anos.
+    Devolve também as linhas descartadas por motivo e indic_id (lineage),
+    contadas sobre as mesmas máscaras.
+    """
+    base = base.sort_values(SERIES + ["year"])
+    g = base.groupby(SERIES)
+    year_prev = g["year"].shift(1)
+    first = year_prev.isna()
+    gap = ~first & (year_prev != base["year"] - 1)
+    base["value_prev"] = g["value"].shift(1)
+    base.loc[first | gap, "value_prev"] = np.nan
+    base["imputed"] = base["imputed"] | g["imputed"].shift(1, fill_value=False)
+    base["yoy_pct"] = (base["value"] - base["value_prev"]) / base["value_prev"] * 100
+
+    # 0/0 é o único NaN que sobra depois de first/gap
+    undefined = ~first & ~gap & base["yoy_pct"].isna()
+    drops = {
+        reason: count_by_indicator(base.loc[mask, "indic_id"])
+        for reason, mask in zip(YOY_DROP_REASONS, (first, gap, undefined))
+    }
+    return base.dropna(subset=["yoy_pct"]), drops
+
+
+def build_shard(frames: dict[str, pd.DataFrame]) -> dict:
+    """Base + YoY de um shard de indicadores (sharding.map_shards)."""
+    base = build_base(frames["silver"])
+    yoy, drops = build_yoy(base)
+    return {"base": base, "yoy": yoy, "drops": drops}
+
+
+def merge_drops(results: list[dict]) -> dict[str, dict[int, int]]:
+    """Soma os contadores de descarte de todos os shards."""
+    out: dict[str, dict[int, int]] = {reason: {} for reason in YOY_DROP_REASONS}
+    for r in results:
+        for reason, counts in r["drops"].items():
+            for indic, n in counts.items():
+                out[reason][indic] = out[reason].get(indic, 0) + n
+    return out
@@ -0,0 +1,293 @@
+# src/gold_query.py
+"""
+Biblioteca de consulta local sobre as tabelas gold.
+
+    from gold_query import GoldQuery
+
+    q = GoldQuery()
+    q.top_n("V12110", 2020, n=10)
+    q.yoy("DE", "V12110")
+    q.rank_delta("V12110", 2015, 2020)
+    q.structural("DE")
+
+As tabelas são lidas do snapshot Arrow IPC (memory map: a abertura não lê o
+arquivo) e, na carga, convertidas para pandas e reorganizadas uma vez em arrays
+ordenados em memória (essa etapa copia os dados; o mapa só evita decodificar
+Parquet). Cada consulta é um searchsorted + fatia sobre esses arrays. Na frente fica um cache
+LRU que é descartado quando a versão do gold (mtime/tamanho dos arquivos) muda.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_GOLD
+from dimensions import DIMENSIONS, codes_by_id, country_mask, load_dimensions, lookup_id
+from lake_fs import LakePath, lake_path
+from lake_io import read_gold
+
+GOLD_FILES = {
+    "value": "gold_country_indicator_year.parquet",
+    "yoy": "gold_yoy_growth.parquet",
+    "structural": "gold_structural_metrics.parquet",
+}
+
+# chave composta (a << 16) | b: years e ids (geo_id / indic_id int16, ver
+# dimensions.KEY_DTYPES) cabem em 16 bits
+_SHIFT = 16
+
+
+def _compose(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a.astype(np.int64) << _SHIFT) | b.astype(np.int64)
+
+
+class LRUCache:
+    """LRU thread-safe simples (OrderedDict + lock)."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> tuple[bool, object]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _Snapshot:
+    """Uma versão do gold carregada em arrays ordenados (imutável após o load)."""
+
+    def __init__(self, gold_dir: Path | LakePath) -> None:
+        dims = load_dimensions()
+        self.geo_codes = codes_by_id(dims["geo"], "geo")
+        self.dim_geo = dims["geo"]
+        self.dim_indicator = dims["indicator"]
+        self.is_country = country_mask(dims["geo"])
+
+        # valor agregado por país-ano (mesma regra do relatório)
+        val = read_gold(gold_dir / GOLD_FILES["value"])
+        val = (
+            val.dropna(subset=["geo_id", "indic_id", "year"])
+            .groupby(["geo_id", "indic_id", "year"], as_index=False)["value"]
+            .sum()
+        )
+        v_geo = val["geo_id"].to_numpy(np.int64)
+        v_ind = val["indic_id"].to_numpy(np.int64)
+        v_year = val["year"].to_numpy(np.int64)
+        v_value = val["value"].to_numpy(np.float64)
+        # ordena por (indic, year, value desc): top-N vira o início de uma fatia
+        order = np.lexsort((-v_value, v_year, v_ind))
+        self.v_key = _compose(v_ind[order], v_year[order])
+        self.v_geo = v_geo[order]
+        self.v_year = v_year[order]
+        self.v_value = v_value[order]
+
+        # YoY agregado por país-ano, ordenado por (geo, indic, year)
+        yoy = read_gold(gold_dir / GOLD_FILES["yoy"])
+        yoy = (
+            yoy.dropna(subset=["geo_id", "indic_id", "year"])
+            .groupby(["geo_id", "indic_id", "year"], as_index=False)[["value", "value_prev"]]
+            .sum()
+            .sort_values(["geo_id", "indic_id", "year"], ignore_index=True)
+        )
+        yoy["yoy_pct"] = (yoy["value"] / yoy["value_prev"] - 1.0) * 100.0
+        self.yoy = yoy
+        self.yoy_key = _compose(yoy["geo_id"].to_numpy(), yoy["indic_id"].to_numpy())
+
+        struct_path = gold_dir / GOLD_FILES["structural"]
+        if struct_path.exists():
+            struct = read_gold(struct_path).sort_values(["geo_id", "indic_id"], ignore_index=True)
+        else:
+            struct = pd.DataFrame({"geo_id": pd.Series(dtype="int16"), "indic_id": pd.Series(dtype="int16")})
+        self.struct = struct
+        self.struct_key = _compose(struct["geo_id"].to_numpy(), struct["indic_id"].to_numpy())
+
+    def indic_id(self, indicator: str) -> int:
+        indic_id = lookup_id(self.dim_indicator, "indic_sbs", "indic_id", indicator)
+        if indic_id is None:
+            raise KeyError(f"Unknown indicator: {indicator}")
+        return indic_id
+
+    def geo_id(self, geo: str) -> int:
+        geo_id = lookup_id(self.dim_geo, "geo", "geo_id", geo)
+        if geo_id is None:
+            raise KeyError(f"Unknown geo: {geo}")
+        return geo_id
+
+    def geo_range(self, keys: np.ndarray, geo_id: int, indic_id: int | None) -> tuple[int, int]:
+        """Fatia [lo, hi) de um array de chaves (geo << 16 | indic) ordenado."""
+        if indic_id is None:
+            lo = np.searchsorted(keys, geo_id << _SHIFT, side="left")
+            hi = np.searchsorted(keys, (geo_id + 1) << _SHIFT, side="left")
+        else:
+            k = (geo_id << _SHIFT) | indic_id
+            lo = np.searchsorted(keys, k, side="left")
+            hi = np.searchsorted(keys, k, side="right")
+        return int(lo), int(hi)
+
+    def value_slice(self, indic_id: int, year: int, country_only: bool) -> np.ndarray:
+        k = (indic_id << _SHIFT) | year
+        lo = np.searchsorted(self.v_key, k, side="left")
+        hi = np.searchsorted(self.v_key, k, side="right")
+        idx = np.arange(lo, hi)
+        if country_only:
+            idx = idx[self.is_country[self.v_geo[idx]]]
+        return idx
+
+    def ranked(self, indic_id: int, year: int, country_only: bool) -> pd.DataFrame:
+        idx = self.value_slice(indic_id, year, country_only)
+        values = self.v_value[idx]
+        values_ok = ~np.isnan(values)
+        idx, values = idx[values_ok], values[values_ok]
+        # dados já estão em ordem decrescente: rank denso = contagem de mudanças
+        rank = np.cumsum(np.r_[True, values[1:] != values[:-1]]) if len(values) else np.empty(0)
+        return pd.DataFrame({
+            "geo_id": self.v_geo[idx],
+            "value": values,
+            "rank": rank.astype(np.int64),
+        })
+
+
+class GoldQuery:
+    def __init__(
+        self,
+        gold_dir: str | Path | LakePath = DATA_GOLD,
+        cache_size: int = 1024,
+        check_interval: float = 1.0,
+    ) -> None:
+        self.gold_dir = lake_path(gold_dir)
+        self.cache = LRUCache(cache_size)
+        # intervalo mínimo (s) entre stats dos arquivos para detectar nova versão
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # (versão, snapshot) trocados juntos numa única atribuição
+        self._state: tuple[tuple, _Snapshot] | None = None
+        self._checked_at = 0.0
+        self._ensure_fresh(force=True)
+
+    # ----------------------------
+    # Versão / recarga
+    # ----------------------------
+    def _watched_paths(self) -> list[Path | LakePath]:
+        paths = [self.gold_dir / name for name in GOLD_FILES.values()]
+        paths += [path for _, _, path in DIMENSIONS.values()]
+        return paths
+
+    def current_version(self) -> tuple:
+        version = []
+        for p in self._watched_paths():
+            if p.exists():
+                st = p.stat()
+                version.append((p.name, st.st_mtime_ns, st.st_size))
+            else:
+                version.append((p.name, None, None))
+        return tuple(version)
+
+    @property
+    def version(self) -> tuple | None:
+        return self._state[0] if self._state else None
+
+    def _ensure_fresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return
+            version = self.current_version()
+            if force or self._state is None or version != self._state[0]:
+                self._state = (version, _Snapshot(self.gold_dir))
+                self.cache.clear()
+            self._checked_at = now
+
+    def _cached(self, key: tuple, compute) -> pd.DataFrame:
+        self._ensure_fresh()
+        version, snap = self._state
+        key = (version, *key)
+        found, value = self.cache.get(key)
+        if not found:
+            value = compute(snap)
+            self.cache.put(key, value)
+        # resultados em cache são compartilhados: devolve cópia
+        return value.copy()
+
+    # ----------------------------
+    # Consultas
+    # ----------------------------
+    def top_n(self, indicator: str, year: int, n: int = 10, country_only: bool = True) -> pd.DataFrame:
+        def compute(s: _Snapshot) -> pd.DataFrame:
+            idx = s.value_slice(s.indic_id(indicator), int(year), country_only)[:n]
+            return pd.DataFrame({
+                "geo": s.geo_codes[s.v_geo[idx]],
+                "year": s.v_year[idx],
+                "value": s.v_value[idx],
+            })
+
+        return self._cached(("top_n", indicator, int(year), n, country_only), compute)
+
+    def yoy(self, geo: str, indicator: str | None = None) -> pd.DataFrame:
+        def compute(s: _Snapshot) -> pd.DataFrame:
+            indic_id = s.indic_id(indicator) if indicator is not None else None
+            lo, hi = s.geo_range(s.yoy_key, s.geo_id(geo), indic_id)
+            out = s.yoy.iloc[lo:hi].reset_index(drop=True)
+            out.insert(0, "geo", geo)
+            return out
+
+        return self._cached(("yoy", geo, indicator), compute)
+
+    def rank_delta(
+        self,
+        indicator: str,
+        year_base: int,
+        year_last: int,
+        country_only: bool = True,
+    ) -> pd.DataFrame:
+        def compute(s: _Snapshot) -> pd.DataFrame:
+            indic_id = s.indic_id(indicator)
+            base = s.ranked(indic_id, int(year_base), country_only)
+            last = s.ranked(indic_id, int(year_last), country_only)
+            out = base.merge(last, on="geo_id", how="inner", suffixes=("_base", "_last"))
+            out["rank_delta"] = out["rank_base"] - out["rank_last"]  # + means moved up
+            out["pct_change"] = (out["value_last"] / out["value_base"] - 1.0) * 100.0
+            out.insert(0, "geo", s.geo_codes[out["geo_id"].to_numpy()])
+            return out.drop(columns=["geo_id"]).sort_values("rank_delta", ascending=False, ignore_index=True)
+
+        return self._cached(("rank_delta", indicator, int(year_base), int(year_last), country_only), compute)
+
+    def structural(self, geo: str, indicator: str | None = None) -> pd.DataFrame:
+        def compute(s: _Snapshot) -> pd.DataFrame:
+            indic_id = s.indic_id(indicator) if indicator is not None else None
+            lo, hi = s.geo_range(s.struct_key, s.geo_id(geo), indic_id)
+            out = s.struct.iloc[lo:hi].reset_index(drop=True)
+            out.insert(0, "geo", geo)
+            return out
+
+        return self._cached(("structural", geo, indicator), compute)
@@ -0,0 +1,297 @@
+# src/lake_fs.py
+"""
+Caminhos do lakehouse em disco local ou em object storage (via fsspec).
+
+Com EUROSTAT_LAKE_URI (ex.: s3://bucket/lake), as camadas em config.py viram
+LakePath: um subconjunto da API de pathlib.Path (/, name, exists, stat, open,
+read_text, mkdir, replace, glob, ...) sobre um filesystem fsspec. Sem a
+variável, tudo continua sendo Path local e nada aqui é usado.
+
+- Parquet remoto é lido pelo pyarrow com o filesystem fsspec: só o footer e
+  os column chunks dos row groups selecionados são buscados (range requests)
+- DiskCache: cache local read-through para arquivos inteiros (gold "quente"),
+  chaveado por URI + tamanho + mtime/ETag, com limite de tamanho (LRU)
+- atomic_path: escrita em arquivo temporário + rename, para nenhum leitor ver
+  um arquivo pela metade depois de um crash
+
+S3 requer s3fs; para testar sem bucket, file:// usa o mesmo caminho de código.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple
+import hashlib
+import os
+import posixpath
+import shutil
+import tempfile
+
+
+class LakeStat(NamedTuple):
+    st_size: int
+    st_mtime_ns: int
+
+
+@lru_cache(maxsize=None)
+def filesystem(protocol: str):
+    try:
+        import fsspec
+    except ImportError as e:
+        raise SystemExit(
+            "Remote lake paths require fsspec (and s3fs for s3://): pip install -r requirements-cloud.txt"
+        ) from e
+    from config import S3_ENDPOINT_URL, S3_REGION
+
+    options: dict = {}
+    if protocol in ("s3", "s3a"):
+        client_kwargs = {"region_name": S3_REGION}
+        if S3_ENDPOINT_URL:
+            client_kwargs["endpoint_url"] = S3_ENDPOINT_URL
+        options["client_kwargs"] = client_kwargs
+    return fsspec.filesystem(protocol, **options)
+
+
+def _mtime_ns(info: dict) -> int:
+    # cada backend expõe a data de modificação com um nome/tipo diferente
+    for key in ("mtime", "LastModified", "last_modified", "updated", "created"):
+        value = info.get(key)
+        if value is None:
+            continue
+        if hasattr(value, "timestamp"):
+            return int(value.timestamp() * 1e9)
+        if isinstance(value, str):
+            from datetime import datetime
+
+            return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1e9)
+        return int(float(value) * 1e9)
+    return 0
+
+
+class LakePath:
+    """Caminho remoto com a parte da API de Path que os stages usam."""
+
+    __slots__ = ("protocol", "path")
+
+    def __init__(self, uri: str):
+        protocol, _, path = str(uri).partition("://")
+        self.protocol = protocol
+        self.path = path.rstrip("/") or path
+
+    # ----------------------------
+    # Caminho
+    # ----------------------------
+    def __str__(self) -> str:
+        return f"{self.protocol}://{self.path}"
+
+    def __repr__(self) -> str:
+        return f"LakePath({str(self)!r})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LakePath) and str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __truediv__(self, other) -> LakePath:
+        return LakePath(f"{self.protocol}://{posixpath.join(self.path, str(other))}")
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.path)
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.path).stem
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.path).suffix
+
+    @property
+    def parent(self) -> LakePath:
+        return LakePath(f"{self.protocol}://{posixpath.dirname(self.path)}")
+
+    def with_suffix(self, suffix: str) -> LakePath:
+        return LakePath(f"{self.protocol}://{PurePosixPath(self.path).with_suffix(suffix)}")
+
+    def relative_to(self, other: LakePath) -> PurePosixPath:
+        return PurePosixPath(self.path).relative_to(other.path)
+
+    # ----------------------------
+    # Filesystem
+    # ----------------------------
+    @property
+    def fs(self):
+        return filesystem(self.protocol)
+
+    def exists(self) -> bool:
+        return self.fs.exists(self.path)
+
+    def is_file(self) -> bool:
+        return self.fs.isfile(self.path)
+
+    def info(self) -> dict:
+        return self.fs.info(self.path)
+
+    def stat(self) -> LakeStat:
+        info = self.info()
+        return LakeStat(int(info.get("size") or 0), _mtime_ns(info))
+
+    def mkdir(self, parents: bool = False, exist_ok: bool = False) -> None:
+        # object storage não tem diretórios; para file:// cria de verdade
+        self.fs.makedirs(self.path, exist_ok=exist_ok)
+
+    def open(self, mode: str = "rb", **kwargs):
+        return self.fs.open(self.path, mode, **kwargs)
+
+    def read_bytes(self) -> bytes:
+        return self.fs.cat_file(self.path)
+
+    def write_bytes(self, data: bytes) -> None:
+        self.fs.pipe_file(self.path, data)
+
+    def read_text(self, encoding: str = "utf-8") -> str:
+        return self.read_bytes().decode(encoding)
+
+    def write_text(self, text: str, encoding: str = "utf-8") -> None:
+        self.write_bytes(text.encode(encoding))
+
+    def replace(self, target: LakePath) -> LakePath:
+        self.fs.mv(self.path, target.path)
+        return target
+
+    def unlink(self, missing_ok: bool = False) -> None:
+        if missing_ok and not self.exists():
+            return
+        self.fs.rm_file(self.path)
+
+    def glob(self, pattern: str) -> list[LakePath]:
+        hits = self.fs.glob(posixpath.join(self.path, pattern))
+        return [LakePath(f"{self.protocol}://{h}") for h in sorted(hits)]
+
+
+def lake_path(uri: str | os.PathLike) -> Path | LakePath:
+    """URI com esquema -> LakePath; caminho simples -> Path local."""
+    if isinstance(uri, (Path, LakePath)):
+        return uri
+    if "://" in str(uri):
+        return LakePath(str(uri))
+    return Path(uri)
+
+
+def is_remote(path) -> bool:
+    return isinstance(path, LakePath)
+
+
+def arrow_source(path: Path | LakePath) -> tuple[str, object | None]:
+    """(caminho, filesystem) para pq.read_table / pq.write_table / pd.read_parquet."""
+    if is_remote(path):
+        return path.path, path.fs
+    return str(path), None
+
+
+# ----------------------------
+# Escrita atômica
+# ----------------------------
+# protocolos fsspec em que rename é rename de verdade (e não cópia + delete)
+RENAME_PROTOCOLS = ("file", "local")
+
+
+@contextmanager
+def atomic_path(path: Path | LakePath):
+    """
+    Caminho temporário ao lado de `path`, renomeado por cima dele só se o
+    bloco terminar sem erro (senão é apagado). Em object storage o PUT já é
+    atômico e o rename seria cópia + delete, então escreve direto em `path`.
+    """
+    if is_remote(path) and path.protocol not in RENAME_PROTOCOLS:
+        yield path
+        return
+    tmp = path.parent / f".{path.name}.{os.getpid()}.tmp"
+    try:
+        yield tmp
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def write_text_atomic(path: Path | LakePath, text: str, encoding: str = "utf-8") -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_text(text, encoding=encoding)
+
+
+def copy_atomic(src: Path | LakePath, dst: Path | LakePath) -> None:
+    """Cópia em streaming de src para dst; dst só muda se a cópia terminar."""
+    with src.open("rb") as f_in, atomic_path(dst) as tmp, tmp.open("wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, length=8 * 1024 * 1024)
+
+
+# ----------------------------
+# Cache local read-through
+# ----------------------------
+class DiskCache:
+    """
+    Cópias locais de arquivos remotos inteiros, limitadas a max_bytes.
+
+    A chave inclui tamanho e mtime/ETag do objeto: uma versão nova do arquivo
+    gera outra entrada e a antiga sai por LRU (mtime local, renovado a cada hit).
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, path: LakePath, info: dict) -> Path:
+        version = info.get("ETag") or info.get("etag") or _mtime_ns(info)
+        token = hashlib.sha1(f"{path}|{info.get('size')}|{version}".encode()).hexdigest()[:20]
+        return self.root / f"{token}_{path.name}"
+
+    def fetch(self, path: Path | LakePath) -> Path:
+        """Caminho local com o conteúdo de `path` (baixa só se não estiver no cache)."""
+        if not is_remote(path):
+            return path
+        local = self._entry(path, path.info())
+        if local.exists():
+            self.hits += 1
+            os.utime(local)
+            return local
+
+        self.misses += 1
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".part_")
+        try:
+            with os.fdopen(fd, "wb") as out, path.open("rb") as src:
+                shutil.copyfileobj(src, out, length=8 * 1024 * 1024)
+            os.replace(tmp, local)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict(keep=local)
+        return local
+
+    def evict(self, keep: Path | None = None) -> int:
+        """Remove as entradas menos usadas até caber em max_bytes; devolve bytes liberados."""
+        entries = [(p.stat(), p) for p in self.root.iterdir() if p.is_file() and not p.name.startswith(".part_")]
+        total = sum(st.st_size for st, _ in entries)
+        freed = 0
+        for st, p in sorted(entries, key=lambda e: e[0].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            p.unlink(missing_ok=True)
+            total -= st.st_size
+            freed += st.st_size
+        return freed
+
+
+@lru_cache(maxsize=1)
+def lake_cache() -> DiskCache:
+    from config import LAKE_CACHE_DIR, LAKE_CACHE_MAX_MB
+
+    return DiskCache(LAKE_CACHE_DIR, LAKE_CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,207 @@
+# src/lake_io.py
+"""
+Leitura/escrita das tabelas do lakehouse.
+
+Gold publica, ao lado de cada Parquet, um snapshot Arrow IPC (Feather v2)
+`<nome>.arrow`. Consumidores abrem o snapshot via memory map: sem decodificar
+Parquet e compartilhando o page cache do SO entre processos.
+
+Caminhos podem ser Path locais ou lake_fs.LakePath (object storage): Parquet
+remoto é lido com range requests (footer + column chunks dos row groups que
+passam no filtro); gold remoto passa pelo cache local (lake_fs.DiskCache) e
+é aberto via memory map como no caso local.
+
+Toda escrita é atômica (arquivo temporário + rename, ver lake_fs.atomic_path):
+um crash no meio nunca deixa um Parquet pela metade para o estágio seguinte.
+
+Com contract="camada.tabela", a escrita passa por contracts.enforce: colunas e
+tipos conferidos e contrato gravado no metadata (Parquet e snapshot IPC).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from config import (
+    GOLD_IPC_COMPRESSION,
+    GOLD_IPC_SNAPSHOT,
+    LAYER_PARQUET_PROFILE,
+    PARQUET_BLOOM_COLUMNS,
+    PARQUET_DIMENSION_COLUMNS,
+    PARQUET_PROFILES,
+    PARQUET_SORT_BY,
+)
+from contracts import enforce
+from lake_fs import LakePath, arrow_source, atomic_path, is_remote, lake_cache
+
+IPC_SUFFIX = ".arrow"
+
+
+def ipc_path(parquet_path: Path | LakePath) -> Path | LakePath:
+    return parquet_path.with_suffix(IPC_SUFFIX)
+
+
+def _as_table(data: pd.DataFrame | pa.Table, contract: str | None = None) -> pa.Table:
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    return enforce(table, contract) if contract else table
+
+
+def sort_table(table: pa.Table, columns: list[str]) -> pa.Table:
+    """
+    table.sort_by que aceita colunas dictionary (dimensões categorical, ver a
+    política de armazenamento): a chave de ordenação de cada uma é a posição
+    do valor no dicionário ordenado, sem decodificar as strings.
+    """
+    if not any(pa.types.is_dictionary(table.schema.field(c).type) for c in columns):
+        return table.sort_by([(c, "ascending") for c in columns])
+    table = table.unify_dictionaries()
+    keys = {}
+    for c in columns:
+        col = table.column(c)
+        if pa.types.is_dictionary(col.type) and col.num_chunks:
+            order = pc.rank(col.chunk(0).dictionary, sort_keys="ascending")
+            col = pa.chunked_array([pc.take(order, chunk.indices) for chunk in col.chunks], type=order.type)
+        keys[c] = col
+    idx = pc.sort_indices(pa.table(keys), sort_keys=[(c, "ascending") for c in columns])
+    return table.take(idx)
+
+
+def apply_profile(table: pa.Table, layer: str, profile: str | None = None) -> tuple[pa.Table, dict]:
+    """
+    Aplica o perfil de escrita da camada: devolve a tabela (ordenada, se o
+    perfil pede) e os kwargs para pq.write_table.
+    """
+    name = profile or LAYER_PARQUET_PROFILE.get(layer, "default")
+    prof = PARQUET_PROFILES[name]
+    cols = set(table.column_names)
+
+    kwargs: dict = {"compression": prof.get("compression", "snappy")}
+    if prof.get("compression_level") is not None:
+        kwargs["compression_level"] = prof["compression_level"]
+
+    dictionary = prof.get("dictionary", True)
+    if dictionary == "dims":
+        kwargs["use_dictionary"] = [c for c in PARQUET_DIMENSION_COLUMNS.get(layer, []) if c in cols]
+    else:
+        kwargs["use_dictionary"] = bool(dictionary)
+
+    if prof.get("sort"):
+        sort_by = [c for c in PARQUET_SORT_BY.get(layer, []) if c in cols]
+        if sort_by:
+            table = sort_table(table, sort_by)
+            kwargs["sorting_columns"] = [
+                pq.SortingColumn(table.column_names.index(c)) for c in sort_by
+            ]
+
+    if prof.get("row_group_mb") and table.num_rows:
+        row_bytes = max(table.nbytes / table.num_rows, 1.0)
+        kwargs["row_group_size"] = max(int(prof["row_group_mb"] * 1024 * 1024 / row_bytes), 1024)
+
+    if prof.get("page_index"):
+        kwargs["write_page_index"] = True
+
+    if prof.get("bloom_filter"):
+        bloom = [c for c in PARQUET_BLOOM_COLUMNS.get(layer, []) if c in cols]
+        if bloom:
+            # ndv ~ cardinalidade real (geo tem poucas centenas de códigos)
+            kwargs["bloom_filter_options"] = {c: {"ndv": 4096, "fpp": 0.01} for c in bloom}
+
+    return table, kwargs
+
+
+def read_parquet(path: Path | LakePath, columns: list[str] | None = None, filters=None) -> pd.DataFrame:
+    """pd.read_parquet para caminho local ou remoto (range reads via fsspec)."""
+    where, fs = arrow_source(path)
+    return pd.read_parquet(where, columns=columns, filters=filters, filesystem=fs)
+
+
+def read_schema(path: Path | LakePath) -> pa.Schema:
+    """Schema lido só do footer."""
+    where, fs = arrow_source(path)
+    return pq.read_schema(where, filesystem=fs)
+
+
+def write_frame(df: pd.DataFrame, path: Path | LakePath, contract: str | None = None) -> None:
+    """Parquet sem perfil de camada (tabelas auxiliares: dimensões, change logs)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = _as_table(df, contract)
+    with atomic_path(path) as tmp:
+        where, fs = arrow_source(tmp)
+        pq.write_table(table, where, filesystem=fs)
+
+
+def write_parquet(
+    data: pd.DataFrame | pa.Table,
+    path: Path | LakePath,
+    layer: str,
+    profile: str | None = None,
+    contract: str | None = None,
+) -> pa.Table:
+    """Grava Parquet com o perfil da camada; devolve a tabela como gravada."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table, kwargs = apply_profile(_as_table(data, contract), layer, profile)
+    with atomic_path(path) as tmp:
+        where, fs = arrow_source(tmp)
+        pq.write_table(table, where, filesystem=fs, **kwargs)
+    return table
+
+
+def write_gold(df: pd.DataFrame, path: Path | LakePath, contract: str | None = None) -> None:
+    """Grava o Parquet e (opcionalmente) o snapshot Arrow IPC ao lado."""
+    table = write_parquet(df, path, "gold", contract=contract)
+    if GOLD_IPC_SNAPSHOT:
+        write_ipc_snapshot(table, ipc_path(path))
+
+
+def write_ipc_snapshot(
+    table: pa.Table, path: Path | LakePath, compression: str | None = GOLD_IPC_COMPRESSION
+) -> None:
+    # compressão (lz4/zstd) reduz disco mas obriga a descomprimir na leitura,
+    # ou seja, perde o zero-copy. Default: sem compressão.
+    kwargs = {"compression": compression or "uncompressed"}
+    with atomic_path(path) as tmp:
+        if is_remote(tmp):
+            with tmp.open("wb") as f:
+                feather.write_feather(table.combine_chunks(), f, **kwargs)
+        else:
+            feather.write_feather(table.combine_chunks(), str(tmp), **kwargs)
+
+
+def _fresh_snapshot(path: Path | LakePath) -> Path | LakePath | None:
+    snap = ipc_path(path)
+    if not snap.exists():
+        return None
+    # snapshot mais antigo que o Parquet = sobra de um run anterior
+    if path.exists() and snap.stat().st_mtime_ns < path.stat().st_mtime_ns:
+        return None
+    return snap
+
+
+def read_gold_table(path: Path | LakePath, columns: list[str] | None = None) -> pa.Table:
+    """
+    Tabela Arrow: snapshot IPC aberto via memory map ou Parquet como fallback.
+    Só a abertura do snapshot é zero-copy (os buffers apontam para o mapa); o
+    Parquet é decodificado, e quem converte para pandas (read_gold) copia.
+    """
+    snap = _fresh_snapshot(path)
+    if is_remote(path):
+        # gold remoto: cópia local via cache (hit = sem download), depois igual ao local
+        cache = lake_cache()
+        snap = cache.fetch(snap) if snap is not None else None
+        path = path if snap is not None else cache.fetch(path)
+    if snap is not None:
+        with pa.memory_map(str(snap), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+def read_gold(path: Path | LakePath, columns: list[str] | None = None) -> pd.DataFrame:
+    # to_pandas materializa as colunas; split_blocks evita mais uma cópia ao
+    # consolidar colunas num bloco 2D
+    return read_gold_table(path, columns).to_pandas(split_blocks=True)
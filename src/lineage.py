@@ -0,0 +1,167 @@
+# src/lineage.py
+"""
+Lineage e reconciliação de linhas entre camadas.
+
+Cada estágio acumula, enquanto processa (sem reler nada), quantas linhas
+entraram, quantas saíram e por que as outras foram descartadas (ou
+acrescentadas, ex.: densificação do gold), por indicador. O registro da camada
+vai para outputs-checks/lineage/<layer>.json:
+
+    {"layer": "silver", "written_at": ..., "steps": {
+        "silver.sbs_na_ind_r2": {
+            "path": ".../sbs_na_ind_r2_silver.parquet",
+            "rows_in": {"bronze.sbs_na_ind_r2": 1200},     # linhas de entrada por origem
+            "fanout": {"bronze.sbs_na_ind_r2": 12},        # linhas geradas por linha da origem (melt)
+            "dropped": {"missing_value": {"V12110": 30}},  # motivo -> indicador -> linhas
+            "added": {},
+            "rows_out": 14370,
+            "columns": {"value_num": ["bronze.<year>"]},   # coluna -> colunas de origem
+        }}}
+
+05_quality_checks.py chama reconcile(): confere em cada passo
+sum(rows_in) - dropped + added == rows_out, rows_out contra o num_rows do
+footer do Parquet e rows_in contra o rows_out do passo de origem (vezes o
+fanout). Origens com sufixo "[...]" (ex.: só as séries revisadas num gold
+incremental) não são comparadas com o passo de origem.
+
+Um arquivo por camada: estágios diferentes nunca escrevem no mesmo JSON.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+import json
+
+from config import OUTPUTS_CHECKS
+from lake_fs import LakePath, arrow_source, lake_path, write_text_atomic
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+LINEAGE_DIR = OUTPUTS_CHECKS / "lineage"
+LAYERS = ("bronze", "silver", "gold")
+
+
+def by_indicator(indicators: pd.Series, labels=None) -> dict[str, int]:
+    """Contagem por indicador das linhas afetadas; labels traduz ids -> códigos."""
+    counts = indicators.value_counts(sort=False)
+    out = {}
+    for key, n in counts.items():
+        if n:
+            out[str(labels[key] if labels is not None else key)] = int(n)
+    return dict(sorted(out.items()))
+
+
+class LineageRecord:
+    def __init__(self, layer: str):
+        if layer not in LAYERS:
+            raise ValueError(f"unknown layer {layer!r} (expected one of {LAYERS})")
+        self.layer = layer
+        self.steps: dict[str, dict] = {}
+
+    def step(
+        self,
+        table: str,
+        path: Path | LakePath,
+        rows_in: dict[str, int],
+        fanout: dict[str, int] | None = None,
+        columns: dict[str, list[str]] | None = None,
+    ) -> dict:
+        name = f"{self.layer}.{table}"
+        self.steps[name] = {
+            "path": str(path),
+            "rows_in": {k: int(v) for k, v in rows_in.items()},
+            "fanout": fanout or {},
+            "dropped": {},
+            "added": {},
+            "rows_out": None,
+            "columns": columns or {},
+        }
+        return self.steps[name]
+
+    def _count(self, table: str, kind: str, reason: str, counts: dict[str, int]) -> None:
+        bucket = self.steps[f"{self.layer}.{table}"][kind].setdefault(reason, {})
+        for indic, n in counts.items():
+            bucket[indic] = bucket.get(indic, 0) + int(n)
+
+    def drop(self, table: str, reason: str, counts: dict[str, int]) -> None:
+        self._count(table, "dropped", reason, counts)
+
+    def add(self, table: str, reason: str, counts: dict[str, int]) -> None:
+        self._count(table, "added", reason, counts)
+
+    def finish(self, table: str, rows_out: int) -> None:
+        self.steps[f"{self.layer}.{table}"]["rows_out"] = int(rows_out)
+
+    def write(self) -> Path | LakePath:
+        LINEAGE_DIR.mkdir(parents=True, exist_ok=True)
+        out = LINEAGE_DIR / f"{self.layer}.json"
+        record = {
+            "layer": self.layer,
+            "written_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "steps": self.steps,
+        }
+        write_text_atomic(out, json.dumps(record, indent=2))
+        return out
+
+
+# ----------------------------
+# Reconciliação (05_quality_checks.py)
+# ----------------------------
+def load_records() -> dict[str, dict]:
+    records = {}
+    for layer in LAYERS:
+        p = LINEAGE_DIR / f"{layer}.json"
+        if p.exists():
+            records[layer] = json.loads(p.read_text(encoding="utf-8"))
+    return records
+
+
+def _total(counts: dict[str, dict[str, int]]) -> int:
+    return sum(n for per_indic in counts.values() for n in per_indic.values())
+
+
+def parquet_rows(path: Path | LakePath) -> int:
+    """num_rows do footer, sem ler os dados."""
+    import pyarrow.parquet as pq
+
+    where, fs = arrow_source(path)
+    return pq.read_metadata(where, filesystem=fs).num_rows
+
+
+def reconcile(records: dict[str, dict]) -> tuple[dict, list[str]]:
+    """(resumo por passo, erros); só lê os registros e os footers."""
+    steps = {name: s for rec in records.values() for name, s in rec["steps"].items()}
+    summary, errors = {}, []
+
+    for name, s in steps.items():
+        rows_in = sum(s["rows_in"].values())
+        dropped, added = _total(s["dropped"]), _total(s["added"])
+        out = {
+            "rows_in": rows_in,
+            "dropped": dropped,
+            "added": added,
+            "rows_out": s["rows_out"],
+            "dropped_by_reason": {r: sum(c.values()) for r, c in s["dropped"].items()},
+            "added_by_reason": {r: sum(c.values()) for r, c in s["added"].items()},
+            "balanced": rows_in - dropped + added == s["rows_out"],
+        }
+        if not out["balanced"]:
+            errors.append(f"Lineage {name}: {rows_in} in - {dropped} dropped + {added} added != {s['rows_out']} out")
+
+        path = lake_path(s["path"])
+        if path.exists():
+            out["rows_on_disk"] = parquet_rows(path)
+            if out["rows_on_disk"] != s["rows_out"]:
+                errors.append(f"Lineage {name}: record says {s['rows_out']} rows, {path} has {out['rows_on_disk']}")
+
+        for src, n in s["rows_in"].items():
+            upstream = steps.get(src)
+            if upstream is None:
+                continue
+            expected = upstream["rows_out"] * s["fanout"].get(src, 1)
+            if n != expected:
+                errors.append(f"Lineage {name}: {n} rows in from {src}, which wrote {expected}")
+        summary[name] = out
+    return summary, errors
@@ -0,0 +1,252 @@
+# src/metadata.py
+"""
+Metadados Eurostat: codelists SDMX (rótulos das dimensões) e o sumário (TOC)
+de datasets, com cache local.
+
+    python src/metadata.py            atualiza o cache (só o que expirou)
+    python src/metadata.py --force    revalida tudo, mesmo dentro do TTL
+
+Cada recurso (resources()) vira dois arquivos em METADATA_CACHE_DIR:
+<nome>.tsv (corpo, como veio) e <nome>.json (url, ETag, Last-Modified,
+fetched_at).
+
+- dentro de METADATA_TTL_HOURS: usa o cache, nenhuma requisição
+- expirado: GET condicional (If-None-Match / If-Modified-Since); um 304 só
+  renova o fetched_at, o corpo não trafega de novo
+- erro de rede com cache: segue com o cache vencido (aviso); sem cache o
+  recurso fica de fora e os rótulos caem no próprio código
+
+As requisições saem em paralelo com asyncio: requests (já usado no download)
+em threads via asyncio.to_thread, no máximo METADATA_CONCURRENCY por vez. São
+poucos recursos, não vale um cliente HTTP assíncrono só para isso.
+
+labels() e toc() leem só o cache: o 03 e o relatório nunca acessam a rede.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import argparse
+import asyncio
+import csv
+import io
+import json
+
+import requests
+
+from config import (
+    METADATA_BASE,
+    METADATA_CACHE_DIR,
+    METADATA_CONCURRENCY,
+    METADATA_FETCH,
+    METADATA_LANG,
+    METADATA_TIMEOUT_S,
+    METADATA_TTL_HOURS,
+)
+from lake_fs import atomic_path, write_text_atomic
+
+# dimensão (dimensions.DIMENSIONS) -> codelist SDMX da Eurostat
+CODELISTS = {
+    "geo": "GEO",
+    "indicator": "INDIC_SBS",
+    "nace": "NACE_R2",
+}
+TOC = "toc"
+
+# recurso atualizado / revalidado (304) / dentro do TTL / cache vencido após erro / sem nada
+UPDATED, NOT_MODIFIED, FRESH, STALE, MISSING = "updated", "not_modified", "fresh", "stale", "missing"
+
+# colunas do TOC em texto (catalogue/toc/txt) -> nomes usados aqui
+TOC_COLUMNS = {
+    "title": "title",
+    "code": "code",
+    "type": "type",
+    "last update of data": "last_update",
+    "last table structure change": "last_structure_change",
+    "data start": "data_start",
+    "data end": "data_end",
+}
+
+
+def codelist_resource(name: str) -> str:
+    return f"codelist_{name}"
+
+
+def resources(base: str = METADATA_BASE, lang: str = METADATA_LANG) -> dict[str, str]:
+    """{nome no cache: url} de todos os recursos de metadados."""
+    base = base.rstrip("/")
+    out = {
+        codelist_resource(name): f"{base}/sdmx/2.1/codelist/ESTAT/{codelist}?format=TSV&lang={lang}"
+        for name, codelist in CODELISTS.items()
+    }
+    out[TOC] = f"{base}/catalogue/toc/txt?lang={lang}"
+    return out
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+def _paths(name: str, root: Path) -> tuple[Path, Path]:
+    return root / f"{name}.tsv", root / f"{name}.json"
+
+
+def read_meta(name: str, root: Path = METADATA_CACHE_DIR) -> dict | None:
+    """Metadados HTTP do recurso em cache (None se não há corpo em cache)."""
+    body, meta = _paths(name, root)
+    if not body.exists() or not meta.exists():
+        return None
+    try:
+        return json.loads(meta.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+
+
+def read_body(name: str, root: Path = METADATA_CACHE_DIR) -> str | None:
+    body, _ = _paths(name, root)
+    return body.read_text(encoding="utf-8") if body.exists() else None
+
+
+def is_fresh(meta: dict, ttl_hours: float, now: datetime | None = None) -> bool:
+    now = now or datetime.now(timezone.utc)
+    fetched = datetime.fromisoformat(meta["fetched_at"])
+    return now - fetched < timedelta(hours=ttl_hours)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def fetch_one(
+    name: str,
+    url: str,
+    root: Path = METADATA_CACHE_DIR,
+    ttl_hours: float = METADATA_TTL_HOURS,
+    force: bool = False,
+    timeout: float = METADATA_TIMEOUT_S,
+) -> str:
+    """Baixa/revalida um recurso no cache e devolve o status (UPDATED, FRESH, ...)."""
+    body_path, meta_path = _paths(name, root)
+    meta = read_meta(name, root)
+    if meta is not None and meta.get("url") != url:
+        meta = None  # base/idioma mudou: o cache é de outro recurso
+    if meta is not None and not force and is_fresh(meta, ttl_hours):
+        return FRESH
+
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        r = requests.get(url, headers=headers, timeout=timeout)
+        if r.status_code == 304 and meta is not None:
+            meta["fetched_at"] = _now()
+            write_text_atomic(meta_path, json.dumps(meta, indent=2))
+            return NOT_MODIFIED
+        r.raise_for_status()
+    except requests.RequestException as e:
+        print(f"WARNING: metadata {name} not refreshed ({e}); {'using stale cache' if meta else 'no cache'}")
+        return STALE if meta is not None else MISSING
+
+    # corpo primeiro: um meta novo nunca aponta para um corpo antigo
+    with atomic_path(body_path) as tmp:
+        tmp.write_bytes(r.content)
+    write_text_atomic(meta_path, json.dumps({
+        "url": url,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "fetched_at": _now(),
+        "bytes": len(r.content),
+    }, indent=2))
+    return UPDATED
+
+
+async def _fetch_all(
+    items: dict[str, str],
+    root: Path,
+    ttl_hours: float,
+    force: bool,
+    concurrency: int,
+    timeout: float,
+) -> dict[str, str]:
+    sem = asyncio.Semaphore(max(concurrency, 1))
+
+    async def one(name: str, url: str) -> tuple[str, str]:
+        async with sem:
+            return name, await asyncio.to_thread(fetch_one, name, url, root, ttl_hours, force, timeout)
+
+    return dict(await asyncio.gather(*(one(name, url) for name, url in items.items())))
+
+
+def refresh(
+    force: bool = False,
+    base: str = METADATA_BASE,
+    lang: str = METADATA_LANG,
+    root: Path = METADATA_CACHE_DIR,
+    ttl_hours: float = METADATA_TTL_HOURS,
+    concurrency: int = METADATA_CONCURRENCY,
+    timeout: float = METADATA_TIMEOUT_S,
+) -> dict[str, str]:
+    """Atualiza todos os recursos em paralelo; {nome: status}."""
+    root.mkdir(parents=True, exist_ok=True)
+    return asyncio.run(_fetch_all(resources(base, lang), root, ttl_hours, force, concurrency, timeout))
+
+
+# ----------------------------
+# Leitura (só cache)
+# ----------------------------
+def parse_codelist(text: str) -> dict[str, str]:
+    """TSV da codelist (código<TAB>rótulo por linha) -> {código: rótulo}."""
+    out = {}
+    for line in text.splitlines():
+        code, sep, label = line.partition("\t")
+        code, label = code.strip().strip('"'), label.strip().strip('"')
+        if sep and code and label:
+            out[code] = label
+    return out
+
+
+def labels(root: Path = METADATA_CACHE_DIR) -> dict[str, dict[str, str]]:
+    """{dimensão: {código: rótulo}} das codelists em cache (vazio se não há cache)."""
+    out = {}
+    for name in CODELISTS:
+        text = read_body(codelist_resource(name), root)
+        out[name] = parse_codelist(text) if text else {}
+    return out
+
+
+def parse_toc(text: str) -> list[dict[str, str]]:
+    """TOC em texto (TSV com cabeçalho entre aspas) -> uma linha por dataset/tabela."""
+    rows = csv.reader(io.StringIO(text), delimiter="\t")
+    header = [h.strip().lower() for h in next(rows, [])]
+    keep = {i: TOC_COLUMNS[h] for i, h in enumerate(header) if h in TOC_COLUMNS}
+    out = []
+    for row in rows:
+        rec = {col: row[i].strip() for i, col in keep.items() if i < len(row)}
+        if rec.get("code") and rec.get("type") != "folder":
+            out.append(rec)
+    return out
+
+
+def toc(root: Path = METADATA_CACHE_DIR) -> dict[str, dict[str, str]]:
+    """{código do dataset: linha do TOC} do TOC em cache (vazio se não há cache)."""
+    text = read_body(TOC, root)
+    return {rec["code"]: rec for rec in parse_toc(text)} if text else {}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--force", action="store_true", help="revalida mesmo dentro do TTL")
+    args = ap.parse_args()
+
+    if not METADATA_FETCH:
+        print("Metadata fetch disabled (EUROSTAT_METADATA_FETCH=0); using the local cache only.")
+        return
+    status = refresh(force=args.force)
+    print("Metadata:", status)
+
+
+if __name__ == "__main__":
+    main()
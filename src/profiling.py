@@ -0,0 +1,225 @@
+# src/profiling.py
+"""
+Profiling opcional por estágio, ligado só com --profile:
+
+    python src/run_all.py --profile                       todos os estágios
+    python src/run_all.py --profile silver gold           só estes
+    python src/run_all.py --profile --profile-mode sample
+    python reports/generate_gold_report.py --profile
+
+No Airflow: disparar o DAG com {"profile": true} (params.profile).
+
+Saídas em runs/<run_id>/profile/, ao lado do checkpoint do run:
+- <stage>.prof          cProfile (pstats: python -m pstats, snakeviz) ou
+  <stage>.collapsed     pilhas amostradas ("a;b;c N": flamegraph.pl, speedscope)
+- <stage>.tracemalloc   snapshot do tracemalloc no fim (tracemalloc.Snapshot.load)
+- <stage>.txt           top-N hotspots de tempo e memória (também no console)
+
+Modos (PROFILE_MODE):
+- cprofile: toda chamada Python é medida; exato, mas pesa em código com
+  muitas chamadas pequenas
+- sample: uma thread olha a pilha da thread principal a cada
+  PROFILE_SAMPLE_INTERVAL_MS; overhead quase nulo, bom para estágios longos
+
+O tracemalloc guarda PROFILE_TRACEMALLOC_FRAMES frames por alocação (numpy e
+pyarrow reportam as suas). Workers do modo em shards não são medidos: só o
+processo do estágio (sharding._init_worker desliga os dois no fork).
+"""
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+import argparse
+import cProfile
+import io
+import marshal
+import os
+import pickle
+import pstats
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+
+from checkpoint import RunCheckpoint, new_run_id, safe_run_id
+from config import (
+    PROFILE_MODE,
+    PROFILE_SAMPLE_INTERVAL_MS,
+    PROFILE_TOP_N,
+    PROFILE_TRACEMALLOC_FRAMES,
+    RUNS_DIR,
+)
+from lake_fs import LakePath, atomic_path, lake_path
+
+PROFILE_MODES = ("cprofile", "sample")
+_OWN_FILES = {__file__, runpy.__file__, "<frozen runpy>"}
+
+
+def profile_dir(run_id: str | None = None) -> Path | LakePath:
+    """runs/<run_id>/profile; sem run_id: EUROSTAT_RUN_ID, o último run ou um novo."""
+    run_id = run_id or os.environ.get("EUROSTAT_RUN_ID")
+    if not run_id:
+        latest = RunCheckpoint.latest()
+        run_id = latest.run_id if latest else new_run_id()
+    return RUNS_DIR / safe_run_id(run_id) / "profile"
+
+
+def _write(path: Path | LakePath, data: bytes) -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_bytes(data)
+
+
+# ----------------------------
+# Amostragem de pilhas
+# ----------------------------
+class StackSampler:
+    """Amostra a pilha de uma thread (default: a principal) a cada interval_s."""
+
+    def __init__(self, interval_s: float, thread_id: int | None = None):
+        self.interval_s = interval_s
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stacks: Counter[str] = Counter()  # "f1;f2;f3" -> amostras
+        self.lines: Counter[str] = Counter()   # linha no topo da pilha -> amostras
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            code = frame.f_code
+            self.lines[f"{code.co_filename}:{frame.f_lineno} ({code.co_name})"] += 1
+            stack = []
+            while frame is not None:
+                # frames do próprio profiler / runpy (run_script) não interessam
+                if frame.f_code.co_filename not in _OWN_FILES:
+                    stack.append(f"{Path(frame.f_code.co_filename).name}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def hotspots(self, top: int) -> str:
+        total = sum(self.stacks.values()) or 1
+        inclusive: Counter[str] = Counter()
+        for stack, n in self.stacks.items():
+            for fn in set(stack.split(";")):
+                inclusive[fn] += n
+        out = [f"{total} samples every {self.interval_s * 1000:g} ms", "", "self (line on top of the stack):"]
+        out += [f"  {n / total:6.1%}  {line}" for line, n in self.lines.most_common(top)]
+        out += ["", "inclusive (function anywhere on the stack):"]
+        out += [f"  {n / total:6.1%}  {fn}" for fn, n in inclusive.most_common(top)]
+        return "\n".join(out)
+
+
+# ----------------------------
+# Relatório de memória
+# ----------------------------
+def memory_hotspots(snapshot: tracemalloc.Snapshot, peak: int, top: int) -> str:
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ])
+    stats = snapshot.statistics("lineno")
+    live = sum(s.size for s in stats)
+    out = [f"peak traced: {peak / 1e6:.1f} MB · live at end: {live / 1e6:.1f} MB", "", "live allocations by line:"]
+    out += [f"  {s.size / 1e6:9.2f} MB  {s.count:>9,} blocks  {s.traceback[0]}" for s in stats[:top]]
+    return "\n".join(out)
+
+
+@contextmanager
+def profiled(
+    name: str,
+    out_dir: Path | LakePath,
+    mode: str = PROFILE_MODE,
+    top: int = PROFILE_TOP_N,
+):
+    """
+    Perfila o bloco: tempo (cProfile ou amostragem) + tracemalloc. Grava os
+    arquivos e imprime o top-N mesmo se o bloco falhar (inclusive SystemExit).
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"profile mode must be one of {PROFILE_MODES} (got {mode!r})")
+
+    tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+    profiler = sampler = None
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        sampler = StackSampler(PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        sampler.start()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - t0
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        report = [f"== profile: {name} ({mode}, {wall:.2f}s wall) =="]
+        if profiler is not None:
+            profiler.create_stats()
+            _write(out_dir / f"{name}.prof", marshal.dumps(profiler.stats))
+            for sort in ("cumulative", "tottime"):
+                buf = io.StringIO()
+                pstats.Stats(profiler, stream=buf).strip_dirs().sort_stats(sort).print_stats(top)
+                report += [f"-- top {top} by {sort} --", buf.getvalue().strip()]
+        else:
+            _write(out_dir / f"{name}.collapsed", sampler.collapsed().encode("utf-8"))
+            report.append(sampler.hotspots(top))
+        _write(out_dir / f"{name}.tracemalloc", pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL))
+        report += ["", f"-- top {top} memory --", memory_hotspots(snapshot, peak, top)]
+
+        text = "\n".join(report) + "\n"
+        _write(out_dir / f"{name}.txt", text.encode("utf-8"))
+        print(text)
+        print(f"Profile saved: {out_dir}/{name}.*")
+
+
+def run_script(
+    script: Path,
+    name: str,
+    out_dir: Path | LakePath,
+    mode: str = PROFILE_MODE,
+    top: int = PROFILE_TOP_N,
+) -> None:
+    """Roda um script de estágio como `python script`, dentro de profiled()."""
+    sys.argv = [str(script)]
+    sys.path[0] = str(script.parent)
+    with profiled(name, out_dir, mode, top):
+        runpy.run_path(str(script), run_name="__main__")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Run a stage script under the profiler (used by run_all.py)")
+    ap.add_argument("--name", required=True, help="nome do estágio (prefixo dos arquivos)")
+    ap.add_argument("--out", required=True, help="diretório de saída (caminho local ou URI do lake)")
+    ap.add_argument("--mode", choices=PROFILE_MODES, default=PROFILE_MODE)
+    ap.add_argument("--top", type=int, default=PROFILE_TOP_N)
+    ap.add_argument("script", type=Path)
+    args = ap.parse_args()
+    run_script(args.script.resolve(), args.name, lake_path(args.out), args.mode, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# src/publish.py
+"""
+Publicação de gold + relatório em object storage S3-compatível.
+
+- uploads em paralelo (arquivos) e multipart em paralelo (partes) via boto3
+- pula objetos cujo sha256 não mudou: um manifest (_publish_manifest.json) no
+  bucket guarda chave -> sha256/tamanho, então um run onde só o HTML mudou
+  faz 1 GET + 1 LIST + os uploads do que mudou
+- hash local cacheado por (mtime, tamanho) para não reler arquivos grandes
+- só artefatos publicáveis: Parquet do gold e a árvore do relatório (sem
+  _gold_build.json, snapshots .arrow nem temporários de escrita atômica)
+- chaves sob os prefixos publicados que não existem mais localmente (mart
+  removido, asset antigo do relatório) são só listadas; apagar é opt-in
+  (PUBLISH_DELETE_ORPHANS=1 ou --delete-orphans). Árvore local ausente ou
+  vazia (relatório ainda não gerado) nunca produz órfãos: sem ela não dá para
+  saber o que foi removido
+- endpoint configurável: AWS, MinIO ou moto server local
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import hashlib
+import json
+import mimetypes
+
+from config import (
+    DATA_GOLD,
+    LAKE_ROOT,
+    PUBLISH_DELETE_ORPHANS,
+    PUBLISH_FILE_CONCURRENCY,
+    PUBLISH_MULTIPART_THRESHOLD_MB,
+    PUBLISH_PART_CONCURRENCY,
+    PUBLISH_PART_SIZE_MB,
+    REPORTS_OUT,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_PREFIX,
+    S3_REGION,
+)
+from lake_fs import is_remote, write_text_atomic
+
+MANIFEST_KEY = "_publish_manifest.json"
+HASH_CACHE = LAKE_ROOT / ".publish_hash_cache.json"
+
+# (diretório local, prefixo remoto, padrão); arquivos ocultos (".x", inclusive
+# os temporários de lake_fs.atomic_path) nunca são publicados
+PUBLISH_TREES = [
+    (DATA_GOLD, "gold", "*.parquet"),
+    (REPORTS_OUT, "reports/latest", "**/*"),
+]
+
+_MB = 1024 * 1024
+
+
+def make_client(endpoint_url: str | None = S3_ENDPOINT_URL, region: str = S3_REGION):
+    try:
+        import boto3
+        from botocore.config import Config
+    except ImportError as e:
+        raise SystemExit("Publishing requires boto3: pip install -r requirements-cloud.txt") from e
+    # pool de conexões >= uploads simultâneos (arquivos x partes)
+    pool = max(PUBLISH_FILE_CONCURRENCY * PUBLISH_PART_CONCURRENCY, 10)
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        region_name=region,
+        config=Config(max_pool_connections=pool, retries={"max_attempts": 5, "mode": "adaptive"}),
+    )
+
+
+def transfer_config(
+    part_size_mb: int = PUBLISH_PART_SIZE_MB,
+    part_concurrency: int = PUBLISH_PART_CONCURRENCY,
+    threshold_mb: int = PUBLISH_MULTIPART_THRESHOLD_MB,
+):
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=threshold_mb * _MB,
+        multipart_chunksize=part_size_mb * _MB,
+        max_concurrency=part_concurrency,
+        use_threads=True,
+    )
+
+
+def sha256_file(path: Path, chunk_size: int = 8 * _MB) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def local_files(trees=PUBLISH_TREES, prefix: str = S3_PREFIX) -> dict[str, Path]:
+    """Chave remota -> arquivo local."""
+    files: dict[str, Path] = {}
+    for root, remote, pattern in trees:
+        # camada que já vive em object storage (EUROSTAT_LAKE_URI) não é republicada
+        if is_remote(root) or not Path(root).exists():
+            continue
+        root = Path(root)
+        for p in sorted(root.glob(pattern)):
+            rel = p.relative_to(root)
+            if p.is_file() and not any(part.startswith(".") for part in rel.parts):
+                files[remote_key(prefix, remote, rel.as_posix())] = p
+    return files
+
+
+def remote_key(prefix: str, remote: str, rel: str = "") -> str:
+    return f"{prefix.strip('/')}/{remote}/{rel}".lstrip("/")
+
+
+def orphans(files: dict[str, Path], sizes: dict[str, int], trees=PUBLISH_TREES, prefix: str = S3_PREFIX) -> list[str]:
+    """
+    Chaves no bucket, sob os prefixos publicados, sem arquivo local correspondente.
+    Só conta árvores que existem localmente e listaram algum arquivo.
+    """
+    roots = [remote_key(prefix, remote) for root, remote, _ in trees if not is_remote(root)]
+    roots = [r for r in roots if any(k.startswith(r) for k in files)]
+    return sorted(k for k in sizes if k not in files and any(k.startswith(r) for r in roots))
+
+
+def hash_files(files: dict[str, Path], cache_path: Path = HASH_CACHE) -> dict[str, dict]:
+    cache = json.loads(cache_path.read_text(encoding="utf-8")) if cache_path.exists() else {}
+    out: dict[str, dict] = {}
+    for key, p in files.items():
+        st = p.stat()
+        entry = cache.get(str(p))
+        if not entry or entry["mtime_ns"] != st.st_mtime_ns or entry["size"] != st.st_size:
+            entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": sha256_file(p)}
+        cache[str(p)] = entry
+        out[key] = {"sha256": entry["sha256"], "size": entry["size"]}
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    write_text_atomic(cache_path, json.dumps(cache))
+    return out
+
+
+def remote_manifest(client, bucket: str, prefix: str = S3_PREFIX) -> dict[str, dict]:
+    key = f"{prefix.strip('/')}/{MANIFEST_KEY}".lstrip("/")
+    try:
+        body = client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except client.exceptions.NoSuchKey:
+        return {}
+    except client.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return {}
+        raise
+    return json.loads(body)
+
+
+def remote_sizes(client, bucket: str, prefix: str = S3_PREFIX) -> dict[str, int]:
+    """LIST do prefixo: garante que objetos do manifest ainda existem."""
+    sizes: dict[str, int] = {}
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix.strip("/")):
+        for obj in page.get("Contents", []):
+            sizes[obj["Key"]] = obj["Size"]
+    return sizes
+
+
+def plan(local: dict[str, dict], manifest: dict[str, dict], sizes: dict[str, int]) -> list[str]:
+    """Chaves a enviar: novas, com sha256 diferente ou ausentes no bucket."""
+    todo = []
+    for key, meta in local.items():
+        prev = manifest.get(key)
+        if prev is None or prev["sha256"] != meta["sha256"] or sizes.get(key) != meta["size"]:
+            todo.append(key)
+    return todo
+
+
+def publish(
+    bucket: str | None = S3_BUCKET,
+    prefix: str = S3_PREFIX,
+    client=None,
+    file_concurrency: int = PUBLISH_FILE_CONCURRENCY,
+    dry_run: bool = False,
+    delete_orphans: bool = PUBLISH_DELETE_ORPHANS,
+    trees=PUBLISH_TREES,
+    hash_cache: Path = HASH_CACHE,
+) -> dict:
+    if not bucket:
+        raise SystemExit("Set EUROSTAT_S3_BUCKET (and EUROSTAT_S3_ENDPOINT_URL for a local stand-in).")
+    client = client or make_client()
+    files = local_files(trees, prefix)
+    local = hash_files(files, hash_cache)
+
+    manifest = remote_manifest(client, bucket, prefix)
+    sizes = remote_sizes(client, bucket, prefix)
+    todo = plan(local, manifest, sizes)
+    stale = orphans(files, sizes, trees, prefix)
+
+    result = {"bucket": bucket, "prefix": prefix, "files": len(files), "uploaded": todo,
+              "skipped": len(files) - len(todo),
+              "bytes_uploaded": sum(local[k]["size"] for k in todo),
+              "orphans": stale, "deleted": stale if delete_orphans else []}
+    if dry_run or not (todo or result["deleted"]):
+        return result
+
+    config = transfer_config()
+
+    def upload(key: str) -> None:
+        path = files[key]
+        extra = {"Metadata": {"sha256": local[key]["sha256"]}}
+        ctype, _ = mimetypes.guess_type(path.name)
+        if ctype:
+            extra["ContentType"] = ctype
+        client.upload_file(str(path), bucket, key, ExtraArgs=extra, Config=config)
+
+    with ThreadPoolExecutor(max_workers=file_concurrency) as pool:
+        list(pool.map(upload, todo))
+
+    # órfãos saem depois dos uploads: o relatório novo já está no ar
+    for i in range(0, len(result["deleted"]), 1000):  # limite do DeleteObjects
+        batch = result["deleted"][i:i + 1000]
+        client.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": k} for k in batch], "Quiet": True})
+
+    # manifest só é atualizado depois que todos os uploads terminaram
+    manifest.update({k: local[k] for k in todo})
+    for key in result["deleted"]:
+        manifest.pop(key, None)
+    client.put_object(
+        Bucket=bucket,
+        Key=f"{prefix.strip('/')}/{MANIFEST_KEY}".lstrip("/"),
+        Body=json.dumps(manifest, indent=2).encode("utf-8"),
+        ContentType="application/json",
+    )
+    return result
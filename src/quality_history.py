@@ -0,0 +1,166 @@
+# src/quality_history.py
+"""
+Histórico das métricas de qualidade, colunar e só-append.
+
+05_quality_checks.py continua gravando o quality_report.json do run atual e,
+além disso, achata as métricas numéricas em linhas (formato longo):
+
+    run_id | run_at (UTC) | status (OK | FAIL) | table | metric | value
+
+e grava um Parquet pequeno por run em outputs-checks/quality_history/
+(run_<run_id>.parquet). Append = escrever um arquivo novo; o mesmo run_id
+(run retomado) sobrescreve o seu. Passando de QUALITY_HISTORY_COMPACT_FILES
+arquivos, os runs e o compacted_* anterior são juntados num único
+compacted_<último run>.parquet (fica sempre um compactado só).
+
+drift() compara o run atual com a mediana dos últimos QUALITY_DRIFT_WINDOW
+runs que passaram (status OK): queda de linhas acima de
+QUALITY_DRIFT_MAX_ROW_DROP ou salto de null rate acima de
+QUALITY_DRIFT_MAX_NULL_JUMP. Run que falhou fica no histórico (aparece nas
+tendências) mas não entra na baseline. O relatório lê o histórico com load()
+(um Parquet por arquivo, sem JSON).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from config import (
+    OUTPUTS_CHECKS,
+    QUALITY_DRIFT_MAX_NULL_JUMP,
+    QUALITY_DRIFT_MAX_ROW_DROP,
+    QUALITY_DRIFT_MIN_RUNS,
+    QUALITY_DRIFT_WINDOW,
+    QUALITY_HISTORY_COMPACT_FILES,
+)
+from lake_io import read_parquet, write_frame
+
+HISTORY_DIR = OUTPUTS_CHECKS / "quality_history"
+COLUMNS = ["run_id", "run_at", "status", "table", "metric", "value"]
+STATUS_OK = "OK"
+
+
+def _number(v) -> float | None:
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return None
+    return float(v)
+
+
+def metrics_from_report(report: dict) -> list[tuple[str, str, float]]:
+    """(table, metric, value) de cada número do quality report."""
+    rows = []
+    for table, checks in report.get("checks", {}).items():
+        for metric, v in checks.items():
+            x = _number(v)
+            if x is not None:
+                rows.append((table, metric, x))
+    for step, s in report.get("lineage", {}).get("steps", {}).items():
+        for reason, n in s["dropped_by_reason"].items():
+            rows.append((step, f"dropped.{reason}", float(n)))
+        for reason, n in s["added_by_reason"].items():
+            rows.append((step, f"added.{reason}", float(n)))
+    rows.append(("run", "errors", float(len(report.get("errors", [])))))
+    return rows
+
+
+def frame(
+    run_id: str,
+    metrics: list[tuple[str, str, float]],
+    run_at: datetime | None = None,
+    status: str = STATUS_OK,
+) -> pd.DataFrame:
+    run_at = run_at or datetime.now(timezone.utc)
+    df = pd.DataFrame(metrics, columns=["table", "metric", "value"])
+    df.insert(0, "status", status)
+    df.insert(0, "run_at", pd.Timestamp(run_at).as_unit("us"))
+    df.insert(0, "run_id", run_id)
+    return df[COLUMNS]
+
+
+def append(df: pd.DataFrame) -> None:
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    run_id = df["run_id"].iloc[0]
+    write_frame(df, HISTORY_DIR / f"run_{run_id}.parquet")
+    compact()
+
+
+def compact(max_files: int = QUALITY_HISTORY_COMPACT_FILES) -> None:
+    files = sorted(HISTORY_DIR.glob("run_*.parquet"), key=lambda p: p.name)
+    if len(files) <= max_files:
+        return
+    # o compactado anterior entra no novo: o diretório fica com um compacted_* só
+    old = sorted(HISTORY_DIR.glob("compacted_*.parquet"), key=lambda p: p.name)
+    merged = _dedupe(pd.concat([_read(p) for p in old + files], ignore_index=True))
+    last = merged.sort_values("run_at")["run_id"].iloc[-1]
+    out = HISTORY_DIR / f"compacted_{last}.parquet"
+    write_frame(merged, out)
+    # só apaga depois do novo gravado (atômico): uma falha no meio não perde runs
+    for p in old + files:
+        if p != out:
+            p.unlink()
+
+
+def _read(path) -> pd.DataFrame:
+    df = read_parquet(path)
+    if "status" not in df.columns:
+        # arquivo de antes da coluna status: sem como saber, conta como OK (como antes)
+        df.insert(COLUMNS.index("status"), "status", STATUS_OK)
+    return df[COLUMNS]
+
+
+def _dedupe(df: pd.DataFrame) -> pd.DataFrame:
+    # compacted_* vem antes de run_*: um run regravado depois de compactado fica com a versão nova
+    return df.drop_duplicates(["run_id", "table", "metric"], keep="last")
+
+
+def load(exclude_run: str | None = None) -> pd.DataFrame:
+    """Histórico inteiro (formato longo), ordenado por run_at."""
+    if not HISTORY_DIR.exists():
+        return pd.DataFrame(columns=COLUMNS)
+    parts = [_read(p) for p in sorted(HISTORY_DIR.glob("*.parquet"), key=lambda p: p.name)]
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    df = pd.concat(parts, ignore_index=True)
+    if exclude_run is not None:
+        df = df[df["run_id"] != exclude_run]
+    df = _dedupe(df)
+    return df.sort_values(["run_at", "table", "metric"], ignore_index=True)
+
+
+def passed(history: pd.DataFrame) -> pd.DataFrame:
+    """Só os runs com status OK (a baseline do drift)."""
+    return history[history["status"] == STATUS_OK]
+
+
+def drift(history: pd.DataFrame, current: pd.DataFrame, window: int = QUALITY_DRIFT_WINDOW) -> list[dict]:
+    """Métricas do run atual fora da faixa da mediana dos últimos `window` runs que passaram."""
+    # um run que falhou (drift incluído) não puxa a mediana na direção do problema
+    history = passed(history)
+    runs = history.drop_duplicates("run_id").sort_values("run_at")["run_id"].tail(window)
+    if len(runs) < QUALITY_DRIFT_MIN_RUNS:
+        return []
+    baseline = history[history["run_id"].isin(runs)].groupby(["table", "metric"])["value"].median()
+
+    findings = []
+    for table, metric, value in current[["table", "metric", "value"]].itertuples(index=False):
+        base = baseline.get((table, metric))
+        if base is None or pd.isna(base):
+            continue
+        if metric == "rows" and base > 0 and (base - value) / base > QUALITY_DRIFT_MAX_ROW_DROP:
+            findings.append({"table": table, "metric": metric, "value": value, "baseline": float(base),
+                             "change": (value - base) / base, "limit": -QUALITY_DRIFT_MAX_ROW_DROP})
+        elif metric.startswith("null_rate") and value - base > QUALITY_DRIFT_MAX_NULL_JUMP:
+            findings.append({"table": table, "metric": metric, "value": value, "baseline": float(base),
+                             "change": value - base, "limit": QUALITY_DRIFT_MAX_NULL_JUMP})
+    return findings
+
+
+def trends(history: pd.DataFrame, metrics: list[tuple[str, str]], last: int = QUALITY_DRIFT_WINDOW) -> pd.DataFrame:
+    """Tabela larga (run x (table, metric)) dos últimos `last` runs, para o relatório."""
+    if history.empty:
+        return pd.DataFrame()
+    runs = history.drop_duplicates("run_id").sort_values("run_at")["run_id"].tail(last)
+    h = history[history["run_id"].isin(runs)]
+    wide = h.pivot_table(index=["run_at", "run_id"], columns=["table", "metric"], values="value", aggfunc="last")
+    return wide.reindex(columns=pd.MultiIndex.from_tuples(metrics)).reset_index()
@@ -0,0 +1,198 @@
+# src/revisions.py
+"""
+Rastreamento de revisões Eurostat entre dois snapshots do silver.
+
+O diff é um join externo particionado por hash da chave
+(freq, nace_r2, indic_sbs, geo, year): cada partição é comparada
+separadamente, então o pico de memória do merge fica ~1/N do total.
+
+Versão do silver = st_mtime_ns do arquivo (silver_version). O change log
+guarda de qual versão (base_version) para qual (silver_mtime_ns) ele vai, e
+o gold grava em _gold_build.json a versão que consumiu: o incremental só vale
+quando a base do diff é exatamente o que o gold já tem. Repetir o 03 antes do
+gold faz o diff partir de uma versão que o gold nunca viu -> refresh completo,
+em vez de perder as revisões do 03 anterior.
+
+pandas/numpy são importados dentro das funções: pending_manifest() é só
+leitura de JSON, e o gold usa isso para sair cedo sem pagar o import.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+import json
+
+from config import DATA_SILVER
+from lake_fs import write_text_atomic
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+KEY = ["freq", "nace_r2", "indic_sbs", "geo", "year"]
+COMPARED = ["value_num", "flag"]
+
+SILVER_PATH = DATA_SILVER / "sbs_na_ind_r2_silver.parquet"
+SILVER_PREV_PATH = DATA_SILVER / "sbs_na_ind_r2_silver_prev.parquet"
+# versão do silver de onde o silver_prev foi copiado (a cópia tem mtime próprio)
+SILVER_PREV_META = DATA_SILVER / "sbs_na_ind_r2_silver_prev.json"
+
+REVISIONS_DIR = DATA_SILVER / "revisions"
+LATEST_MANIFEST = REVISIONS_DIR / "latest.json"
+
+CHANGE_INSERT = "insert"
+CHANGE_UPDATE = "update"
+CHANGE_DELETE = "delete"
+
+DEFAULT_PARTITIONS = 16
+
+
+def _hash_partition(df: pd.DataFrame, n: int) -> np.ndarray:
+    import numpy as np
+    import pandas as pd
+
+    h = pd.util.hash_pandas_object(df[KEY], index=False).to_numpy()
+    return (h % np.uint64(n)).astype(np.int64)
+
+
+def _partitions(df: pd.DataFrame, n: int):
+    """Gera as n partições de df (ordena uma vez por partição e fatia)."""
+    import numpy as np
+
+    part = _hash_partition(df, n)
+    order = np.argsort(part, kind="stable")
+    bounds = np.searchsorted(part[order], np.arange(n + 1))
+    for p in range(n):
+        yield df.iloc[order[bounds[p]:bounds[p + 1]]]
+
+
+def _differs(old: pd.Series, new: pd.Series) -> pd.Series:
+    return ~(old.eq(new) | (old.isna() & new.isna()))
+
+
+def diff_snapshots(old: pd.DataFrame, new: pd.DataFrame, partitions: int = DEFAULT_PARTITIONS) -> pd.DataFrame:
+    """
+    Change log entre dois snapshots: uma linha por chave inserida, alterada
+    (valor ou flag) ou removida, com valor/flag antigos e novos.
+    """
+    import numpy as np
+    import pandas as pd
+
+    cols = KEY + COMPARED
+    old = old[cols].drop_duplicates(subset=KEY, keep="last")
+    new = new[cols].drop_duplicates(subset=KEY, keep="last")
+
+    chunks: list[pd.DataFrame] = []
+    for o, n in zip(_partitions(old, partitions), _partitions(new, partitions)):
+        m = o.merge(n, on=KEY, how="outer", suffixes=("_old", "_new"), indicator=True)
+        changed = (
+            (m["_merge"] != "both")
+            | _differs(m["value_num_old"], m["value_num_new"])
+            | _differs(m["flag_old"], m["flag_new"])
+        )
+        m = m.loc[changed]
+        if len(m):
+            chunks.append(m)
+
+    if not chunks:
+        return pd.DataFrame(columns=["change_type", *KEY, "value_old", "value_new", "flag_old", "flag_new"])
+
+    out = pd.concat(chunks, ignore_index=True)
+    out["change_type"] = np.select(
+        [out["_merge"] == "right_only", out["_merge"] == "left_only"],
+        [CHANGE_INSERT, CHANGE_DELETE],
+        default=CHANGE_UPDATE,
+    )
+    out = out.rename(columns={"value_num_old": "value_old", "value_num_new": "value_new"})
+    out = out[["change_type", *KEY, "value_old", "value_new", "flag_old", "flag_new"]]
+    out["change_type"] = out["change_type"].astype("category")
+    return out.sort_values(["indic_sbs", "geo", "nace_r2", "year"], ignore_index=True)
+
+
+def silver_version(silver_path: Path = SILVER_PATH) -> int | None:
+    """Versão do silver atual (st_mtime_ns), None se ainda não existe."""
+    return silver_path.stat().st_mtime_ns if silver_path.exists() else None
+
+
+def mark_prev_snapshot(version: int, prev_path: Path = SILVER_PREV_PATH, meta_path: Path = SILVER_PREV_META) -> None:
+    """Registra de qual versão do silver o silver_prev acabou de ser copiado."""
+    meta = {"version": version, "mtime_ns": prev_path.stat().st_mtime_ns}
+    write_text_atomic(meta_path, json.dumps(meta, indent=2))
+
+
+def prev_version(prev_path: Path = SILVER_PREV_PATH, meta_path: Path = SILVER_PREV_META) -> int | None:
+    """
+    Versão do silver guardada no silver_prev, ou None se não dá para saber
+    (sem registro, ou silver_prev trocado depois dele: crash entre a cópia e o
+    registro, snapshot de antes desse arquivo existir).
+    """
+    if not prev_path.exists() or not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("mtime_ns") != prev_path.stat().st_mtime_ns:
+        return None
+    return meta.get("version")
+
+
+def write_changelog(
+    changes: pd.DataFrame,
+    silver_path: Path = SILVER_PATH,
+    full_refresh: bool = False,
+    base_version: int | None = None,
+) -> Path:
+    """Grava o change log do run e aponta latest.json para ele."""
+    from lake_io import write_frame
+
+    REVISIONS_DIR.mkdir(parents=True, exist_ok=True)
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out_path = REVISIONS_DIR / f"changes_{run_id}.parquet"
+    write_frame(changes, out_path, contract="silver.changes")
+
+    counts = changes["change_type"].value_counts().to_dict() if len(changes) else {}
+    manifest = {
+        "run_id": run_id,
+        "changes_path": out_path.name,
+        # o change log leva o silver de base_version até esta versão exata
+        "silver_mtime_ns": silver_version(silver_path),
+        "base_version": base_version,
+        "full_refresh": full_refresh,
+        "counts": {k: int(counts.get(k, 0)) for k in (CHANGE_INSERT, CHANGE_UPDATE, CHANGE_DELETE)},
+        "affected_series": int(changes[["geo", "indic_sbs"]].drop_duplicates().shape[0]) if len(changes) else 0,
+    }
+    write_text_atomic(LATEST_MANIFEST, json.dumps(manifest, indent=2))
+    return out_path
+
+
+def pending_manifest(consumed_version: int | None, silver_path: Path = SILVER_PATH) -> dict | None:
+    """
+    Manifest do change log que leva o silver da versão que o gold consumiu
+    (consumed_version) até a atual, ou None quando o gold precisa de refresh
+    completo: sem manifest, primeiro run, silver mais novo que o diff, ou diff
+    partindo de outra versão (o 03 rodou mais de uma vez desde o último gold).
+    """
+    if consumed_version is None or not LATEST_MANIFEST.exists() or not silver_path.exists():
+        return None
+    manifest = json.loads(LATEST_MANIFEST.read_text(encoding="utf-8"))
+    if manifest.get("full_refresh"):
+        return None
+    if manifest.get("silver_mtime_ns") != silver_version(silver_path):
+        return None
+    if manifest.get("base_version") != consumed_version:
+        return None
+    return manifest
+
+
+def load_pending_changes(consumed_version: int | None, silver_path: Path = SILVER_PATH) -> pd.DataFrame | None:
+    """Change log válido para o gold atual (ver pending_manifest)."""
+    from lake_io import read_parquet
+
+    manifest = pending_manifest(consumed_version, silver_path)
+    if manifest is None:
+        return None
+    return read_parquet(REVISIONS_DIR / manifest["changes_path"])
+
+
+def affected_series(changes: pd.DataFrame) -> pd.DataFrame:
+    """Séries (geo, indic_sbs) tocadas pelo change log."""
+    return changes[["geo", "indic_sbs"]].drop_duplicates(ignore_index=True)
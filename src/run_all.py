@@ -1,23 +1,166 @@
+"""
+Roda o pipeline inteiro (ou um estágio, para o Airflow) com checkpoint por run.
+
+    python src/run_all.py                       retoma o último run se falhou, senão começa um novo
+    python src/run_all.py --fresh               sempre começa um run novo
+    python src/run_all.py --run-id ID           usa/retoma o run ID
+    python src/run_all.py --run-id ID --stage gold
+    python src/run_all.py --profile silver gold   perfila estes estágios (src/profiling.py)
+    python src/run_all.py --fresh --datasets sbs_na_ind_r2   run disparado pelo watch mode
+
+A publicação (src/06_publish.py) não é estágio: roda à mão depois do relatório.
+
+Cada estágio concluído fica registrado em runs/<run_id>/ (src/checkpoint.py)
+com o fingerprint das saídas. Num retry, estágios concluídos com saídas
+intactas são pulados até o primeiro incompleto; dali em diante tudo roda de
+novo. Repetir o 03 depois dele ter dado certo não perde revisões (o gold vê
+que o change log parte de uma versão do silver que ele não consumiu e faz
+refresh completo, ver src/revisions.py), mas troca o incremental por um
+refresh completo.
+"""
+from __future__ import annotations
+
+import argparse
+import os
 import subprocess
 import sys
+import time
 from pathlib import Path
 
+from checkpoint import RUN_FAILED, RUN_OK, RunCheckpoint, new_run_id
+from config import DATA_BRONZE, DATA_GOLD, DATA_RAW, DATA_SILVER, OUTPUTS_CHECKS, PROFILE_MODE, PROFILE_TOP_N
+
 BASE = Path(__file__).resolve().parents[0]  # .../src
 PROJECT = BASE.parent                       # .../ (raiz do repo)
 
-steps = [
-    PROJECT / "src" / "01_extract_raw.py",
-    PROJECT / "src" / "02_bronze_ingest.py",
-    PROJECT / "src" / "03_silver_transform.py",
-    PROJECT / "src" / "04_gold_analytics.py",
-    PROJECT / "src" / "05_quality_checks.py",
+# (nome, script, nível, saídas); estágios do mesmo nível são independentes
+# (no Airflow rodam em paralelo) e rodar um estágio invalida os de nível maior
+STAGES = [
+    ("extract", BASE / "01_extract_raw.py", 0, [DATA_RAW / "sbs_na_ind_r2.tsv"]),
+    ("bronze", BASE / "02_bronze_ingest.py", 1, [DATA_BRONZE / "sbs_na_ind_r2_bronze.parquet"]),
+    # cache local de codelists/TOC (fora do lake); sem rede o 03 cai nos códigos
+    ("metadata", BASE / "metadata.py", 1, []),
+    ("silver", BASE / "03_silver_transform.py", 2, [
+        DATA_SILVER / "sbs_na_ind_r2_silver.parquet",
+        DATA_SILVER / "dim_geo.parquet",
+        DATA_SILVER / "dim_indicator.parquet",
+        DATA_SILVER / "dim_nace.parquet",
+    ]),
+    ("revisions", BASE / "silver" / "silver_revisions.py", 3, [DATA_SILVER / "revisions" / "latest.json"]),
+    ("gold", BASE / "04_gold_analytics.py", 4, [
+        DATA_GOLD / "gold_country_indicator_year.parquet",
+        DATA_GOLD / "gold_yoy_growth.parquet",
+    ]),
+    # CSV também é saída: o checkpoint só pula o estágio se os dois estão intactos
+    ("structural", BASE / "gold" / "gold_structural_metrics.py", 5, [
+        DATA_GOLD / "gold_structural_metrics.parquet",
+        DATA_GOLD / "gold_structural_metrics.csv",
+    ]),
+    ("anomalies", BASE / "gold" / "gold_anomalies.py", 5, [DATA_GOLD / "gold_anomalies.parquet"]),
+    ("concentration", BASE / "gold" / "gold_concentration.py", 5, [
+        DATA_GOLD / "gold_geo_share.parquet",
+        DATA_GOLD / "gold_concentration.parquet",
+    ]),
+    ("quality", BASE / "05_quality_checks.py", 6, [OUTPUTS_CHECKS / "quality_report.json"]),
 ]
+STAGE_NAMES = [name for name, *_ in STAGES]
 
-for s in steps:
-    print(f"\n=== Running {s} ===")
-    r = subprocess.run([sys.executable, str(s)], cwd=str(PROJECT))
+
+def stage_command(ckpt: RunCheckpoint, name: str, script: Path, profile: dict | None) -> list[str]:
+    """python script, ou o script dentro do profiler se o estágio foi selecionado."""
+    if profile is None or (profile["stages"] and name not in profile["stages"]):
+        return [sys.executable, str(script)]
+    return [
+        sys.executable, str(BASE / "profiling.py"),
+        "--name", name, "--out", str(ckpt.dir / "profile"),
+        "--mode", profile["mode"], "--top", str(profile["top"]),
+        str(script),
+    ]
+
+
+def run_stage(
+    ckpt: RunCheckpoint,
+    name: str,
+    script: Path,
+    level: int,
+    outputs: list,
+    profile: dict | None = None,
+) -> None:
+    ckpt.invalidate([n for n, _, lvl, _ in STAGES if lvl > level])
+    print(f"\n=== Running {script} ===")
+    t0 = time.perf_counter()
+    # o 05 grava o histórico de qualidade sob o mesmo run_id do checkpoint
+    env = {**os.environ, "EUROSTAT_RUN_ID": ckpt.run_id}
+    r = subprocess.run(stage_command(ckpt, name, script, profile), cwd=str(PROJECT), env=env)
     if r.returncode != 0:
-        raise SystemExit(f"Step failed: {s}")
+        ckpt.set_status(RUN_FAILED)
+        raise SystemExit(f"Step failed: {script} (run {ckpt.run_id}; rerun to resume from here)")
+    ckpt.mark_done(name, outputs, time.perf_counter() - t0)
+
+
+def run_one(
+    ckpt: RunCheckpoint, stage: str, profile: dict | None = None, datasets: list[str] | None = None
+) -> None:
+    """Um estágio só (task do Airflow); num retry, pula se já concluiu."""
+    if ckpt.status is None:
+        ckpt.start(datasets)
+    name, script, level, outputs = STAGES[STAGE_NAMES.index(stage)]
+    if ckpt.is_done(name, outputs):
+        print(f"=== Skipping {name}: done in run {ckpt.run_id} ===")
+        return
+    run_stage(ckpt, name, script, level, outputs, profile)
+    if all(ckpt.is_done(n, o) for n, _, _, o in STAGES):
+        ckpt.set_status(RUN_OK)
+
+
+def run_pipeline(ckpt: RunCheckpoint, profile: dict | None = None, datasets: list[str] | None = None) -> None:
+    ckpt.start(datasets)
+    resuming = True
+    for name, script, level, outputs in STAGES:
+        if resuming and ckpt.is_done(name, outputs):
+            print(f"=== Skipping {name}: done in run {ckpt.run_id} ===")
+            continue
+        resuming = False
+        run_stage(ckpt, name, script, level, outputs, profile)
+    ckpt.set_status(RUN_OK)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--run-id", help="run a usar/retomar (ex.: run_id do Airflow)")
+    ap.add_argument("--stage", choices=STAGE_NAMES, help="roda só este estágio")
+    ap.add_argument("--fresh", action="store_true", help="ignora o checkpoint e começa um run novo")
+    ap.add_argument("--profile", nargs="*", metavar="STAGE",
+                    help="perfila os estágios dados (sem nomes: todos); saída em runs/<run_id>/profile/")
+    ap.add_argument("--profile-mode", choices=["cprofile", "sample"], default=PROFILE_MODE)
+    ap.add_argument("--profile-top", type=int, default=PROFILE_TOP_N, help="hotspots impressos por estágio")
+    ap.add_argument("--datasets", nargs="*", help="datasets que mudaram (watch mode); registrados no checkpoint")
+    args = ap.parse_args()
+
+    profile = None
+    if args.profile is not None:
+        unknown = sorted(set(args.profile) - set(STAGE_NAMES))
+        if unknown:
+            ap.error(f"unknown stage(s) for --profile: {', '.join(unknown)} (choose from {', '.join(STAGE_NAMES)})")
+        profile = {"stages": set(args.profile), "mode": args.profile_mode, "top": args.profile_top}
+
+    if args.run_id:
+        ckpt = RunCheckpoint(args.run_id)
+        if args.fresh:
+            ckpt.invalidate(STAGE_NAMES)
+    else:
+        ckpt = None if args.fresh else RunCheckpoint.latest()
+        if ckpt is None or ckpt.status == RUN_OK:
+            ckpt = RunCheckpoint(new_run_id())
+        else:
+            print(f"Resuming run {ckpt.run_id} (status: {ckpt.status})")
+
+    if args.stage:
+        run_one(ckpt, args.stage, profile, args.datasets)
+    else:
+        run_pipeline(ckpt, profile, args.datasets)
+        print(f"\nPipeline finished OK (run {ckpt.run_id}).")
 
-print("\nPipeline finished OK.")
 
+if __name__ == "__main__":
+    main()
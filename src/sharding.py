@@ -0,0 +1,186 @@
+# src/sharding.py
+"""
+Execução do gold em shards por indicador, num pool de processos.
+
+YoY, densificação, CAGR e ranks nunca cruzam indicadores, então o trabalho
+se divide por indic_id sem troca de dados entre shards:
+
+1. as tabelas de entrada são ordenadas por indic_id (sort do Arrow, em C++) e
+   gravadas uma vez como Arrow IPC sem compressão num diretório temporário
+   (/dev/shm quando existe: memória compartilhada de verdade)
+2. os indicadores são distribuídos em shards balanceados por número de linhas
+   (maior primeiro -> shard mais leve)
+3. cada worker abre os IPC via memory map e fatia só as faixas contíguas dos
+   seus indicadores (zero-copy, páginas do page cache compartilhado), roda a
+   função e grava os DataFrames de saída como IPC no mesmo diretório; só
+   objetos pequenos (contadores) voltam por pickle
+4. o processo pai concatena as saídas dos shards (também mapeadas)
+
+GOLD_WORKERS (src/config.py) = 1 mantém tudo num processo só, sem IPC; abaixo
+de GOLD_SHARD_MIN_ROWS o pool não compensa e também roda direto. O pool usa
+fork: os scripts de estágio rodam no nível do módulo e spawn/forkserver os
+re-executariam em cada worker. Sem fork (Windows) roda sequencial.
+
+Cada worker usa uma thread do Arrow: o paralelismo é entre processos.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from config import GOLD_SHARD_MIN_ROWS, GOLD_SHARDS_PER_WORKER, GOLD_WORKERS
+
+SHARD_KEY = "indic_id"
+SHM_DIR = Path("/dev/shm")
+
+
+def resolve_workers(workers: int | None = None) -> int:
+    """None -> GOLD_WORKERS; 0 -> todos os núcleos."""
+    n = GOLD_WORKERS if workers is None else workers
+    if n == 0:
+        return os.cpu_count() or 1
+    return max(int(n), 1)
+
+
+def plan_shards(keys: np.ndarray, n_shards: int) -> list[np.ndarray]:
+    """
+    Distribui os valores distintos de keys em até n_shards grupos com número
+    de linhas parecido (LPT: maior indicador primeiro, vai para o grupo mais
+    leve). Devolve os ids de cada grupo, do mais pesado ao mais leve.
+    """
+    ids, counts = np.unique(keys, return_counts=True)
+    n_shards = max(min(n_shards, len(ids)), 1)
+    load = np.zeros(n_shards, dtype=np.int64)
+    groups: list[list[int]] = [[] for _ in range(n_shards)]
+    for i in np.argsort(-counts, kind="stable"):
+        g = int(np.argmin(load))
+        groups[g].append(int(ids[i]))
+        load[g] += counts[i]
+    order = np.argsort(-load, kind="stable")
+    return [np.sort(np.asarray(groups[g], dtype=keys.dtype)) for g in order if groups[g]]
+
+
+def _ranges(sorted_keys: np.ndarray, ids: np.ndarray) -> list[tuple[int, int]]:
+    starts = np.searchsorted(sorted_keys, ids, side="left")
+    stops = np.searchsorted(sorted_keys, ids, side="right")
+    return [(int(a), int(b)) for a, b in zip(starts, stops) if b > a]
+
+
+def _sorted_table(data: pd.DataFrame | pa.Table) -> pa.Table:
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    return table.sort_by([(SHARD_KEY, "ascending")])
+
+
+def _read_ipc(path: Path) -> pa.Table:
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _read_output(value):
+    return _read_ipc(value).to_pandas(split_blocks=True) if isinstance(value, Path) else value
+
+
+def _init_worker() -> None:
+    pa.set_cpu_count(1)
+    pa.set_io_thread_count(1)
+    # com --profile (src/profiling.py) só o processo do estágio é medido;
+    # o fork herdaria o hook do cProfile e o tracemalloc, só com o custo
+    sys.setprofile(None)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _run_shard(
+    fn: Callable[..., dict],
+    inputs: dict[str, Path],
+    ranges: dict[str, list[tuple[int, int]]],
+    out_dir: Path,
+    shard_no: int,
+    kwargs: dict,
+) -> dict:
+    frames = {}
+    for name, path in inputs.items():
+        table = _read_ipc(path)
+        parts = [table.slice(a, b - a) for a, b in ranges[name]]
+        table = pa.concat_tables(parts) if parts else table.slice(0, 0)
+        frames[name] = table.to_pandas(split_blocks=True)
+
+    result = {}
+    for key, value in fn(frames, **kwargs).items():
+        if isinstance(value, pd.DataFrame):
+            path = out_dir / f"out_{shard_no:04d}_{key}.arrow"
+            feather.write_feather(value.reset_index(drop=True), str(path), compression="uncompressed")
+            result[key] = path
+        else:
+            result[key] = value
+    return result
+
+
+def map_shards(
+    fn: Callable[..., dict],
+    tables: dict[str, pd.DataFrame | pa.Table],
+    workers: int | None = None,
+    **kwargs,
+) -> list[dict]:
+    """
+    Roda fn(frames, **kwargs) por shard de indicadores e devolve a lista de
+    resultados (um dict por shard; DataFrames já lidos de volta). tables são
+    as entradas com coluna indic_id; fn é uma função de módulo (vai por
+    referência para o worker) e devolve um dict.
+
+    Com um worker, poucas linhas, um indicador só ou sem fork: fn roda uma
+    vez sobre as tabelas inteiras (mesmo formato de retorno).
+    """
+    workers = resolve_workers(workers)
+    n_rows = max(len(t) for t in tables.values())
+    first = next(iter(tables.values()))
+    keys = np.asarray(first[SHARD_KEY])
+    can_fork = "fork" in mp.get_all_start_methods()
+
+    if workers <= 1 or n_rows < GOLD_SHARD_MIN_ROWS or len(np.unique(keys)) < 2 or not can_fork:
+        frames = {name: t.to_pandas() if isinstance(t, pa.Table) else t for name, t in tables.items()}
+        return [fn(frames, **kwargs)]
+
+    tmp_root = str(SHM_DIR) if SHM_DIR.is_dir() else None
+    with tempfile.TemporaryDirectory(prefix="eurostat_shards_", dir=tmp_root) as tmp:
+        out_dir = Path(tmp)
+        inputs, sorted_keys = {}, {}
+        for name, data in tables.items():
+            table = _sorted_table(data)
+            inputs[name] = out_dir / f"in_{name}.arrow"
+            feather.write_feather(table, str(inputs[name]), compression="uncompressed")
+            sorted_keys[name] = table[SHARD_KEY].to_numpy()
+
+        shards = plan_shards(keys, workers * GOLD_SHARDS_PER_WORKER)
+        ctx = mp.get_context("fork")
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)), mp_context=ctx,
+                                 initializer=_init_worker) as pool:
+            futures = [
+                pool.submit(
+                    _run_shard, fn, inputs,
+                    {name: _ranges(sorted_keys[name], ids) for name in inputs},
+                    out_dir, i, kwargs,
+                )
+                for i, ids in enumerate(shards)
+            ]
+            results = [f.result() for f in futures]
+
+        # lê de volta antes de apagar o diretório temporário
+        return [{k: _read_output(v) for k, v in r.items()} for r in results]
+
+
+def concat(results: list[dict], key: str) -> pd.DataFrame:
+    """Concatena a saída `key` de todos os shards."""
+    parts = [r[key] for r in results]
+    return parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
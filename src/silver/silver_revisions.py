@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+
+# ----------------------------
+# Paths (repo root)
+# ----------------------------
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from contracts import guaranteed  # noqa: E402
+from lake_io import read_parquet, read_schema  # noqa: E402
+from revisions import (  # noqa: E402
+    COMPARED,
+    KEY,
+    SILVER_PATH,
+    SILVER_PREV_PATH,
+    diff_snapshots,
+    prev_version,
+    write_changelog,
+)
+
+
+def main() -> None:
+    if not SILVER_PATH.exists():
+        raise FileNotFoundError(f"Silver file not found: {SILVER_PATH}")
+
+    cols = KEY + COMPARED
+    new = read_parquet(SILVER_PATH, columns=cols)
+
+    # First run (no previous snapshot): nothing to diff, downstream does a full refresh
+    if not SILVER_PREV_PATH.exists():
+        out = write_changelog(diff_snapshots(new.iloc[:0], new.iloc[:0]), full_refresh=True)
+        print(f"No previous silver snapshot; full refresh. Saved: {out}")
+        return
+
+    if guaranteed(SILVER_PREV_PATH, "silver.sbs_na_ind_r2"):
+        old = read_parquet(SILVER_PREV_PATH, columns=cols)
+    else:
+        # snapshots older than the flag column are compared with flag = null
+        prev_cols = set(read_schema(SILVER_PREV_PATH).names)
+        old = read_parquet(SILVER_PREV_PATH, columns=[c for c in cols if c in prev_cols])
+        old = old.reindex(columns=cols)
+    changes = diff_snapshots(old, new)
+    # base_version None (snapshot of unknown origin) never matches gold: full refresh
+    out = write_changelog(changes, base_version=prev_version())
+
+    counts = changes["change_type"].value_counts().to_dict() if len(changes) else {}
+    print(f"Saved: {out}")
+    print(f"Changes: {counts or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ from pathlib import Path
 
 import requests
 
+from lake_fs import atomic_path
+
 def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
@@ -12,12 +14,13 @@ def download_file(url: str, out_path: Path, timeout: int = 120) -> None:
     out_path.parent.mkdir(parents=True, exist_ok=True)
     with requests.get(url, stream=True, timeout=timeout) as r:
         r.raise_for_status()
-        with open(out_path, "wb") as f:
+        with atomic_path(out_path) as tmp, tmp.open("wb") as f:
             for chunk in r.iter_content(chunk_size=1024 * 1024):
                 if chunk:
                     f.write(chunk)
 
 def gunzip_file(gz_path: Path, out_path: Path) -> None:
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(gz_path, "rb") as f_in, open(out_path, "wb") as f_out:
-        shutil.copyfileobj(f_in, f_out)
+    with gz_path.open("rb") as raw, gzip.GzipFile(fileobj=raw) as f_in:
+        with atomic_path(out_path) as tmp, tmp.open("wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
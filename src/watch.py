@@ -0,0 +1,304 @@
+# src/watch.py
+"""
+Watch mode: consulta a Eurostat e só dispara o refresh dos datasets que mudaram.
+
+    python src/watch.py                processo contínuo, uma consulta a cada WATCH_INTERVAL_S
+    python src/watch.py --once         uma consulta (+ refresh, se algo mudou) e sai
+    python src/watch.py --check        só consulta e guarda os pendentes; exit 0 se algum
+                                       mudou, 1 se nada mudou (sensor do Airflow)
+    python src/watch.py --download     baixa os pendentes (Airflow); exit 99 se o pipeline
+                                       não precisa rodar
+    python src/watch.py --ack          confirma os pendentes depois do run (Airflow)
+
+Detecção, da mais barata para a mais cara:
+1. TOC (metadata.py): um GET condicional (If-None-Match / If-Modified-Since)
+   cobre todos os datasets; se o validador não mudou desde o último parse, o
+   "last update of data" guardado no estado é reaproveitado
+2. TOC novo: parse e comparação do "last update of data" de cada dataset
+3. dataset fora do TOC: HEAD na API de dados (ETag / Last-Modified)
+
+Estado em runs/watch.json: último marcador confirmado de cada dataset e os
+pendentes. Um dataset só é confirmado depois do refresh dar certo: se o
+pipeline falha, a próxima consulta o dispara de novo. Dataset sem estado
+(primeira consulta) conta como mudado.
+
+Refresh: 00_download_raw.py --datasets <mudados> e, se WATCH_PIPELINE_DATASET
+está entre eles, run_all.py --fresh --datasets <mudados> (o silver registra as
+revisões e o gold recalcula só as séries revisadas).
+
+Erro de rede: nada é disparado e a próxima tentativa vem com backoff
+exponencial (WATCH_BACKOFF_BASE_S .. WATCH_BACKOFF_MAX_S, com jitter); um
+429/503 no HEAD com Retry-After espera pelo menos o que o servidor pediu.
+
+Contra um servidor local (testes): EUROSTAT_METADATA_BASE (TOC) e
+EUROSTAT_DATA_BASE (API de dados) apontam para o stand-in.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+
+import requests
+
+from config import (
+    EUROSTAT_BASE,
+    METADATA_BASE,
+    METADATA_CACHE_DIR,
+    METADATA_LANG,
+    WATCH_BACKOFF_BASE_S,
+    WATCH_BACKOFF_MAX_S,
+    WATCH_DATASETS,
+    WATCH_INTERVAL_S,
+    WATCH_PIPELINE_DATASET,
+    WATCH_STATE,
+    WATCH_TIMEOUT_S,
+)
+from lake_fs import LakePath, write_text_atomic
+import metadata
+
+BASE = Path(__file__).resolve().parent  # .../src
+PROJECT = BASE.parent
+
+# --check sem mudanças: != 0 faz o BashSensor consultar de novo no próximo poke
+EXIT_UNCHANGED = 1
+# --download sem o dataset do pipeline: o BashOperator marca a task como skipped
+EXIT_SKIP = 99
+
+
+class WatchError(RuntimeError):
+    """Consulta incompleta (rede / servidor): nada é disparado, entra o backoff."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# ----------------------------
+# Estado
+# ----------------------------
+def load_state(path: Path | LakePath = WATCH_STATE) -> dict:
+    state = {}
+    if path.exists():
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError:
+            print(f"WARNING: unreadable watch state {path}; starting over")
+    state.setdefault("datasets", {})  # confirmados: {dataset: {marker, source, acked_at}}
+    state.setdefault("pending", {})   # mudaram, refresh ainda não confirmado
+    state.setdefault("toc", {})       # {validator, markers} do último parse do TOC
+    return state
+
+
+def save_state(state: dict, path: Path | LakePath = WATCH_STATE) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_text_atomic(path, json.dumps(state, indent=2))
+
+
+# ----------------------------
+# Consulta
+# ----------------------------
+def toc_markers(
+    datasets: list[str],
+    state: dict,
+    base: str = METADATA_BASE,
+    lang: str = METADATA_LANG,
+    root: Path = METADATA_CACHE_DIR,
+    timeout: float = WATCH_TIMEOUT_S,
+) -> dict[str, str | None]:
+    """{dataset: last update do TOC} (None = dataset fora do TOC)."""
+    root.mkdir(parents=True, exist_ok=True)
+    url = metadata.resources(base, lang)[metadata.TOC]
+    status = metadata.fetch_one(metadata.TOC, url, root, ttl_hours=0, force=True, timeout=timeout)
+    if status in (metadata.STALE, metadata.MISSING):
+        raise WatchError(f"TOC not reachable ({url})")
+
+    meta = metadata.read_meta(metadata.TOC, root) or {}
+    validator = meta.get("etag") or meta.get("last_modified")
+    cached = state["toc"]
+    if validator and cached.get("validator") == validator and all(ds in cached["markers"] for ds in datasets):
+        return {ds: cached["markers"][ds] for ds in datasets}
+
+    by_code = {code.lower(): rec for code, rec in metadata.toc(root).items()}
+    markers = {ds: by_code.get(ds.lower(), {}).get("last_update") or None for ds in datasets}
+    state["toc"] = {"validator": validator, "markers": markers}
+    return markers
+
+
+def data_url(dataset: str, base: str = EUROSTAT_BASE) -> str:
+    # mesma URL do 00_download_raw.py
+    return f"{base}/{quote(dataset)}?format=TSV&compressed=true"
+
+
+def _retry_after(r: requests.Response) -> float | None:
+    try:
+        return float(r.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+def head_marker(dataset: str, base: str = EUROSTAT_BASE, timeout: float = WATCH_TIMEOUT_S) -> str | None:
+    """ETag (ou Last-Modified) do arquivo de dados, só com HEAD."""
+    url = data_url(dataset, base)
+    try:
+        r = requests.head(url, timeout=timeout, allow_redirects=True)
+    except requests.RequestException as e:
+        raise WatchError(f"HEAD {url} failed ({e})") from e
+    if r.status_code in (429, 503):
+        raise WatchError(f"HEAD {url}: HTTP {r.status_code}", _retry_after(r))
+    if not r.ok:
+        raise WatchError(f"HEAD {url}: HTTP {r.status_code}")
+    return r.headers.get("ETag") or r.headers.get("Last-Modified")
+
+
+def check(datasets: list[str], state: dict) -> dict[str, dict]:
+    """
+    Consulta os datasets; devolve (e guarda em state["pending"]) os que mudaram
+    desde o último marcador confirmado. WatchError se a consulta não fechou.
+    """
+    found = {ds: (m, "toc") for ds, m in toc_markers(datasets, state).items() if m}
+    for ds in datasets:
+        if ds not in found:
+            found[ds] = (head_marker(ds), "head")
+
+    changed = {}
+    for ds, (marker, source) in found.items():
+        if marker is None:
+            print(f"WARNING: {ds} is not in the TOC and the data API sends no ETag/Last-Modified; not watched")
+            continue
+        if state["datasets"].get(ds, {}).get("marker") != marker:
+            changed[ds] = {"marker": marker, "source": source, "seen_at": _now()}
+    state["pending"] = changed
+    return changed
+
+
+def ack(state: dict) -> list[str]:
+    """Pendentes viram confirmados (refresh deu certo)."""
+    done = sorted(state["pending"])
+    for ds, rec in state["pending"].items():
+        state["datasets"][ds] = {"marker": rec["marker"], "source": rec["source"], "acked_at": _now()}
+    state["pending"] = {}
+    return done
+
+
+def backoff_delay(failures: int, retry_after: float | None = None) -> float:
+    delay = min(WATCH_BACKOFF_BASE_S * 2 ** (failures - 1), WATCH_BACKOFF_MAX_S)
+    delay = random.uniform(delay / 2, delay)  # jitter: vários watchers não batem juntos
+    return max(delay, retry_after or 0.0)
+
+
+# ----------------------------
+# Refresh
+# ----------------------------
+def _run(*args: str) -> bool:
+    r = subprocess.run([sys.executable, *args], cwd=str(PROJECT))
+    return r.returncode == 0
+
+
+def download(datasets: list[str]) -> bool:
+    print(f"\n=== Downloading {', '.join(datasets)} ===")
+    return _run(str(BASE / "00_download_raw.py"), "--datasets", *datasets)
+
+
+def refresh(datasets: list[str]) -> bool:
+    """Baixa os datasets que mudaram e roda o pipeline se o dele está entre eles."""
+    if not download(datasets):
+        return False
+    if WATCH_PIPELINE_DATASET not in datasets:
+        print(f"{WATCH_PIPELINE_DATASET} unchanged; pipeline not triggered")
+        return True
+    return _run(str(BASE / "run_all.py"), "--fresh", "--datasets", *datasets)
+
+
+def poll_once(datasets: list[str]) -> bool:
+    """Uma consulta + refresh; True se nada mudou ou o refresh deu certo."""
+    state = load_state()
+    changed = check(datasets, state)
+    save_state(state)
+    if not changed:
+        print(f"{_now()} no changes ({', '.join(datasets)})")
+        return True
+    print(f"{_now()} changed: " + ", ".join(f"{ds} ({rec['source']}: {rec['marker']})" for ds, rec in changed.items()))
+    if not refresh(sorted(changed)):
+        print("WARNING: refresh failed; the datasets stay pending and are retried on the next poll")
+        return False
+    ack(state)
+    save_state(state)
+    return True
+
+
+def watch(datasets: list[str], interval: float = WATCH_INTERVAL_S) -> None:
+    """Loop contínuo; erro de consulta ou de refresh entra no backoff."""
+    failures = 0
+    while True:
+        retry_after = None
+        try:
+            ok = poll_once(datasets)
+        except WatchError as e:
+            print(f"WARNING: {e}")
+            ok, retry_after = False, e.retry_after
+        failures = 0 if ok else failures + 1
+        delay = interval if ok else backoff_delay(failures, retry_after)
+        if not ok:
+            print(f"retrying in {delay:.0f}s (failure {failures} in a row)")
+        time.sleep(delay)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="uma consulta (+ refresh) e sai")
+    mode.add_argument("--check", action="store_true", help="só consulta; exit 0 se algo mudou")
+    mode.add_argument("--download", action="store_true", help="baixa os pendentes do último --check")
+    mode.add_argument("--ack", action="store_true", help="confirma os pendentes do último --check")
+    ap.add_argument("--datasets", nargs="+", default=WATCH_DATASETS, help="default: WATCH_DATASETS")
+    ap.add_argument("--interval", type=float, default=WATCH_INTERVAL_S, help="segundos entre consultas")
+    args = ap.parse_args()
+
+    if args.check:
+        state = load_state()
+        try:
+            changed = check(args.datasets, state)
+        except WatchError as e:
+            raise SystemExit(f"WARNING: {e}")
+        save_state(state)
+        print("changed:", ", ".join(changed) if changed else "none")
+        raise SystemExit(0 if changed else EXIT_UNCHANGED)
+
+    if args.download:
+        pending = sorted(load_state()["pending"])
+        if pending and not download(pending):
+            raise SystemExit("download failed")
+        # última linha do stdout = XCom do BashOperator (lista para o DAG do pipeline)
+        print(" ".join(pending))
+        raise SystemExit(0 if WATCH_PIPELINE_DATASET in pending else EXIT_SKIP)
+
+    if args.ack:
+        state = load_state()
+        done = ack(state)
+        save_state(state)
+        print("acknowledged:", ", ".join(done) if done else "none")
+        return
+
+    if args.once:
+        try:
+            ok = poll_once(args.datasets)
+        except WatchError as e:
+            raise SystemExit(f"WARNING: {e}")
+        raise SystemExit(0 if ok else 1)
+
+    watch(args.datasets, args.interval)
+
+
+if __name__ == "__main__":
+    main()
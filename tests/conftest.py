@@ -0,0 +1,104 @@
+"""
+Shared helpers for the test suite.
+
+Pipeline stages are run as their own processes against an isolated lake root
+(EUROSTAT_LAKE_ROOT), the same way run_all.py and the benchmarks run them;
+config.py is read at import, so a stage never sees another test's lake.
+
+    python -m pytest -q tests
+"""
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+
+def run_stage(script: str, lake_root: Path, *args: str, env: dict | None = None) -> subprocess.CompletedProcess:
+    """Runs src/<script> on lake_root; fails the test with the stage's output if it exits != 0."""
+    env = {**os.environ, "EUROSTAT_LAKE_ROOT": str(lake_root), "EUROSTAT_METADATA_FETCH": "0", **(env or {})}
+    proc = subprocess.run(
+        [sys.executable, str(REPO_ROOT / script), *args],
+        cwd=str(lake_root), env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        pytest.fail(f"{script} exited {proc.returncode}\n{proc.stdout}\n{proc.stderr}")
+    return proc
+
+
+@pytest.fixture
+def lake(tmp_path: Path) -> Path:
+    """Lake root with a small synthetic raw file (benchmarks/synthetic_eurostat.py)."""
+    from synthetic_eurostat import generate
+
+    generate(tmp_path / "data-raw" / "sbs_na_ind_r2.tsv.gz", size_mb=0.05, year_min=2015, year_max=2020)
+    return tmp_path
+
+
+class HttpStub:
+    """
+    Local HTTP stand-in for the Eurostat APIs. routes maps a path (query
+    included) to {"status", "headers", "body"}; a GET whose If-None-Match
+    equals the route's ETag gets a 304. Every request is logged in `seen`
+    as (method, path, headers).
+    """
+
+    def __init__(self):
+        self.routes: dict[str, dict] = {}
+        self.seen: list[tuple[str, str, dict]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, with_body: bool) -> None:
+                stub.seen.append((self.command, self.path, dict(self.headers)))
+                route = stub.routes.get(self.path, {"status": 404})
+                headers = dict(route.get("headers", {}))
+                body = route.get("body", b"")
+                status = route["status"]
+                if status == 200 and headers.get("ETag") and self.headers.get("If-None-Match") == headers["ETag"]:
+                    status, body = 304, b""
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._reply(True)
+
+            def do_HEAD(self):
+                self._reply(False)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def route(self, path: str, status: int = 200, body: str | bytes = b"", headers: dict | None = None) -> None:
+        self.routes[path] = {"status": status, "headers": headers or {},
+                             "body": body.encode() if isinstance(body, str) else body}
+
+    def requests_to(self, path: str) -> list[tuple[str, str, dict]]:
+        return [r for r in self.seen if r[1] == path]
+
+
+@pytest.fixture
+def http_stub():
+    stub = HttpStub()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,60 @@
+"""Incremental gold vs. repeated silver runs (src/revisions.py, src/04_gold_analytics.py)."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from conftest import run_stage
+
+REVISED = 999999.0
+
+
+def revise_first_value(lake: Path) -> None:
+    """Rewrites the first cell of the first data row of the extracted TSV."""
+    tsv = lake / "data-raw" / "sbs_na_ind_r2.tsv"
+    header, first, *rest = tsv.read_text(encoding="utf-8").splitlines(keepends=True)
+    key, _, *cells = first.split("\t")
+    tsv.write_text("".join([header, "\t".join([key, f"{REVISED} ", *cells]), *rest]), encoding="utf-8")
+
+
+def gold_has_revised_value(lake: Path) -> bool:
+    gold = pd.read_parquet(lake / "data-gold" / "gold_country_indicator_year.parquet", columns=["value"])
+    return bool((gold["value"] == REVISED).any())
+
+
+def test_silver_twice_before_gold_keeps_revisions(lake: Path):
+    for script in ("src/01_extract_raw.py", "src/02_bronze_ingest.py", "src/03_silver_transform.py",
+                   "src/silver/silver_revisions.py", "src/04_gold_analytics.py"):
+        run_stage(script, lake)
+    assert not gold_has_revised_value(lake)
+
+    revise_first_value(lake)
+    run_stage("src/02_bronze_ingest.py", lake)
+    run_stage("src/03_silver_transform.py", lake)
+    run_stage("src/silver/silver_revisions.py", lake)
+    # second silver run: its change log (prev -> current) is empty
+    run_stage("src/03_silver_transform.py", lake)
+    run_stage("src/silver/silver_revisions.py", lake)
+    out = run_stage("src/04_gold_analytics.py", lake).stdout
+
+    silver = pd.read_parquet(lake / "data-silver" / "sbs_na_ind_r2_silver.parquet", columns=["value_num"])
+    assert (silver["value_num"] == REVISED).any()
+    assert "GOLD up to date" not in out
+    assert gold_has_revised_value(lake)
+
+
+def test_incremental_gold_applies_change_log(lake: Path):
+    for script in ("src/01_extract_raw.py", "src/02_bronze_ingest.py", "src/03_silver_transform.py",
+                   "src/silver/silver_revisions.py", "src/04_gold_analytics.py"):
+        run_stage(script, lake)
+
+    revise_first_value(lake)
+    for script in ("src/02_bronze_ingest.py", "src/03_silver_transform.py", "src/silver/silver_revisions.py"):
+        run_stage(script, lake)
+    out = run_stage("src/04_gold_analytics.py", lake).stdout
+
+    assert "GOLD incremental: 1 series recomputed" in out
+    assert gold_has_revised_value(lake)
+    # gold already consumed this silver: nothing left to do
+    assert "GOLD up to date" in run_stage("src/04_gold_analytics.py", lake).stdout
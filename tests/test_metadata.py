@@ -0,0 +1,85 @@
+"""Metadata cache against a local HTTP stand-in: TTL, conditional GET / 304, stale fallback (src/metadata.py)."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+import json
+
+import metadata
+
+GEO = "DE\tGermany\nFR\tFrance\n"
+
+
+def path_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}"
+
+
+def serve_all(stub, etag: str = '"v1"') -> dict[str, str]:
+    """Every metadata resource on the stub; returns {resource: path}."""
+    paths = {name: path_of(url) for name, url in metadata.resources(stub.url, "en").items()}
+    for name, path in paths.items():
+        body = GEO if name == metadata.codelist_resource("geo") else "code\tlabel\n"
+        stub.route(path, body=body, headers={"ETag": etag, "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"})
+    return paths
+
+
+def expire(root: Path, name: str) -> None:
+    meta_path = root / f"{name}.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["fetched_at"] = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat(timespec="seconds")
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+
+def test_first_fetch_then_ttl_hit(http_stub, tmp_path):
+    serve_all(http_stub)
+    status = metadata.refresh(base=http_stub.url, lang="en", root=tmp_path, ttl_hours=24)
+    assert set(status.values()) == {metadata.UPDATED}
+    assert metadata.labels(tmp_path)["geo"] == {"DE": "Germany", "FR": "France"}
+
+    n = len(http_stub.seen)
+    status = metadata.refresh(base=http_stub.url, lang="en", root=tmp_path, ttl_hours=24)
+    assert set(status.values()) == {metadata.FRESH}
+    assert len(http_stub.seen) == n  # inside the TTL: no request at all
+
+
+def test_expired_entry_revalidates_with_etag_and_keeps_body_on_304(http_stub, tmp_path):
+    paths = serve_all(http_stub)
+    name = metadata.codelist_resource("geo")
+    url = metadata.resources(http_stub.url, "en")[name]
+    metadata.fetch_one(name, url, tmp_path)
+    expire(tmp_path, name)
+
+    assert metadata.fetch_one(name, url, tmp_path, ttl_hours=24) == metadata.NOT_MODIFIED
+    _, _, headers = http_stub.requests_to(paths[name])[-1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert metadata.read_body(name, tmp_path) == GEO
+    assert metadata.is_fresh(metadata.read_meta(name, tmp_path), ttl_hours=24)
+
+
+def test_changed_resource_replaces_body_and_validator(http_stub, tmp_path):
+    serve_all(http_stub)
+    name = metadata.codelist_resource("geo")
+    url = metadata.resources(http_stub.url, "en")[name]
+    metadata.fetch_one(name, url, tmp_path)
+
+    http_stub.route(path_of(url), body="DE\tDeutschland\n", headers={"ETag": '"v2"'})
+    assert metadata.fetch_one(name, url, tmp_path, force=True) == metadata.UPDATED
+    assert metadata.read_body(name, tmp_path) == "DE\tDeutschland\n"
+    assert metadata.read_meta(name, tmp_path)["etag"] == '"v2"'
+
+
+def test_server_error_falls_back_to_stale_cache_or_missing(http_stub, tmp_path):
+    serve_all(http_stub)
+    name = metadata.codelist_resource("geo")
+    url = metadata.resources(http_stub.url, "en")[name]
+    metadata.fetch_one(name, url, tmp_path)
+
+    http_stub.route(path_of(url), status=503)
+    assert metadata.fetch_one(name, url, tmp_path, force=True) == metadata.STALE
+    assert metadata.read_body(name, tmp_path) == GEO
+
+    assert metadata.fetch_one(name, url, tmp_path / "empty", force=True) == metadata.MISSING
+    assert metadata.read_body(name, tmp_path / "empty") is None
@@ -0,0 +1,106 @@
+"""Publishing against an in-process S3 stand-in (moto), src/publish.py."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+import publish  # noqa: E402
+
+BUCKET = "eurostat-test"
+PREFIX = "eurostat-lakehouse"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    for var, value in {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+                       "AWS_SESSION_TOKEN": "testing", "AWS_DEFAULT_REGION": "us-east-1"}.items():
+        monkeypatch.setenv(var, value)
+    with moto.mock_aws():
+        client = publish.make_client(endpoint_url=None, region="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def trees(tmp_path: Path):
+    gold, report = tmp_path / "data-gold", tmp_path / "reports" / "out"
+    (report / "assets").mkdir(parents=True)
+    gold.mkdir()
+    (gold / "gold_a.parquet").write_bytes(b"a" * 10)
+    (gold / "gold_b.parquet").write_bytes(b"b" * 10)
+    (gold / "_gold_build.json").write_text("{}")
+    (gold / "gold_a.arrow").write_bytes(b"ipc")
+    (gold / ".gold_a.parquet.tmp").write_bytes(b"partial")
+    (report / "gold_report.html").write_text("<html></html>")
+    (report / "assets" / "chart.png").write_bytes(b"png")
+    return [(gold, "gold", "*.parquet"), (report, "reports/latest", "**/*")]
+
+
+def run(client, trees, tmp_path: Path, **kw) -> dict:
+    return publish.publish(BUCKET, PREFIX, client=client, trees=trees,
+                           hash_cache=tmp_path / ".publish_hash_cache.json", **kw)
+
+
+def keys(client) -> set[str]:
+    return set(publish.remote_sizes(client, BUCKET, PREFIX)) - {f"{PREFIX}/{publish.MANIFEST_KEY}"}
+
+
+def test_publishes_only_gold_parquet_and_report(s3, trees, tmp_path):
+    res = run(s3, trees, tmp_path)
+    assert keys(s3) == {
+        f"{PREFIX}/gold/gold_a.parquet", f"{PREFIX}/gold/gold_b.parquet",
+        f"{PREFIX}/reports/latest/gold_report.html", f"{PREFIX}/reports/latest/assets/chart.png",
+    }
+    assert len(res["uploaded"]) == 4
+    # unchanged files are skipped on the next run
+    assert run(s3, trees, tmp_path)["uploaded"] == []
+
+
+def test_missing_local_tree_never_deletes_its_published_copy(s3, trees, tmp_path):
+    run(s3, trees, tmp_path)
+    report_root = trees[1][0]
+    for p in sorted(report_root.rglob("*"), reverse=True):
+        p.rmdir() if p.is_dir() else p.unlink()
+    report_root.rmdir()
+
+    res = run(s3, trees, tmp_path, delete_orphans=True)
+    assert res["orphans"] == [] and res["deleted"] == []
+    assert f"{PREFIX}/reports/latest/gold_report.html" in keys(s3)
+
+
+def test_orphans_are_listed_by_default_and_deleted_on_request(s3, trees, tmp_path):
+    run(s3, trees, tmp_path)
+    (trees[0][0] / "gold_b.parquet").unlink()
+    orphan = f"{PREFIX}/gold/gold_b.parquet"
+
+    res = run(s3, trees, tmp_path)
+    assert res["orphans"] == [orphan] and res["deleted"] == []
+    assert orphan in keys(s3)
+
+    res = run(s3, trees, tmp_path, delete_orphans=True)
+    assert res["deleted"] == [orphan]
+    assert orphan not in keys(s3)
+    assert orphan not in publish.remote_manifest(s3, BUCKET, PREFIX)
+
+
+def test_crash_while_writing_the_hash_cache_keeps_the_old_one(s3, trees, tmp_path, monkeypatch):
+    run(s3, trees, tmp_path)
+    cache = tmp_path / ".publish_hash_cache.json"
+    before = cache.read_text(encoding="utf-8")
+
+    def torn_write(self, text, *args, **kwargs):
+        Path.write_bytes(self, text[: len(text) // 2].encode())
+        raise RuntimeError("crash mid-write")
+
+    (trees[0][0] / "gold_c.parquet").write_bytes(b"c" * 10)
+    monkeypatch.setattr(Path, "write_text", torn_write)
+    with pytest.raises(RuntimeError):
+        run(s3, trees, tmp_path)
+    monkeypatch.undo()
+
+    assert cache.read_text(encoding="utf-8") == before
+    assert run(s3, trees, tmp_path)["uploaded"] == [f"{PREFIX}/gold/gold_c.parquet"]
@@ -0,0 +1,117 @@
+"""Watch mode against a local HTTP stand-in: TOC conditional GET, HEAD fallback, backoff (src/watch.py)."""
+from __future__ import annotations
+
+from functools import partial
+from urllib.parse import urlsplit
+
+import pytest
+
+import metadata
+import watch
+
+DATASET = "sbs_na_ind_r2"
+OTHER = "nama_10_gdp"  # not in the stub's TOC: watched through HEAD
+
+
+def toc_body(last_update: str) -> str:
+    return (
+        '"title"\t"code"\t"type"\t"last update of data"\n'
+        f'"SBS"\t"{DATASET}"\t"dataset"\t"{last_update}"\n'
+    )
+
+
+def path_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+@pytest.fixture
+def stub(http_stub, tmp_path, monkeypatch):
+    """Stand-in TOC + data API; watch's lookups and state pointed at it / tmp_path."""
+    http_stub.toc_path = path_of(metadata.resources(http_stub.url)[metadata.TOC])
+    http_stub.head_path = path_of(watch.data_url(OTHER, http_stub.url))
+    http_stub.route(http_stub.toc_path, body=toc_body("01.10.2026"), headers={"ETag": '"toc1"'})
+    http_stub.route(http_stub.head_path, headers={"ETag": '"data1"'})
+
+    monkeypatch.setattr(watch, "toc_markers", partial(watch.toc_markers, base=http_stub.url, root=tmp_path / "meta"))
+    monkeypatch.setattr(watch, "head_marker", partial(watch.head_marker, base=http_stub.url))
+    state_path = tmp_path / "watch.json"
+    monkeypatch.setattr(watch, "load_state", partial(watch.load_state, path=state_path))
+    monkeypatch.setattr(watch, "save_state", partial(watch.save_state, path=state_path))
+    return http_stub
+
+
+def test_first_poll_reports_everything_then_nothing_after_ack(stub):
+    state = watch.load_state()
+    changed = watch.check([DATASET, OTHER], state)
+    assert changed[DATASET] == {**changed[DATASET], "marker": "01.10.2026", "source": "toc"}
+    assert changed[OTHER] == {**changed[OTHER], "marker": '"data1"', "source": "head"}
+
+    assert watch.ack(state) == sorted([DATASET, OTHER])
+    assert watch.check([DATASET, OTHER], state) == {}
+
+
+def test_unchanged_toc_is_revalidated_not_reparsed(stub, monkeypatch):
+    state = watch.load_state()
+    watch.check([DATASET], state)
+    watch.ack(state)
+
+    monkeypatch.setattr(metadata, "toc", lambda *a, **k: pytest.fail("TOC re-parsed after a 304"))
+    assert watch.check([DATASET], state) == {}
+    method, _, headers = stub.requests_to(stub.toc_path)[-1]
+    assert method == "GET" and headers["If-None-Match"] == '"toc1"'
+
+
+def test_new_toc_marker_triggers_the_dataset(stub):
+    state = watch.load_state()
+    watch.check([DATASET], state)
+    watch.ack(state)
+
+    stub.route(stub.toc_path, body=toc_body("15.10.2026"), headers={"ETag": '"toc2"'})
+    assert watch.check([DATASET], state)[DATASET]["marker"] == "15.10.2026"
+
+
+def test_head_etag_change_triggers_the_dataset(stub):
+    state = watch.load_state()
+    watch.check([OTHER], state)
+    watch.ack(state)
+
+    stub.route(stub.head_path, headers={"ETag": '"data2"'})
+    assert watch.check([OTHER], state)[OTHER]["marker"] == '"data2"'
+    assert [m for m, *_ in stub.requests_to(stub.head_path)] == ["HEAD"] * 2
+
+
+def test_throttled_head_raises_with_retry_after(stub):
+    stub.route(stub.head_path, status=429, headers={"Retry-After": "120"})
+    with pytest.raises(watch.WatchError) as e:
+        watch.check([OTHER], watch.load_state())
+    assert e.value.retry_after == 120.0
+
+
+def test_unreachable_toc_raises(stub):
+    stub.route(stub.toc_path, status=503)
+    with pytest.raises(watch.WatchError):
+        watch.check([DATASET], watch.load_state())
+
+
+def test_backoff_doubles_is_capped_and_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(watch.random, "uniform", lambda lo, hi: hi)
+    delays = [watch.backoff_delay(n) for n in range(1, 20)]
+    assert delays[:3] == [watch.WATCH_BACKOFF_BASE_S * k for k in (1, 2, 4)]
+    assert max(delays) == watch.WATCH_BACKOFF_MAX_S
+    assert watch.backoff_delay(1, retry_after=watch.WATCH_BACKOFF_MAX_S * 2) == watch.WATCH_BACKOFF_MAX_S * 2
+
+    monkeypatch.setattr(watch.random, "uniform", lambda lo, hi: lo)
+    assert watch.backoff_delay(1) == watch.WATCH_BACKOFF_BASE_S / 2  # jitter floor
+
+
+def test_failed_refresh_keeps_datasets_pending(stub, monkeypatch):
+    monkeypatch.setattr(watch, "refresh", lambda datasets: False)
+    assert watch.poll_once([DATASET]) is False
+    state = watch.load_state()
+    assert DATASET in state["pending"] and DATASET not in state["datasets"]
+
+    monkeypatch.setattr(watch, "refresh", lambda datasets: True)
+    assert watch.poll_once([DATASET]) is True
+    state = watch.load_state()
+    assert state["pending"] == {} and state["datasets"][DATASET]["marker"] == "01.10.2026"